@@ -0,0 +1,127 @@
+"""
+Benchmark ElementHelpers/AuthHelpers flows against the offline fake Appium server.
+
+    python -m login.benchmarks.bench_helpers --latency 0.03 --appear-delay 0.3 --json after.json --compare before.json
+
+Reports wall time and WebDriver command counts per flow, so helper changes can be compared before and after.
+The whole test suite can also run offline against the fake server:
+
+    python login/fake_appium/server.py --port 4799 --latency 0.03 &
+    APPIUM_SERVER_URL=http://127.0.0.1:4799 pytest login
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from appium import webdriver
+
+from login.config import get_android_options, TEST_CREDENTIALS
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.element_helpers import ElementHelpers
+from login.helpers.list_harvester import ListHarvester
+from login.helpers.page_snapshot import PageSnapshot
+
+EMAIL = TEST_CREDENTIALS["valid_email"]
+PASSWORD = TEST_CREDENTIALS["valid_password"]
+LIST_LENGTH = 200
+
+
+def _navigate_properties(driver):
+    AuthHelpers.click_nav_bar(driver)
+    AuthHelpers.click_properties(driver)
+    return PageSnapshot.wait_until(driver, lambda s: s.text("(//android.widget.TextView[@text='Properties'])[1]"), 3)
+
+
+def _invalid_email_tooltip(driver):
+    ElementHelpers.safe_send_keys(driver, AuthHelpers.EMAIL_SELECTORS, "dgfg")
+    AuthHelpers.submit_login(driver)
+    return PageSnapshot.wait_until(driver, lambda s: s.find_text("Please include an '@'"), 6)
+
+
+def _logout(driver):
+    AuthHelpers.click_nav_bar(driver)
+    return AuthHelpers.logout(driver)
+
+
+# name -> (start screen, flow)
+SCENARIOS: Dict[str, Tuple[str, Callable]] = {
+    "element_exists (hit)": ("sign_in", lambda d: ElementHelpers.element_exists(d, AuthHelpers.EMAIL_SELECTORS)),
+    "element_exists (miss, 2s)": ("dashboard", lambda d: not ElementHelpers.element_exists(d, AuthHelpers.SIGN_OUT_SELECTORS, timeout=2)),
+    "snapshot exists (hit)": ("sign_in", lambda d: PageSnapshot.capture(d).exists(AuthHelpers.EMAIL_SELECTORS)),
+    "wait_for_idle": ("dashboard", lambda d: ElementHelpers.wait_for_idle(d)),
+    "invalid email tooltip": ("sign_in", _invalid_email_tooltip),
+    "fill_login_form": ("sign_in", lambda d: AuthHelpers.fill_login_form(d, EMAIL, PASSWORD)),
+    "login": ("sign_in", lambda d: AuthHelpers.login(d, EMAIL, PASSWORD)),
+    "ensure_logged_in (fast path)": ("dashboard", lambda d: AuthHelpers.ensure_logged_in(d, EMAIL, PASSWORD)),
+    "navigate to Properties": ("dashboard", _navigate_properties),
+    "logout": ("dashboard", _logout),
+    f"harvest list ({LIST_LENGTH} rows)": ("properties", lambda d: sum(1 for _ in ListHarvester(d)) == LIST_LENGTH),
+}
+
+
+def run(fake: FakeAppiumServer, driver, repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, (screen, flow) in SCENARIOS.items():
+        durations: List[float] = []
+        commands = Counter()
+        ok = True
+        for _ in range(repeat):
+            fake.reset(screen)
+            fake.reset_stats()
+            start = time.perf_counter()
+            ok = bool(flow(driver)) and ok
+            durations.append(time.perf_counter() - start)
+            commands += fake.stats
+        results[name] = {
+            "ok": ok,
+            "median_s": statistics.median(durations),
+            "commands": sum(commands.values()) / repeat,
+            "by_command": {k: v / repeat for k, v in sorted(commands.items())},
+        }
+    return results
+
+
+def format_table(results: Dict[str, Dict], baseline: Dict[str, Dict] = None) -> str:
+    lines = [f"{'flow':<32}{'ok':<5}{'wall (s)':>10}{'commands':>10}  {'vs baseline':<14}breakdown"]
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name]["median_s"]:
+            delta = f"{(r['median_s'] / baseline[name]['median_s'] - 1) * 100:+.0f}% time"
+        breakdown = ", ".join(f"{k}={v:g}" for k, v in r["by_command"].items())
+        lines.append(f"{name:<32}{'✓' if r['ok'] else '✗':<5}{r['median_s']:>10.3f}{r['commands']:>10g}  {delta:<14}{breakdown}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds added to every fake server command")
+    parser.add_argument("--appear-delay", type=float, default=0.3, help="seconds before a new screen appears")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file from an earlier --json run")
+    args = parser.parse_args()
+
+    fake = FakeAppiumServer(latency=args.latency, appear_delay=args.appear_delay, list_length=LIST_LENGTH).start()
+    driver = webdriver.Remote(fake.url, options=get_android_options())
+    try:
+        results = run(fake, driver, args.repeat)
+    finally:
+        driver.quit()
+        fake.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print(format_table(results, baseline))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"latency": args.latency, "appear_delay": args.appear_delay, "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
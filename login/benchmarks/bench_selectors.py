@@ -0,0 +1,116 @@
+"""
+Per-lookup cost of the suite's XPath selectors versus their SelectorCompiler rewrites.
+
+    python -m login.benchmarks.bench_selectors --latency 0.03 --xpath-node-cost 0.003
+    python -m login.benchmarks.bench_selectors --server http://127.0.0.1:4723   # current screen of a real device
+
+For every screen, each selector that matches there and has a native rewrite is looked up
+--repeat times both ways; both lookups must return the same number of elements.
+Against the fake server every recorded screen is measured; against a real server only the screen on display.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from appium import webdriver
+from appium.webdriver.common.appiumby import AppiumBy
+
+from login.config import get_android_options
+from login.constants import MENU_TITLES
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.page_snapshot import PageSnapshot
+from login.helpers.selector_compiler import SelectorCompiler
+
+
+def suite_selectors() -> List[Tuple[str, str]]:
+    """Every XPath the suite locates elements with, deduplicated"""
+    selectors = []
+    for name, value in vars(AuthHelpers).items():
+        if name.endswith("SELECTORS"):
+            selectors += value
+    selectors += [AuthHelpers.SIGN_IN_BUTTON, AuthHelpers.DASHBOARD]
+    selectors += [(AppiumBy.XPATH, xpath) for xpath in MENU_TITLES.values()]
+    return list(dict.fromkeys(s for s in selectors if s[0] == AppiumBy.XPATH))
+
+
+def _lookup(driver, by: str, selector: str, repeat: int) -> Tuple[float, int]:
+    durations, count = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(driver.find_elements(by, selector))
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), count
+
+
+def measure_screen(driver, repeat: int) -> List[Dict]:
+    """Time each translatable selector present on the current screen"""
+    snapshot = PageSnapshot.capture(driver)
+    rows = []
+    for by, selector in suite_selectors():
+        native = SelectorCompiler.compile(by, selector)
+        if native == (by, selector) or not snapshot.exists([(by, selector)]):
+            continue
+        xpath_s, xpath_count = _lookup(driver, by, selector, repeat)
+        native_s, native_count = _lookup(driver, *native, repeat)
+        rows.append({
+            "selector": selector, "native": native[1], "xpath_s": xpath_s, "native_s": native_s,
+            "equivalent": xpath_count == native_count,
+        })
+    return rows
+
+
+def format_table(results: Dict[str, List[Dict]]) -> str:
+    lines = [f"{'screen':<20}{'selectors':>10}{'xpath (ms)':>12}{'native (ms)':>13}{'gain':>8}  mismatches"]
+    all_rows = []
+    for screen, rows in results.items():
+        if not rows:
+            continue
+        all_rows += rows
+        xpath_ms = statistics.mean(r["xpath_s"] for r in rows) * 1000
+        native_ms = statistics.mean(r["native_s"] for r in rows) * 1000
+        mismatches = ", ".join(r["selector"] for r in rows if not r["equivalent"])
+        lines.append(f"{screen:<20}{len(rows):>10}{xpath_ms:>12.1f}{native_ms:>13.1f}"
+                     f"{(1 - native_ms / xpath_ms) * 100:>7.0f}%  {mismatches or '-'}")
+    if all_rows:
+        xpath_ms = statistics.mean(r["xpath_s"] for r in all_rows) * 1000
+        native_ms = statistics.mean(r["native_s"] for r in all_rows) * 1000
+        lines.append(f"Per lookup: {xpath_ms:.1f} ms XPath -> {native_ms:.1f} ms native "
+                     f"({xpath_ms - native_ms:.1f} ms saved, {len(all_rows)} lookups measured)")
+    selectors = suite_selectors()
+    translated = sum(SelectorCompiler.compile(*s) != s for s in selectors)
+    lines.append(f"Translated {translated}/{len(selectors)} suite XPath selectors; the rest fall back to XPath")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", help="Appium server to measure instead of the offline fake")
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds added to every fake server command")
+    parser.add_argument("--xpath-node-cost", type=float, default=0.003,
+                        help="seconds per hierarchy node the fake adds to XPath finds")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fake = None
+    if not args.server:
+        fake = FakeAppiumServer(latency=args.latency, xpath_node_cost=args.xpath_node_cost).start()
+    driver = webdriver.Remote(args.server or fake.url, options=get_android_options())
+    results = {}
+    try:
+        if fake:
+            for screen in sorted(fake.screens):
+                fake.reset(screen)
+                results[screen] = measure_screen(driver, args.repeat)
+        else:
+            results["(current screen)"] = measure_screen(driver, args.repeat)
+    finally:
+        driver.quit()
+        if fake:
+            fake.stop()
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
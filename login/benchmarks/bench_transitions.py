@@ -0,0 +1,185 @@
+"""
+Screen-transition latency: tap on a menu item -> screen title visible, per screen and app build.
+
+    python -m login.benchmarks.bench_transitions --runs 20 --build 1.4.0 --save
+    python -m login.benchmarks.bench_transitions --server http://127.0.0.1:4723 --build 1.5.0 --against 1.4.0
+
+Each transition opens the drawer, taps the screen's menu entry and polls for the title with a native
+locator every --poll seconds, once the tapped menu entry has gone (the title locator would also match
+the entry while the drawer is open); the latency runs from just before the tap command to the poll
+that first sees the title, so it is accurate to about one poll interval. p50/p95/p99 are stored per build in the baseline file (--save), and
+a screen is flagged when its p95 exceeds the baseline build's by more than --tolerance and --min-delta,
+or when any of its transitions failed. Exits with status 1 when a regression is flagged.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from appium import webdriver
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from login.config import get_android_options, APP_VERSION, TEST_CREDENTIALS
+from login.constants import MENU_TITLES
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.element_helpers import ElementHelpers
+from login.helpers.screen_navigator import ScreenNavigator
+from login.helpers.selector_compiler import SelectorCompiler
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "transition_baseline.json")
+# Seconds between polls; without a pause the loop floods the server (and the device) with finds
+POLL_INTERVAL = 0.02
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 of the samples; None when there are none (every transition failed)"""
+    if len(samples) < 2:
+        value = samples[0] if samples else None
+        return {"p50": value, "p95": value, "p99": value, "n": len(samples)}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "n": len(samples)}
+
+
+def _gone(element) -> bool:
+    """True once the element is stale or no longer displayed"""
+    try:
+        return not element.is_displayed()
+    except (StaleElementReferenceException, NoSuchElementException):
+        return True
+
+
+def measure_transition(driver, screen: str, timeout: float, poll: float = POLL_INTERVAL) -> Optional[float]:
+    """Seconds from the menu tap to the first poll that finds the title, None if it never appeared"""
+    if not AuthHelpers.click_nav_bar(driver):
+        return None
+    _, item = ElementHelpers.resolve_element(driver, ScreenNavigator.NAV_SELECTORS[screen], timeout, reorder=False)
+    title = SelectorCompiler.compile(AppiumBy.XPATH, MENU_TITLES[screen])
+    start = time.perf_counter()
+    item.click()
+    while not _gone(item):
+        if time.perf_counter() - start >= timeout:
+            return None
+        time.sleep(poll)
+    while time.perf_counter() - start < timeout:
+        if driver.find_elements(*title):
+            return time.perf_counter() - start
+        time.sleep(poll)
+    return None
+
+
+def run(driver, runs: int, timeout: float, screens: List[str], poll: float = POLL_INTERVAL) -> Dict[str, Dict]:
+    results = {}
+    for screen in screens:
+        samples, failures = [], 0
+        for _ in range(runs):
+            latency = measure_transition(driver, screen, timeout, poll)
+            if latency is None:
+                failures += 1
+            else:
+                samples.append(latency)
+        results[screen] = dict(percentiles(samples), failures=failures)
+        print(f"  {screen:<18}{_ms(results[screen]['p50']):>8} ms p50  ({len(samples)}/{runs} ok)")
+    return results
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float, min_delta: float) -> List[str]:
+    """Screens with failed transitions, or whose p95 regressed against the baseline beyond both thresholds"""
+    regressions = []
+    for screen, r in results.items():
+        base = baseline.get(screen)
+        if r["failures"]:
+            regressions.append(screen)
+        elif base and base["p95"] is not None and r["p95"] > base["p95"] * (1 + tolerance) \
+                and r["p95"] - base["p95"] > min_delta:
+            regressions.append(screen)
+    return regressions
+
+
+def format_table(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]], regressions: List[str]) -> str:
+    lines = [f"{'screen':<18}{'n':>5}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'fail':>6}  vs baseline p95"]
+    for screen, r in results.items():
+        delta = ""
+        if baseline and screen in baseline and baseline[screen]["p95"] and r["p95"] is not None:
+            delta = f"{(r['p95'] / baseline[screen]['p95'] - 1) * 100:+.0f}%"
+        delta += "  ✗ REGRESSION" if screen in regressions else ""
+        lines.append(f"{screen:<18}{r['n']:>5}{_ms(r['p50']):>10}{_ms(r['p95']):>10}"
+                     f"{_ms(r['p99']):>10}{r['failures']:>6}  {delta}")
+    return "\n".join(lines)
+
+
+def load_baselines(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, baselines: Dict[str, Dict]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Unique temp file: two benchmark runs may save the same baseline file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", help="Appium server to measure instead of the offline fake")
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds added to every fake server command")
+    parser.add_argument("--appear-delay", type=float, default=0.3, help="seconds before a new fake screen appears")
+    parser.add_argument("--runs", type=int, default=10, help="transitions measured per screen")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds before a transition counts as failed")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between title polls")
+    parser.add_argument("--screen", action="append", help="screen to measure (repeatable; default: all)")
+    parser.add_argument("--build", default=APP_VERSION, help="app build the results belong to")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="per-build results file")
+    parser.add_argument("--against", help="baseline build to compare with (default: the same build)")
+    parser.add_argument("--save", action="store_true", help="store these results as the build's baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95 increase")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore p95 increases below this many seconds")
+    args = parser.parse_args()
+
+    screens = args.screen or list(ScreenNavigator.NAV_SELECTORS)
+    fake = None
+    if not args.server:
+        fake = FakeAppiumServer(latency=args.latency, appear_delay=args.appear_delay, start_screen="dashboard").start()
+    driver = webdriver.Remote(args.server or fake.url, options=get_android_options())
+    try:
+        driver.implicitly_wait(0)
+        if not AuthHelpers.ensure_logged_in(driver, TEST_CREDENTIALS["valid_email"], TEST_CREDENTIALS["valid_password"]):
+            sys.exit("Could not reach a logged-in state")
+        print(f"Measuring {len(screens)} transitions x {args.runs} (build {args.build})")
+        results = run(driver, args.runs, args.timeout, screens, args.poll)
+    finally:
+        driver.quit()
+        if fake:
+            fake.stop()
+
+    baselines = load_baselines(args.baseline)
+    baseline = baselines.get(args.against or args.build)
+    regressions = compare(results, baseline or {}, args.tolerance, args.min_delta)
+    print(format_table(results, baseline, regressions))
+    if baseline is None and (args.against or not args.save):
+        print(f"No baseline stored for build {args.against or args.build} in {args.baseline}")
+    if args.save:
+        baselines[args.build] = {"saved": time.time(), **results}
+        save_baselines(args.baseline, baselines)
+        print(f"✓ Baseline for build {args.build} saved: {args.baseline}")
+    if regressions:
+        print(f"✗ {len(regressions)} transition(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,108 @@
 from appium.options.android import UiAutomator2Options
+import json
 import os
 
 # Appium Server Configuration
 APPIUM_SERVER_URL = os.getenv("APPIUM_SERVER_URL", "http://127.0.0.1:4723")
+# Device inventory for parallel workers (see helpers/device_pool.py)
+DEVICE_POOL_FILE = os.getenv("DEVICE_POOL_FILE", os.path.join(os.path.dirname(__file__), "devices.json"))
+# Warm session broker (see helpers/session_broker.py); empty address disables it
+SESSION_BROKER_ADDRESS = os.getenv("SESSION_BROKER_ADDRESS", "")
+# Must match the key the broker was started with; no default, the broker unpickles what clients send
+SESSION_BROKER_AUTHKEY = os.getenv("SESSION_BROKER_AUTHKEY", "")
+# Shared keep-alive HTTP connection pool for driver commands (see helpers/pooled_executor.py)
+HTTP_POOL_ENABLED = os.getenv("HTTP_POOL_ENABLED", "true").lower() == "true"
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_COMMAND_TIMEOUT = float(os.getenv("HTTP_COMMAND_TIMEOUT", "60"))
+# JSON object of command name -> seconds, e.g. {"getPageSource": 20}; newSession defaults to 300
+HTTP_COMMAND_TIMEOUTS = json.loads(os.getenv("HTTP_COMMAND_TIMEOUTS", "{}"))
 # App Configuration
 APP_PACKAGE = os.getenv("APP_PACKAGE", "com.qompli.app")
 APP_ACTIVITY = os.getenv("APP_ACTIVITY", "com.qompli.app.MainActivity")
+APP_VERSION = os.getenv("APP_VERSION", "unknown")
+# Selection written by `python -m login.impact`; when set, only declared tests touching changed screens run
+# (a selection crawled for another APP_VERSION is ignored)
+IMPACT_SELECTION_FILE = os.getenv("IMPACT_SELECTION_FILE", "")
 # Wait Timeouts (in seconds)
 WAIT_TIMEOUT = int(os.getenv("WAIT_TIMEOUT", "10"))
 SHORT_WAIT = int(os.getenv("SHORT_WAIT", "2"))
 LONG_WAIT = int(os.getenv("LONG_WAIT", "5"))
+# UI is considered settled once the hierarchy is unchanged for the quiet period
+SETTLE_QUIET_PERIOD = float(os.getenv("SETTLE_QUIET_PERIOD", "0.4"))
+SETTLE_TIMEOUT = float(os.getenv("SETTLE_TIMEOUT", "5"))
+# Total seconds one test may spend in helper waits (see helpers/wait_budget.py)
+TEST_WAIT_BUDGET = float(os.getenv("TEST_WAIT_BUDGET", "30"))
+
+# Per-command timing trace (see helpers/instrumentation.py)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(os.path.dirname(__file__), "reports"))
+
+# Background screenshot writing (see helpers/screenshot_pipeline.py)
+SCREENSHOT_ASYNC = os.getenv("SCREENSHOT_ASYNC", "false").lower() == "true"
+SCREENSHOT_WORKERS = int(os.getenv("SCREENSHOT_WORKERS", "2"))
+SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", "0")) or None
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "png")
+SCREENSHOT_EACH_STEP = os.getenv("SCREENSHOT_EACH_STEP", "false").lower() == "true"
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(__file__), "screenshots")
+
+# Deduplicated page-source archive (see helpers/page_archive.py)
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE_ENABLED", "false").lower() == "true"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "page_sources", "archive"))
+PAGE_ARCHIVE_EACH_STEP = os.getenv("PAGE_ARCHIVE_EACH_STEP", "false").lower() == "true"
+
+# Screen navigation (see helpers/screen_navigator.py)
+NAVIGATION_COSTS_FILE = os.getenv("NAVIGATION_COSTS_FILE", os.path.join(os.path.dirname(__file__), ".cache", "navigation_costs.json"))
+# JSON object of screen title -> deep link URL, e.g. {"Properties": "qompli://properties"}
+DEEP_LINKS = json.loads(os.getenv("DEEP_LINKS", "{}"))
+
+# Background watcher for transient messages (see helpers/message_watcher.py); it reads the full page source
+# every MESSAGE_WATCH_INTERVAL seconds, so it is opt-in
+MESSAGE_WATCHER_ENABLED = os.getenv("MESSAGE_WATCHER_ENABLED", "false").lower() == "true"
+MESSAGE_WATCH_INTERVAL = float(os.getenv("MESSAGE_WATCH_INTERVAL", "0.2"))
+# JSON object of watch name -> XPath; toasts and WebView validation tooltips by default
+MESSAGE_WATCHES = json.loads(os.getenv("MESSAGE_WATCHES", "null")) or {
+    "success_toast": os.getenv("SUCCESS_TOAST_XPATH", '//android.widget.Toast[@text="Login Successful"]'),
+    "error_toast": os.getenv("ERROR_TOAST_XPATH", '//android.widget.Toast[@text="Invalid Credentials"]'),
+    "toast": "//android.widget.Toast",
+    "validation": "//android.widget.TextView[starts-with(@text, 'Please ')]",
+}
+
+# Credential matrix: sign-in cases run back to back by one test (see helpers/credential_matrix.py)
+CREDENTIAL_MATRIX_FILE = os.getenv("CREDENTIAL_MATRIX_FILE", os.path.join(os.path.dirname(__file__), "credential_cases.csv"))
+CREDENTIAL_MATRIX_SETTLE = float(os.getenv("CREDENTIAL_MATRIX_SETTLE", "3"))
+# Where a case's message is read from: validation tooltips and toasts
+CREDENTIAL_MATRIX_MESSAGE_XPATH = os.getenv(
+    "CREDENTIAL_MATRIX_MESSAGE_XPATH", f"{MESSAGE_WATCHES['validation']} | {MESSAGE_WATCHES['toast']}"
+)
+
+# App CPU/memory/frame profiling per test step (see helpers/app_profiler.py); frame stats need adb_shell
+APP_PROFILER_ENABLED = os.getenv("APP_PROFILER_ENABLED", "false").lower() == "true"
+APP_PROFILER_INTERVAL = float(os.getenv("APP_PROFILER_INTERVAL", "1.0"))
+APP_PROFILER_FRAME_STATS = os.getenv("APP_PROFILER_FRAME_STATS", "true").lower() == "true"
+# Profile from an earlier run (its app_profile_*.json) to flag per-screen memory/jank regressions against
+APP_PROFILER_BASELINE = os.getenv("APP_PROFILER_BASELINE", "")
+APP_PROFILER_MEMORY_TOLERANCE = float(os.getenv("APP_PROFILER_MEMORY_TOLERANCE", "0.15"))
+APP_PROFILER_JANK_TOLERANCE = float(os.getenv("APP_PROFILER_JANK_TOLERANCE", "5"))
+
+# Screenshot-based screen identification (see helpers/screen_classifier.py; needs NumPy)
+SCREEN_CLASSIFIER_ENABLED = os.getenv("SCREEN_CLASSIFIER_ENABLED", "false").lower() == "true"
+SCREEN_LIBRARY_FILE = os.getenv("SCREEN_LIBRARY_FILE", os.path.join(os.path.dirname(__file__), ".cache", "screen_library.json"))
+
+# Selector hit statistics (reorders fallback selector lists across runs)
+SELECTOR_STATS_FILE = os.getenv("SELECTOR_STATS_FILE", os.path.join(os.path.dirname(__file__), ".cache", "selector_stats.json"))
+SELECTOR_STATS_ENABLED = os.getenv("SELECTOR_STATS_ENABLED", "true").lower() == "true"
+# Wait timeouts learned from observed latency per selector list / screen (see helpers/adaptive_timeouts.py)
+ADAPTIVE_TIMEOUTS_ENABLED = os.getenv("ADAPTIVE_TIMEOUTS_ENABLED", "true").lower() == "true"
+ADAPTIVE_TIMEOUTS_FILE = os.getenv("ADAPTIVE_TIMEOUTS_FILE", os.path.join(os.path.dirname(__file__), ".cache", "adaptive_timeouts.json"))
+ADAPTIVE_TIMEOUT_PERCENTILE = int(os.getenv("ADAPTIVE_TIMEOUT_PERCENTILE", "95"))
+ADAPTIVE_TIMEOUT_MARGIN = float(os.getenv("ADAPTIVE_TIMEOUT_MARGIN", "0.5"))
+ADAPTIVE_TIMEOUT_MAX = float(os.getenv("ADAPTIVE_TIMEOUT_MAX", "30"))
+# JSON object of target -> seconds, e.g. {"screen:Marketplace": 15}; targets as listed in the report
+ADAPTIVE_TIMEOUT_OVERRIDES = json.loads(os.getenv("ADAPTIVE_TIMEOUT_OVERRIDES", "{}"))
+# Send XPath selectors as equivalent UiSelector/ID locators where possible (see helpers/selector_compiler.py)
+SELECTOR_COMPILER_ENABLED = os.getenv("SELECTOR_COMPILER_ENABLED", "false").lower() == "true"
 
 # Test Credentials
 TEST_CREDENTIALS = {
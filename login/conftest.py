@@ -1,29 +1,243 @@
+import json
+import os
+
 import pytest
 from appium import webdriver
 
-from login.constants import APPIUM_SERVER_URL, APPIUM_CAPS
+from login.constants import (
+    APPIUM_SERVER_URL,
+    APPIUM_CAPS,
+    VALID_EMAIL,
+    VALID_PASSWORD,
+)
+from login.config import (
+    DEVICE_POOL_FILE,
+    REPORTS_DIR,
+    SESSION_BROKER_ADDRESS,
+    SESSION_BROKER_AUTHKEY,
+    TRACE_ENABLED,
+    TEST_WAIT_BUDGET,
+    IMPACT_SELECTION_FILE,
+    APP_VERSION,
+    HTTP_POOL_ENABLED,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_COMMAND_TIMEOUT,
+    HTTP_COMMAND_TIMEOUTS,
+)
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.device_pool import DevicePool
+from login.helpers.instrumentation import Tracer
+from login.helpers.pooled_executor import PooledExecutor
+from login.helpers.wait_budget import WaitBudget
+from login.helpers.state_scheduler import StateScheduler
+
+DEVICE_POOL = DevicePool.load(DEVICE_POOL_FILE)
+DEVICE = DEVICE_POOL.device_for_worker() if DEVICE_POOL else None
+RESULTS = []
+# False on the xdist controller, which only receives the workers' forwarded reports (see pytest_configure)
+COLLECTS_RESULTS = True
+TRACER = Tracer() if TRACE_ENABLED else None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    # `-n auto` starts one worker per device
+    return len(DEVICE_POOL) if DEVICE_POOL else None
+
+
+def _runs_tests(config) -> bool:
+    """True on xdist workers and in plain runs; the xdist controller only receives the workers' reports"""
+    return hasattr(config, "workerinput") or getattr(config.option, "dist", "no") == "no"
+
+
+def pytest_configure(config):
+    global COLLECTS_RESULTS
+    COLLECTS_RESULTS = _runs_tests(config)
+    if not hasattr(config, "workerinput"):
+        DevicePool.clear_worker_results(REPORTS_DIR)
+    if not config.pluginmanager.hasplugin("xdist"):
+        config.addinivalue_line("markers", "xdist_group(name): keep tests on one xdist worker")
+
+
+def _apply_impact_selection(config, items):
+    """
+    Deselect declared tests that `python -m login.impact` did not select (undeclared tests always run).
+    A selection crawled for another build than APP_VERSION, or from the offline fake's canned screens
+    (`--fake`), says nothing about this one: run everything.
+    """
+    if not IMPACT_SELECTION_FILE:
+        return
+    try:
+        with open(IMPACT_SELECTION_FILE, "r", encoding="utf-8") as f:
+            selection = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"\n⚠ Ignoring impact selection, running every test: {e}")
+        return
+    if selection.get("fake"):
+        print(f"\n⚠ Ignoring impact selection crawled from fake screens, running every test: {IMPACT_SELECTION_FILE}")
+        return
+    if selection.get("build") != APP_VERSION:
+        print(f"\n⚠ Ignoring impact selection for build {selection.get('build')}, running every test "
+              f"of build {APP_VERSION}")
+        return
+    selected = set(selection["tests"])
+    deselected = [item for item in items
+                  if any(StateScheduler.states(getattr(item, "obj", None))) and item.name not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item not in deselected]
+    if not hasattr(config, "workerinput"):
+        print(f"\nImpact selection, build {selection['build']} vs {selection['against']}: "
+              f"changed {', '.join(selection['changed']) or 'nothing'}; {len(deselected)} test(s) deselected")
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Order each class's tests with declared app states (StateScheduler) by state instead of by name.
+    A class shares one app session, so its declared tests form one chain, planned into the positions they
+    were collected in; undeclared tests keep theirs. Each chain is pinned to one worker with xdist_group,
+    so `-n N --dist loadgroup` runs chains of different classes in parallel.
+    With IMPACT_SELECTION_FILE set, tests outside the change-impact selection are deselected first.
+    """
+    _apply_impact_selection(config, items)
+    groups = {}
+    for index, item in enumerate(items):
+        requires, produces = StateScheduler.states(getattr(item, "obj", None))
+        if requires or produces:
+            # Class (or module, for plain test functions) the test belongs to
+            groups.setdefault(item.nodeid.rsplit("::", 1)[0], []).append((index, item, requires, produces))
+    scheduler = StateScheduler()
+    for number, (group, members) in enumerate(groups.items()):
+        declared = [(item.nodeid, requires, produces) for _, item, requires, produces in members]
+        chain = scheduler.plan(declared)[0]
+        by_id = {item.nodeid: item for _, item, _, _ in members}
+        for (index, _, _, _), (nodeid, _, _) in zip(members, chain):
+            by_id[nodeid].add_marker(pytest.mark.xdist_group(f"state_chain_{number}"))
+            items[index] = by_id[nodeid]
+        if not hasattr(config, "workerinput"):
+            print(f"\n{group}: " + scheduler.format_summary(declared, [chain]))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach the wait-budget breakdown to failing tests"""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when != "call" or not report.failed:
+        return
+    driver = getattr(item, "funcargs", {}).get("driver") or getattr(getattr(item, "instance", None), "driver", None)
+    budget = WaitBudget.of(driver) if driver else None
+    if budget:
+        report.sections.append(("wait budget", budget.format_report()))
+
+
+def pytest_runtest_logreport(report):
+    if not COLLECTS_RESULTS:
+        return
+    if report.when == "call" or (report.when == "setup" and not report.passed):
+        RESULTS.append({"test": report.nodeid, "outcome": report.outcome, "duration": report.duration})
+
+
+def pytest_sessionfinish(session):
+    stats = AuthHelpers.LOGIN_STATS
+    if stats["fast_path"] or stats["ui_login"]:
+        print(f"\nLogin: {stats['fast_path']} reused, {stats['ui_login']} through the UI")
+    if COLLECTS_RESULTS:
+        DevicePool.write_worker_results(REPORTS_DIR, DEVICE, RESULTS)
+    if HTTP_POOL_ENABLED and PooledExecutor.metrics()["latency"]:
+        print("\n" + PooledExecutor.format_report())
+    # Every session has quit by now; close the shared keep-alive connections
+    PooledExecutor.close_all()
+    if TRACER and TRACER.events:
+        TRACER.save(os.path.join(REPORTS_DIR, f"trace_fixture_{DevicePool.worker_id()}.json"))
+        print("\n" + TRACER.summary())
+    if not hasattr(session.config, "workerinput"):
+        # Controller (or a plain run): merge per-device results into one report
+        print("\n" + DevicePool.format_report(DevicePool.merge_reports(REPORTS_DIR)))
+
+
+def _broker_session(server_url, options, executor=None):
+    """Lease a warm session from the broker, or None if it is disabled or unreachable"""
+    if not SESSION_BROKER_ADDRESS:
+        return None, None
+    from login.helpers.session_broker import BrokerClient, parse_address
+    try:
+        broker = BrokerClient(parse_address(SESSION_BROKER_ADDRESS), SESSION_BROKER_AUTHKEY.encode())
+        return broker, broker.acquire(server_url, options, executor)
+    except (OSError, RuntimeError) as e:
+        print(f"⚠ Session broker unavailable, starting a new session: {e}")
+        return None, None
 
 
 @pytest.fixture(scope="session")
 def driver():
+    server_url = DEVICE.get("appium_url", APPIUM_SERVER_URL) if DEVICE else APPIUM_SERVER_URL
+    executor = server_url
+    if HTTP_POOL_ENABLED:
+        PooledExecutor.configure(HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_CONNECT_TIMEOUT, HTTP_COMMAND_TIMEOUT,
+                                 HTTP_COMMAND_TIMEOUTS)
+        executor = PooledExecutor.for_server(server_url)
+    broker = None
     try:
         # Try Appium 2.x API (newer version)
         from appium.options.android import UiAutomator2Options
         options = UiAutomator2Options()
         for key, value in APPIUM_CAPS.items():
             options.set_capability(key, value)
-        driver = webdriver.Remote(
-            command_executor=APPIUM_SERVER_URL,
-            options=options,
-        )
+        if DEVICE:
+            DevicePool.apply(options, DEVICE)
+        broker, driver = _broker_session(server_url, options, executor)
+        if not broker:
+            driver = webdriver.Remote(
+                command_executor=executor,
+                options=options,
+            )
     except ImportError:
         # Fallback to Appium 1.x API (older version)
+        caps = dict(APPIUM_CAPS)
+        if DEVICE:
+            caps.update({cap: DEVICE[key] for key, cap in DevicePool.CAPABILITY_KEYS.items() if key in DEVICE})
         driver = webdriver.Remote(
-            command_executor=APPIUM_SERVER_URL,
-            desired_capabilities=APPIUM_CAPS,
+            command_executor=server_url,
+            desired_capabilities=caps,
         )
 
-    driver.implicitly_wait(5)
+    if TRACER:
+        TRACER.install()
+        TRACER.attach(driver)
+    # No implicit wait: helpers wait explicitly under the per-test WaitBudget
+    driver.implicitly_wait(0)
     yield driver
-    driver.quit()
+    if TRACER:
+        TRACER.uninstall()
+    if broker:
+        broker.release(driver)
+        broker.close()
+    else:
+        driver.quit()
+
+
+@pytest.fixture(autouse=True)
+def trace_test_name(request):
+    """Attribute traced commands to the running test"""
+    if TRACER:
+        TRACER.set_test(request.node.nodeid)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def wait_budget(request):
+    """Fresh wait budget per test for tests using the driver fixture (unittest tests attach their own)"""
+    if "driver" in request.fixturenames:
+        WaitBudget.attach(request.getfixturevalue("driver"), TEST_WAIT_BUDGET, request.node.nodeid)
+    yield
+
 
+@pytest.fixture
+def logged_in_driver(driver):
+    """Driver on an authenticated screen; logs in through the UI only if needed"""
+    if not AuthHelpers.ensure_logged_in(driver, VALID_EMAIL, VALID_PASSWORD):
+        pytest.fail("Could not reach a logged-in state")
+    return driver
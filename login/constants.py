@@ -32,3 +32,19 @@ SELECTORS = {
     "forgot_password_screen_id": os.getenv("FORGOT_SCREEN_ID", "com.qompliai.mobile:id/forgot_password_title"),
 }
 
+# ============================================
+# Central reusable mapping for all menu titles
+# ============================================
+MENU_TITLES = {
+    "Dashboard": "//android.widget.TextView[@text='Dashboard']",
+    "Properties": "(//android.widget.TextView[@text='Properties'])[1]",
+    "Inspections": "(//android.widget.TextView[@text='Inspections'])[1]",
+    "Violations": "(//android.widget.TextView[@text='Violations'])[1]",
+    "Non-Compliant": "//android.widget.TextView[@text='Non-Compliant']",
+    "Contracts": "(//android.widget.TextView[@text='Contracts'])[1]",
+    "Marketplace": "(//android.widget.TextView[@text='Marketplace'])[1]",
+    "Payment History": "(//android.widget.TextView[@text='Payment History'])[1]",
+    "Job Filing": "(//android.widget.TextView[@text='Job Filing'])[1]",
+    "QompliGov AI": "(//android.widget.TextView[@text='QompliGov AI'])[1]",
+    "Settings": "//android.widget.TextView[@text='Qompliai']"
+}
@@ -0,0 +1,489 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from lxml import etree
+
+SCREENS_DIR = os.path.join(os.path.dirname(__file__), "screens")
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+APP_PACKAGE = "com.qompli.app"
+
+
+class FakeAppiumServer:
+    """
+    Offline stand-in for an Appium/UiAutomator2 server, for benchmarking helpers without a phone.
+
+    Serves the recorded hierarchies in screens/*.xml and moves between them on
+    click according to screens/transitions.json. Supports find (xpath, id,
+    class name, accessibility id, -android uiautomator), click, clear, send_keys, text, attribute,
+    screenshot, page_source, timeouts (implicit waits are honoured) and a few
+    `mobile:` commands (deep links use qompli://<screen>; performance data and gfxinfo follow screen changes). Every command can be given an artificial latency, and
+    a new screen can be held back for appear_delay seconds after a transition. XPath finds can additionally
+    cost xpath_node_cost seconds per hierarchy node, as UiAutomator2 serializes the whole tree to evaluate them.
+    Texts with {Field} placeholders show the values submitted by the last click and blank out once such a
+    field is edited again, like a browser's validation bubble. A transition rule's then_toast/else_toast shows an android.widget.Toast for toast_duration seconds.
+    With list_length set, each screen's scrollable container holds that many rows (the recorded rows
+    repeated, texts numbered) and `mobile: scrollGesture` pages through them.
+
+    Command counts are kept in `stats` and served at GET /fake/stats.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 command_latency: Optional[Dict[str, float]] = None, appear_delay: float = 0.0,
+                 start_screen: str = "sign_in", screens_dir: str = SCREENS_DIR, xpath_node_cost: float = 0.0,
+                 list_length: int = 0, toast_duration: float = 2.0):
+        self.latency = latency
+        self.toast_duration = toast_duration
+        self.list_length = list_length
+        self.xpath_node_cost = xpath_node_cost
+        # Keys are command names ("page_source") or "find_element:<strategy>"
+        self.command_latency = command_latency or {}
+        self.appear_delay = appear_delay
+        self.start_screen = start_screen
+        self.screens = {}
+        for filename in os.listdir(screens_dir):
+            if filename.endswith(".xml"):
+                self.screens[filename[:-4]] = etree.parse(os.path.join(screens_dir, filename)).getroot()
+        with open(os.path.join(screens_dir, "transitions.json"), "r", encoding="utf-8") as f:
+            self.transitions = json.load(f)
+        self.stats = Counter()
+        self.sessions: Dict[str, Dict] = {}
+        self.lock = threading.RLock()
+        self.reset()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAppiumServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self, screen: Optional[str] = None):
+        """Go to the start screen (or the given one) with empty form fields; sessions are kept"""
+        with self.lock:
+            self.screen = screen or self.start_screen
+            self.previous_screen = self.screen
+            self.ready_at = 0.0
+            self.scroll_offset = 0
+            self.toast: Optional[Tuple[str, float]] = None
+            self.submitted: Dict[str, str] = {}
+            self.fields: Dict[str, str] = {}
+            self.elements: Dict[str, Tuple[str, str]] = {}
+            self.visits = 0
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    # ----------------------------
+    # Screen model
+    # ----------------------------
+    @staticmethod
+    def field_key(node) -> str:
+        return node.get("resource-id") or node.get("hint") or ""
+
+    def current_tree(self):
+        """Current hierarchy with typed values applied; empty while the screen is still appearing"""
+        if time.time() < self.ready_at:
+            return etree.fromstring(b'<hierarchy index="0" class="hierarchy" rotation="0" />')
+        tree = etree.fromstring(etree.tostring(self.screens[self.screen]))
+        for node in tree.iter("android.widget.EditText"):
+            value = self.fields.get(FakeAppiumServer.field_key(node), "")
+            node.set("text", "•" * len(value) if node.get("password") == "true" else value)
+        for node in tree.iter():
+            text = node.get("text") or ""
+            names = re.findall(r"\{(\w+)\}", text)
+            if names:
+                fresh = all(self.fields.get(name, "") == self.submitted.get(name) for name in names)
+                node.set("text", re.sub(r"\{(\w+)\}", lambda m: self.submitted.get(m.group(1), ""), text) if fresh else "")
+        if self.list_length:
+            self._render_list(tree)
+        if self.toast and time.time() < self.toast[1]:
+            etree.SubElement(tree, "android.widget.Toast", {
+                "index": "1", "package": "com.android.settings", "class": "android.widget.Toast", "text": self.toast[0],
+                "displayed": "true", "bounds": "[240,2000][840,2100]",
+            })
+        return tree
+
+    @staticmethod
+    def _shift(node, dy: int):
+        for child in node.iter():
+            match = re.match(r"\[(\d+),(\d+)\]\[(\d+),(\d+)\]", child.get("bounds", ""))
+            if match:
+                x1, y1, x2, y2 = (int(v) for v in match.groups())
+                child.set("bounds", f"[{x1},{y1 + dy}][{x2},{y2 + dy}]")
+
+    @staticmethod
+    def _top(node) -> int:
+        return int(re.match(r"\[\d+,(\d+)\]", node.get("bounds")).group(1))
+
+    def _render_list(self, tree):
+        """Show rows scroll_offset.. of a list_length-row list in the recorded row slots"""
+        container = next(iter(tree.xpath("//*[@scrollable='true']")), None)
+        rows = list(container) if container is not None else []
+        if not rows:
+            return
+        templates = [etree.fromstring(etree.tostring(row)) for row in rows]
+        for slot, row in enumerate(rows):
+            index = self.scroll_offset + slot
+            if index >= self.list_length:
+                container.remove(row)
+                continue
+            item = etree.fromstring(etree.tostring(templates[index % len(rows)]))
+            if index >= len(rows):
+                for node in item.iter():
+                    if node.get("text"):
+                        node.set("text", f"{node.get('text')} #{index + 1}")
+            FakeAppiumServer._shift(item, FakeAppiumServer._top(row) - FakeAppiumServer._top(item))
+            item.set("index", row.get("index"))
+            container.replace(row, item)
+
+    def scroll(self, direction: str, percent: float) -> bool:
+        """Move the list by about percent of a page (one row overlaps); True if it can scroll further"""
+        container = next(iter(self.screens[self.screen].xpath("//*[@scrollable='true']")), None)
+        visible = len(container) if container is not None else 0
+        length = max(self.list_length, visible)
+        step = max(1, int(visible * percent) - 1)
+        last = max(0, length - visible)
+        self.scroll_offset = min(last, max(0, self.scroll_offset + (step if direction == "down" else -step)))
+        return self.scroll_offset < last if direction == "down" else self.scroll_offset > 0
+
+    def go_to(self, screen: str):
+        if screen == "@back":
+            screen = self.previous_screen
+            self.submitted = {}
+        if screen == self.start_screen:
+            self.fields.clear()
+        self.previous_screen, self.screen = self.screen, screen
+        self.visits += 1
+        self.scroll_offset = 0
+        self.ready_at = time.time() + self.appear_delay
+
+    def transition(self, node):
+        rules = self.transitions.get(self.screen, {})
+        rule = rules.get(node.get("content-desc") or "") or rules.get(node.get("text") or "")
+        if rule is None or node.get("clickable") != "true":
+            return
+        toast = None
+        self.submitted = dict(self.fields)
+        if isinstance(rule, dict):
+            value = self.fields.get(rule["field"], "")
+            branch = "then" if value and rule["contains"] in value else "else"
+            rule, toast = rule[branch], rule.get(f"{branch}_toast")
+        self.go_to(rule)
+        if toast:
+            self.toast = (toast, self.ready_at + self.toast_duration)
+
+    @staticmethod
+    def to_xpath(using: str, value: str) -> str:
+        if using == "xpath":
+            return value
+        if using == "id":
+            return f"//*[@resource-id='{value}']"
+        if using == "accessibility id":
+            return f"//*[@content-desc='{value}']"
+        if using == "class name":
+            return f"//{value}"
+        if using == "-android uiautomator":
+            return FakeAppiumServer.uiselector_to_xpath(value)
+        raise ValueError(f"Unsupported locator strategy: {using}")
+
+    # UiSelector method -> XPath predicate template
+    UISELECTOR_PREDICATES = {
+        "text": "@text={}", "textContains": "contains(@text, {})",
+        "description": "@content-desc={}", "descriptionContains": "contains(@content-desc, {})",
+        "resourceId": "@resource-id={}", "className": "@class={}",
+    }
+
+    @staticmethod
+    def uiselector_to_xpath(value: str) -> str:
+        """XPath equivalent of a `new UiSelector()...` chain (the subset SelectorCompiler emits)"""
+        predicates, instance = [], None
+        for method, string, number in re.findall(r'\.(\w+)\((?:"((?:[^"\\]|\\.)*)"|(\d+))\)', value):
+            if method == "instance":
+                instance = int(number)
+            elif method in FakeAppiumServer.UISELECTOR_PREDICATES:
+                literal = re.sub(r"\\(.)", r"\1", string)
+                quoted = f"'{literal}'" if "'" not in literal else f'"{literal}"'
+                predicates.append(FakeAppiumServer.UISELECTOR_PREDICATES[method].format(quoted))
+            else:
+                raise _CommandError(400, "invalid selector", f"Unsupported UiSelector method: {method}")
+        xpath = "//*" + "".join(f"[{p}]" for p in predicates)
+        return xpath if instance is None else f"({xpath})[{instance + 1}]"
+
+    def find(self, session: Dict, using: str, value: str) -> list:
+        """Return element ids, polling until the session's implicit wait runs out"""
+        xpath = FakeAppiumServer.to_xpath(using, value)
+        if using == "xpath" and self.xpath_node_cost:
+            with self.lock:
+                nodes = sum(1 for _ in self.current_tree().iter())
+            time.sleep(nodes * self.xpath_node_cost)
+        end_time = time.time() + session["implicit"]
+        while True:
+            with self.lock:
+                tree = self.current_tree()
+                nodes = [n for n in tree.xpath(xpath) if isinstance(n, etree._Element)]
+                if nodes:
+                    return [self._register(tree, node) for node in nodes]
+            if time.time() >= end_time:
+                return []
+            time.sleep(0.05)
+
+    def _register(self, tree, node) -> str:
+        path = tree.getroottree().getpath(node)
+        element_id = hashlib.sha1(f"{self.screen}:{path}".encode()).hexdigest()[:16]
+        self.elements[element_id] = (self.screen, path)
+        return element_id
+
+    def node(self, element_id: str):
+        """Resolve an element id on the current screen, or None if it went stale"""
+        screen, path = self.elements.get(element_id, (None, None))
+        if screen != self.screen or time.time() < self.ready_at:
+            return None
+        found = self.current_tree().getroottree().xpath(path)
+        return found[0] if found else None
+
+    def screenshot(self) -> str:
+        """Base64 PNG: a downscaled grey rendering of the current screen's node bounds"""
+        width, height, scale = 108, 234, 10
+        pixels = bytearray(width * height)
+        for node in self.current_tree().iter():
+            match = re.match(r"\[(\d+),(\d+)\]\[(\d+),(\d+)\]", node.get("bounds", ""))
+            if not match:
+                continue
+            x1, y1, x2, y2 = (int(v) // scale for v in match.groups())
+            shade = hashlib.md5((node.get("text") or node.tag).encode()).digest()[0]
+            for y in range(y1, min(y2, height)):
+                pixels[y * width + x1:y * width + min(x2, width)] = bytes([shade]) * (min(x2, width) - x1)
+        raw = b"".join(b"\x00" + bytes(pixels[y * width:(y + 1) * width]) for y in range(height))
+
+        def chunk(kind, data):
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        png = (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+               + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+        return base64.b64encode(png).decode()
+
+    def execute_mobile(self, script: str, args: Dict):
+        if script == "mobile: getCurrentPackage":
+            return APP_PACKAGE
+        if script in ("mobile: activateApp", "mobile: hideKeyboard"):
+            return None
+        if script == "mobile: deepLink":
+            # qompli://<screen file name>, e.g. qompli://payment_history
+            screen = args.get("url", "").split("://", 1)[-1]
+            if screen not in self.screens:
+                raise _CommandError(400, "invalid argument", f"Unknown deep link {args.get('url')}")
+            with self.lock:
+                self.go_to(screen)
+            return None
+        if script == "mobile: getPerformanceData":
+            return self.performance_data(args.get("dataType", ""))
+        if script == "mobile: shell" and args.get("command") == "dumpsys" and args.get("args", [])[:1] == ["gfxinfo"]:
+            # 60 frames per screen change, one of them janky
+            with self.lock:
+                return f"Total frames rendered: {self.visits * 60}\nJanky frames: {self.visits} ({100.0 / 60:.2f}%)\n"
+        if script == "mobile: scrollGesture":
+            with self.lock:
+                return self.scroll(args.get("direction", "down"), float(args.get("percent", 1.0)))
+        if script == "mobile: replaceElementValue":
+            with self.lock:
+                node = self.node(args.get("elementId", ""))
+                if node is None:
+                    raise _CommandError(404, "stale element reference", args.get("elementId", ""))
+                self.fields[FakeAppiumServer.field_key(node)] = args.get("text", "")
+            return None
+        raise KeyError(script)
+
+    def performance_data(self, data_type: str):
+        """getPerformanceData tables: CPU is busy for a second after a screen change, PSS grows 256 KB per change"""
+        with self.lock:
+            busy = time.time() < self.ready_at - self.appear_delay + 1.0
+            if data_type == "cpuinfo":
+                return [["user", "kernel"], ["18.5" if busy else "2.0", "6.0" if busy else "1.0"]]
+            if data_type == "memoryinfo":
+                pss = 90000 + self.visits * 256
+                return [["totalPrivateDirty", "nativePrivateDirty", "dalvikPrivateDirty", "totalPss", "nativePss",
+                         "dalvikPss", "nativeHeapAllocatedSize", "nativeHeapSize"],
+                        [str(pss - 8000), "20000", "12000", str(pss), "30000", "18000", str(24000 + self.visits * 64),
+                         "32768"]]
+        raise _CommandError(400, "invalid argument", f"Unsupported data type {data_type}")
+
+    # ----------------------------
+    # W3C command dispatch
+    # ----------------------------
+    def handle(self, method: str, path: str, body: Dict) -> Tuple[int, object]:
+        parts = [p for p in path.split("/") if p]
+        if parts == ["status"]:
+            return 200, {"ready": True, "message": "fake appium"}
+        if parts == ["fake", "stats"]:
+            return 200, dict(self.stats)
+        if parts == ["session"] and method == "POST":
+            return self.command("new_session", None, self._new_session, body)
+        if len(parts) < 2 or parts[0] != "session":
+            return 404, _error("unknown command", path)
+        session = self.sessions.get(parts[1])
+        if session is None:
+            return 404, _error("invalid session id", parts[1])
+        rest = parts[2:]
+        if not rest and method == "DELETE":
+            return self.command("delete_session", None, lambda: self.sessions.pop(parts[1]) and None)
+        if rest == ["timeouts"]:
+            if method == "POST" and "implicit" in body:
+                session["implicit"] = body["implicit"] / 1000.0
+            return self.command("timeouts", None, lambda: None if method == "POST" else {"implicit": session["implicit"] * 1000})
+        if rest == ["source"]:
+            return self.command("page_source", None, lambda: etree.tostring(self.current_tree(), encoding="unicode"))
+        if rest == ["screenshot"]:
+            return self.command("screenshot", None, self.screenshot)
+        if rest in (["element"], ["elements"]):
+            name = "find_element" if rest == ["element"] else "find_elements"
+            return self.command(name, body.get("using"), self._find, session, body, rest == ["element"])
+        if rest == ["back"]:
+            return self.command("back", None, self._back)
+        if rest in (["execute", "sync"], ["execute"]):
+            return self.command("execute", None, self._execute, body)
+        if len(rest) >= 3 and rest[0] == "element":
+            return self._element_command(method, rest[1], rest[2:], body)
+        return 404, _error("unknown command", path)
+
+    def command(self, name: str, strategy: Optional[str], func, *args) -> Tuple[int, object]:
+        self.stats[name] += 1
+        delay = self.command_latency.get(f"{name}:{strategy}", self.command_latency.get(name, self.latency))
+        if delay:
+            time.sleep(delay)
+        try:
+            result = func(*args)
+        except _CommandError as e:
+            return e.status, _error(e.error, e.message)
+        return 200, result
+
+    def _new_session(self, body):
+        session_id = uuid.uuid4().hex
+        capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+        self.sessions[session_id] = {"implicit": 0.0}
+        return {"sessionId": session_id, "capabilities": capabilities}
+
+    def _find(self, session, body, single):
+        ids = self.find(session, body.get("using"), body.get("value"))
+        if single:
+            if not ids:
+                raise _CommandError(404, "no such element", f"{body.get('using')}: {body.get('value')}")
+            return {ELEMENT_KEY: ids[0], "ELEMENT": ids[0]}
+        return [{ELEMENT_KEY: i, "ELEMENT": i} for i in ids]
+
+    def _back(self):
+        with self.lock:
+            self.go_to("@back")
+
+    def _execute(self, body):
+        args = body.get("args") or [{}]
+        try:
+            return self.execute_mobile(body.get("script", ""), args[0] if args else {})
+        except KeyError as e:
+            raise _CommandError(404, "unknown method", f"Unsupported script {e}")
+
+    def _element_command(self, method: str, element_id: str, rest: list, body: Dict) -> Tuple[int, object]:
+        name = {"click": "click", "value": "send_keys", "clear": "clear", "text": "text",
+                "attribute": "attribute", "displayed": "attribute", "enabled": "attribute"}.get(rest[0])
+        if name is None:
+            return 404, _error("unknown command", "/".join(rest))
+
+        def run():
+            with self.lock:
+                node = self.node(element_id)
+                if node is None:
+                    raise _CommandError(404, "stale element reference", element_id)
+                if name == "click":
+                    self.transition(node)
+                elif name == "send_keys":
+                    key = FakeAppiumServer.field_key(node)
+                    self.fields[key] = self.fields.get(key, "") + (body.get("text") or "".join(body.get("value", [])))
+                elif name == "clear":
+                    self.fields[FakeAppiumServer.field_key(node)] = ""
+                elif name == "text":
+                    return node.get("text") or ""
+                elif rest[0] == "attribute":
+                    return node.get(rest[1])
+                else:
+                    return node.get(rest[0]) == "true"
+                return None
+
+        return self.command(name, None, run)
+
+
+class _CommandError(Exception):
+    def __init__(self, status: int, error: str, message: str):
+        super().__init__(message)
+        self.status, self.error, self.message = status, error, message
+
+
+def _error(error: str, message: str) -> Dict:
+    return {"error": error, "message": message, "stacktrace": ""}
+
+
+def _make_handler(server: FakeAppiumServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _dispatch(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            body = json.loads(raw) if raw else {}
+            status, value = server.handle(method, self.path.split("?")[0], body)
+            payload = json.dumps({"value": value}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline fake Appium server")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every command")
+    parser.add_argument("--appear-delay", type=float, default=0.0, help="seconds before a new screen appears")
+    parser.add_argument("--start-screen", default="sign_in")
+    parser.add_argument("--list-length", type=int, default=0, help="rows in each scrollable list")
+    parser.add_argument("--xpath-node-cost", type=float, default=0.0, help="seconds per hierarchy node added to XPath finds")
+    args = parser.parse_args()
+    fake = FakeAppiumServer(port=args.port, latency=args.latency, appear_delay=args.appear_delay,
+                            start_screen=args.start_screen, xpath_node_cost=args.xpath_node_cost,
+                            list_length=args.list_length)
+    print(f"✓ Fake Appium server on {fake.url} (screens: {', '.join(sorted(fake.screens))})")
+    fake.httpd.serve_forever()
@@ -0,0 +1,175 @@
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class AdaptiveTimeouts:
+    """
+    Per-target wait timeouts learned from how long each target took to appear, per app version.
+
+    A target is a selector list (see key_for) or a screen (see screen). Every
+    successful wait records its latency; once a target has min_samples, its
+    timeout is the chosen percentile of the recent window times factor plus
+    margin, clamped to [floor, ceiling]. Timed-out waits are only counted:
+    a negative check says nothing about how long the target takes to appear.
+    A timed-out wait for a target that should be there (expected=True) is a
+    censored sample instead: the target took longer than the wait, so the
+    target's timeout never drops below twice that wait again.
+    Learned values only shorten negative checks; a wait for a target that
+    should appear gets at least the caller's timeout. Manual overrides always
+    win over learned values.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: str, app_version: str = "unknown", percentile: int = 95, factor: float = 1.5,
+                 margin: float = 0.5, floor: float = 0.5, ceiling: float = 30.0, min_samples: int = 5,
+                 window: int = 50, overrides: Optional[Dict[str, float]] = None, max_versions: int = 5):
+        self.path = path
+        self.app_version = app_version
+        self.percentile = percentile
+        self.factor = factor
+        self.margin = margin
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.window = window
+        self.overrides = dict(overrides or {})
+        self.max_versions = max_versions
+        self.versions = self._load()
+        self.version = self.versions.setdefault(app_version, {"last_used": time.time(), "targets": {}})
+        # What this process recorded since loading, merged into the file on save
+        self.pending: Dict[str, Dict] = {}
+
+    @staticmethod
+    def key_for(selectors: List[Tuple]) -> str:
+        """Target key of a selector list: 'by|selector' entries joined in list order"""
+        return " || ".join(f"{by}|{selector}" for by, selector in selectors)
+
+    @staticmethod
+    def screen(name: str) -> str:
+        return f"screen:{name}"
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("schema") != AdaptiveTimeouts.SCHEMA_VERSION:
+            print(f"⚠ Discarding learned timeouts with schema {data.get('schema')}: {self.path}")
+            return {}
+        return data.get("versions", {})
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def record(self, target: str, latency: float, found: bool = True, expected: bool = False):
+        """One wait on target: found after latency seconds, or timed out (widening it if it was expected)"""
+        now = time.time()
+        self.version["last_used"] = now
+        entry = {"samples": [], "misses": 0, "last_seen": now}
+        if found:
+            entry["samples"].append(round(latency, 3))
+        else:
+            entry["misses"] = 1
+            if expected:
+                entry["widened"] = min(self.ceiling, round(2 * latency, 3))
+        for targets in (self.version["targets"], self.pending):
+            self._merge(targets.setdefault(target, {"samples": [], "misses": 0, "last_seen": now}), entry)
+
+    def _merge(self, entry: Dict, new: Dict):
+        """Add new's samples, misses and widening to entry"""
+        entry["samples"] = (entry["samples"] + new["samples"])[-self.window:]
+        entry["misses"] += new["misses"]
+        entry["last_seen"] = max(entry["last_seen"], new["last_seen"])
+        if new.get("widened"):
+            entry["widened"] = max(entry.get("widened", 0.0), new["widened"])
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def _quantile(self, samples: List[float]) -> float:
+        if len(samples) < 2:
+            return samples[0]
+        return statistics.quantiles(samples, n=100, method="inclusive")[self.percentile - 1]
+
+    def learned(self, target: str) -> Optional[float]:
+        """Learned timeout for target, None until it has min_samples"""
+        entry = self.version["targets"].get(target)
+        if not entry or len(entry["samples"]) < self.min_samples:
+            return None
+        value = self._quantile(entry["samples"]) * self.factor + self.margin
+        return min(self.ceiling, max(self.floor, entry.get("widened", 0.0), value))
+
+    def timeout(self, target: str, default: float, expected: bool = False) -> float:
+        """
+        Override, else learned value, else default (widened after expected misses).
+        For an expected target the learned value can only lengthen the default: a screen that is
+        usually fast still gets the caller's full timeout on a slow run.
+        """
+        if target in self.overrides:
+            return self.overrides[target]
+        learned = self.learned(target)
+        if learned is None:
+            return max(default, self.version["targets"].get(target, {}).get("widened", 0.0))
+        return max(default, learned) if expected else learned
+
+    def override(self, target: str, seconds: Optional[float]):
+        """Pin a target's timeout (None removes the override)"""
+        if seconds is None:
+            self.overrides.pop(target, None)
+        else:
+            self.overrides[target] = seconds
+
+    def format_report(self) -> str:
+        lines = [f"Learned timeouts for app version {self.app_version} "
+                 f"(p{self.percentile} x {self.factor} + {self.margin}s, min {self.min_samples} samples):"]
+        for target, entry in sorted(self.version["targets"].items()):
+            samples = entry["samples"]
+            p = f"{self._quantile(samples):6.2f}s" if samples else "     -"
+            if target in self.overrides:
+                value = f"{self.overrides[target]:6.2f}s override"
+            else:
+                learned = self.learned(target)
+                value = f"{learned:6.2f}s" if learned is not None else "     - (default)"
+            widened = f" (at least {entry['widened']:.2f}s after a miss)" if entry.get("widened") else ""
+            lines.append(f"  {len(samples):>4} ok {entry['misses']:>3} missed  p{self.percentile} {p}  "
+                         f"timeout {value}{widened}  {target}")
+        for target in sorted(set(self.overrides) - set(self.version["targets"])):
+            lines.append(f"     0 ok   0 missed             timeout {self.overrides[target]:6.2f}s override  {target}")
+        return "\n".join(lines)
+
+    def save(self):
+        """
+        Merge what this process recorded into the file as it is now (parallel workers save the same
+        file), keep only the most recently used app versions and write atomically
+        """
+        versions = self._load()
+        version = versions.setdefault(self.app_version, {"last_used": 0.0, "targets": {}})
+        version["last_used"] = max(version["last_used"], self.version["last_used"])
+        for target, entry in self.pending.items():
+            self._merge(version["targets"].setdefault(target, {"samples": [], "misses": 0, "last_seen": 0.0}), entry)
+        self.versions, self.version, self.pending = versions, version, {}
+        newest = sorted(self.versions, key=lambda v: self.versions[v]["last_used"], reverse=True)
+        for old in newest[self.max_versions:]:
+            del self.versions[old]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Unique temp file: parallel workers save the same timeouts file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"schema": AdaptiveTimeouts.SCHEMA_VERSION, "versions": self.versions}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠ Failed to save learned timeouts: {e}")
+
+
+if __name__ == "__main__":
+    # python helpers/adaptive_timeouts.py <timeouts file> [app version]
+    timeouts = AdaptiveTimeouts(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "unknown")
+    print(timeouts.format_report())
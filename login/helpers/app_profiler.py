@@ -0,0 +1,279 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from selenium.common.exceptions import InvalidArgumentException, UnknownMethodException, WebDriverException
+from appium.webdriver.webdriver import WebDriver
+
+# Columns of each time series; frames/janky_frames are the app's cumulative gfxinfo counters
+COLUMNS = ["t", "cpu", "pss_kb", "heap_kb", "frames", "janky_frames"]
+OUTSIDE_STEPS = "(outside steps)"
+
+
+class AppProfiler:
+    """
+    Background sampler of the app's CPU, memory and frame stats, attributed to test steps.
+
+    Every `interval` seconds it reads `mobile: getPerformanceData` (cpuinfo,
+    memoryinfo) for the package and, when frame_stats is on, `dumpsys gfxinfo`
+    through `mobile: shell` (needs the server's adb_shell feature; turned off
+    after the first refusal). Samples are appended to the segment of whatever
+    test and step is current, one compact column list per metric:
+
+        profiler.begin_test(self.id())
+        with profiler.step("navigate to Properties", screen="Properties"):
+            ...
+
+    summary() aggregates the segments per screen: CPU mean/peak, PSS peak and
+    growth across the screen's segments, frames rendered and janky-frame
+    share. compare() flags screens that regressed against a saved baseline.
+    """
+
+    SCHEMA_VERSION = 1
+    TOTAL_FRAMES = re.compile(r"Total frames rendered:\s*(\d+)")
+    JANKY_FRAMES = re.compile(r"Janky frames:\s*(\d+)")
+    # Appium refuses "mobile: shell" unless started with --allow-insecure adb_shell
+    INSECURE_FEATURE = "insecure feature"
+
+    def __init__(self, driver: WebDriver, package: str, interval: float = 1.0, frame_stats: bool = True):
+        self.driver = driver
+        self.package = package
+        self.interval = interval
+        self.frame_stats = frame_stats
+        self.data_types = ["cpuinfo", "memoryinfo"]
+        self.segments: List[Dict] = []
+        self.segment: Optional[Dict] = None
+        self.test = OUTSIDE_STEPS
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.errors = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> "AppProfiler":
+        if self.thread is None:
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="app-profiler", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join(timeout=10)
+            self.thread = None
+
+    def _open(self, test: str, step: str, screen: str):
+        with self.lock:
+            self.segment = {"test": test, "step": step, "screen": screen, "start": round(time.time() - self.started, 3),
+                            **{column: [] for column in COLUMNS}}
+            self.segments.append(self.segment)
+
+    def begin_test(self, test: str):
+        """Attribute the following samples to this test (outside any step)"""
+        self.test = test
+        self._open(test, OUTSIDE_STEPS, OUTSIDE_STEPS)
+
+    @contextmanager
+    def step(self, name: str, screen: Optional[str] = None):
+        """Attribute samples taken inside the block to this step and screen, plus one sample at each end"""
+        self._open(self.test, name, screen or OUTSIDE_STEPS)
+        self.sample()
+        try:
+            yield
+        finally:
+            self.sample()
+            self._open(self.test, OUTSIDE_STEPS, OUTSIDE_STEPS)
+
+    def _run(self):
+        while not self.stopping.is_set():
+            started = time.time()
+            try:
+                self.sample()
+            except Exception:
+                # Never let one bad sample end the sampler for the rest of the run
+                self.errors += 1
+            self.stopping.wait(max(0.0, self.interval - (time.time() - started)))
+
+    # ----------------------------
+    # Sampling
+    # ----------------------------
+    @staticmethod
+    def _row(table: List[List[str]]) -> Dict[str, float]:
+        """{header: value} from getPerformanceData's [[headers], [values]] table; unparsable values are skipped"""
+        if not table or len(table) < 2:
+            return {}
+        row = {}
+        for name, value in zip(table[0], table[1]):
+            try:
+                row[name] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return row
+
+    def _read(self, data_type: str) -> Dict[str, float]:
+        try:
+            return AppProfiler._row(self.driver.execute_script(
+                "mobile: getPerformanceData", {"packageName": self.package, "dataType": data_type}
+            ))
+        except (UnknownMethodException, InvalidArgumentException):
+            # The test thread (step()) and the sampler can both hit this for the same data type
+            with self.lock:
+                if data_type in self.data_types:
+                    print(f"⚠ Profiler: {data_type} is not available, no longer sampled")
+                    self.data_types.remove(data_type)
+        except Exception:
+            # WebDriverException, or a transport error (urllib3 read timeout, refused connection) arriving unwrapped
+            self.errors += 1
+        return {}
+
+    def _read_frames(self) -> Dict[str, float]:
+        try:
+            output = self.driver.execute_script("mobile: shell", {"command": "dumpsys", "args": ["gfxinfo", self.package]})
+        except Exception as e:
+            refused = isinstance(e, (UnknownMethodException, InvalidArgumentException)) or (
+                isinstance(e, WebDriverException) and AppProfiler.INSECURE_FEATURE in str(e).lower())
+            if not refused:
+                # Any other driver or transport error is transient: keep frame stats on
+                self.errors += 1
+                return {}
+            print(f"⚠ Profiler: frame stats unavailable (start Appium with --allow-insecure adb_shell): "
+                  f"{str(e).strip().splitlines()[0]}")
+            self.frame_stats = False
+            return {}
+        frames, janky = AppProfiler.TOTAL_FRAMES.search(output or ""), AppProfiler.JANKY_FRAMES.search(output or "")
+        return {"frames": float(frames.group(1)) if frames else None,
+                "janky_frames": float(janky.group(1)) if janky else None}
+
+    def sample(self):
+        """Take one sample now and append it to the current segment (safe from any thread)"""
+        # The segment current when the sample starts: a step may open the next one while the reads are in flight
+        with self.lock:
+            segment = self.segment
+        now = time.time() - self.started
+        values = {"t": round(now, 3)}
+        for data_type in list(self.data_types):
+            row = self._read(data_type)
+            if data_type == "cpuinfo" and row:
+                values["cpu"] = round(row.get("user", 0.0) + row.get("kernel", 0.0), 1)
+            elif data_type == "memoryinfo" and row:
+                values["pss_kb"] = row.get("totalPss")
+                values["heap_kb"] = row.get("nativeHeapAllocatedSize")
+        if self.frame_stats:
+            values.update(self._read_frames())
+        with self.lock:
+            if segment is None:
+                segment = self.segment
+            if segment is None:
+                segment = self.segment = {"test": self.test, "step": OUTSIDE_STEPS, "screen": OUTSIDE_STEPS,
+                                          "start": values["t"], **{column: [] for column in COLUMNS}}
+                self.segments.append(segment)
+            for column in COLUMNS:
+                value = values.get(column)
+                segment[column].append(int(value) if column not in ("t", "cpu") and value is not None else value)
+
+    # ----------------------------
+    # Reporting
+    # ----------------------------
+    def _copy(self) -> List[Dict]:
+        """Segments that have samples, copied so the sampler can keep appending"""
+        with self.lock:
+            return [{key: list(value) if isinstance(value, list) else value for key, value in segment.items()}
+                    for segment in self.segments if segment["t"]]
+
+    @staticmethod
+    def _values(segments: List[Dict], column: str) -> List[float]:
+        return [v for s in segments for v in s[column] if v is not None]
+
+    @staticmethod
+    def _delta(segments: List[Dict], column: str) -> int:
+        """Sum over segments of the increase of a cumulative counter (a reset counts from zero)"""
+        total = 0
+        for segment in segments:
+            values = [v for v in segment[column] if v is not None]
+            for previous, current in zip(values, values[1:]):
+                total += current - previous if current >= previous else current
+        return total
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per screen: samples, CPU mean/max, PSS first/last/max (KB) and growth, frames, janky share"""
+        segments = self._copy()
+        screens = {}
+        for screen in sorted({s["screen"] for s in segments}):
+            mine = [s for s in segments if s["screen"] == screen]
+            cpu, pss = AppProfiler._values(mine, "cpu"), AppProfiler._values(mine, "pss_kb")
+            frames, janky = AppProfiler._delta(mine, "frames"), AppProfiler._delta(mine, "janky_frames")
+            screens[screen] = {
+                "segments": len(mine),
+                "samples": sum(len(s["t"]) for s in mine),
+                "cpu_mean": round(sum(cpu) / len(cpu), 1) if cpu else None,
+                "cpu_max": max(cpu) if cpu else None,
+                "pss_first_kb": pss[0] if pss else None,
+                "pss_last_kb": pss[-1] if pss else None,
+                "pss_max_kb": max(pss) if pss else None,
+                "pss_growth_kb": pss[-1] - pss[0] if pss else None,
+                "frames": frames,
+                "janky_pct": round(100.0 * janky / frames, 1) if frames else None,
+            }
+        return screens
+
+    @staticmethod
+    def compare(summary: Dict[str, Dict], baseline: Dict[str, Dict], memory_tolerance: float = 0.15,
+                jank_tolerance: float = 5.0) -> List[str]:
+        """Regressions vs a baseline summary: PSS peak up by more than memory_tolerance (fraction), janky share up by more than jank_tolerance points"""
+        regressions = []
+        for screen, now in sorted(summary.items()):
+            before = baseline.get(screen)
+            if not before or screen == OUTSIDE_STEPS:
+                continue
+            if now["pss_max_kb"] and before.get("pss_max_kb") and \
+                    now["pss_max_kb"] > before["pss_max_kb"] * (1 + memory_tolerance):
+                regressions.append(f"{screen}: PSS peak {before['pss_max_kb'] / 1024:.1f} -> {now['pss_max_kb'] / 1024:.1f} MB")
+            if now["janky_pct"] is not None and before.get("janky_pct") is not None and \
+                    now["janky_pct"] > before["janky_pct"] + jank_tolerance:
+                regressions.append(f"{screen}: janky frames {before['janky_pct']:.1f}% -> {now['janky_pct']:.1f}%")
+        return regressions
+
+    def format_report(self, summary: Optional[Dict[str, Dict]] = None) -> str:
+        summary = summary if summary is not None else self.summary()
+        samples = sum(s["samples"] for s in summary.values())
+        lines = [f"App profile ({self.package}): {samples} samples every {self.interval:g}s, {self.errors} errors",
+                 f"  {'screen':<22}{'samples':>8}{'cpu avg':>9}{'cpu max':>9}{'PSS max':>10}{'PSS grow':>10}"
+                 f"{'frames':>8}{'janky':>8}"]
+
+        def show(value, unit="", scale=1.0, fmt=".1f"):
+            return "-" if value is None else f"{value / scale:{fmt}}{unit}"
+
+        for screen, s in summary.items():
+            lines.append(f"  {screen[:21]:<22}{s['samples']:>8}{show(s['cpu_mean'], '%'):>9}{show(s['cpu_max'], '%'):>9}"
+                         f"{show(s['pss_max_kb'], 'MB', 1024):>10}{show(s['pss_growth_kb'], 'MB', 1024, '+.1f'):>10}"
+                         f"{s['frames']:>8}{show(s['janky_pct'], '%'):>8}")
+        return "\n".join(lines)
+
+    def save(self, path: str, summary: Optional[Dict[str, Dict]] = None) -> str:
+        """Write the time series and the per-screen summary (load_summary reads it back as a baseline)"""
+        segments = self._copy()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"schema": AppProfiler.SCHEMA_VERSION, "package": self.package, "interval": self.interval,
+                       "columns": COLUMNS, "summary": summary if summary is not None else self.summary(),
+                       "segments": segments}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def load_summary(path: str) -> Dict[str, Dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No profiler baseline: {e}")
+            return {}
+        return data.get("summary", {}) if data.get("schema") == AppProfiler.SCHEMA_VERSION else {}
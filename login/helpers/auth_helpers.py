@@ -1,9 +1,10 @@
-import time
 from asyncio import timeout
 from typing import List
 from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 from .element_helpers import ElementHelpers
+from .form_helpers import FormHelpers
+from .page_snapshot import PageSnapshot
 
 
 class AuthHelpers:
@@ -43,6 +44,10 @@ class AuthHelpers:
         (AppiumBy.XPATH, "(//android.widget.Button[@text='Sign Out'])[1]"),
     ]
 
+    NAV_DASHBOARD_SELECTORS = [
+        (AppiumBy.XPATH, "//android.widget.Button[@text='Dashboard']"),
+    ]
+
     NAV_PROPERTY_SELECTORS = [
         (AppiumBy.XPATH, "//android.widget.Button[@text='Properties']"),
         (AppiumBy.XPATH, "(//android.widget.TextView[@text='Properties'])[1]"),
@@ -102,14 +107,20 @@ class AuthHelpers:
     OTP_SUBMIT = (AppiumBy.ID, "com.qompli.app:id/btn_submit_otp")
     LOGOUT_BUTTON = (AppiumBy.ID, "com.qompli.app:id/btn_logout")
 
+    # How often ensure_logged_in found an authenticated screen vs. had to log in through the UI
+    LOGIN_STATS = {"fast_path": 0, "ui_login": 0}
+
 
+    @staticmethod
     def fill_login_form(driver: WebDriver, email: str, password: str, remember: bool = False) -> bool:
-        """Fill the login form with email and password"""
+        """Fill the two-step login form: email, Sign In, then password (left for the caller to submit)"""
         try:
-            email: ElementHelpers.safe_send_keys(driver, AuthHelpers.EMAIL_SELECTORS, email)
-            time.sleep(0.5)
-            password: ElementHelpers.safe_send_keys(driver, AuthHelpers.PASSWORD_SELECTORS, password)
-            time.sleep(0.5)
+            if not FormHelpers.fill_form(driver, {tuple(AuthHelpers.EMAIL_SELECTORS): email}):
+                return False
+            if not AuthHelpers.submit_login(driver):
+                return False
+            if not FormHelpers.fill_form(driver, {tuple(AuthHelpers.PASSWORD_SELECTORS): password}):
+                return False
             # Optional: remember me
             if remember:
                 remember_checkbox = (AppiumBy.ID, "com.qompli.app:id/checkbox_remember")
@@ -120,48 +131,77 @@ class AuthHelpers:
             print(f"⚠ Error filling login form: {e}")
             return False
 
+    @staticmethod
+    def is_logged_in(driver: WebDriver) -> bool:
+        """Cheap check from one hierarchy read: Dashboard or nav bar visible and no email field"""
+        snapshot = PageSnapshot.capture(driver)
+        if snapshot.exists(AuthHelpers.EMAIL_SELECTORS[:1]):
+            return False
+        return snapshot.exists([AuthHelpers.DASHBOARD] + AuthHelpers.NAV_BAR_BUTTON_SELECTORS)
+
+    @staticmethod
+    def login(driver: WebDriver, email: str, password: str, timeout: int = 10) -> bool:
+        """Log in through the UI: email, Sign In, password, Sign In, then wait for the Dashboard"""
+        FormHelpers.fill_form(driver, {tuple(AuthHelpers.EMAIL_SELECTORS): email})
+        AuthHelpers.submit_login(driver)
+        FormHelpers.fill_form(driver, {tuple(AuthHelpers.PASSWORD_SELECTORS): password})
+        AuthHelpers.submit_login(driver)
+        return bool(PageSnapshot.wait_until(driver, lambda snapshot: snapshot.exists([AuthHelpers.DASHBOARD]), timeout))
+
+    @staticmethod
+    def ensure_logged_in(driver: WebDriver, email: str, password: str, timeout: int = 10) -> bool:
+        """Reuse an authenticated session if the app is already on one, otherwise log in through the UI"""
+        if AuthHelpers.is_logged_in(driver):
+            AuthHelpers.LOGIN_STATS["fast_path"] += 1
+            return True
+        AuthHelpers.LOGIN_STATS["ui_login"] += 1
+        return AuthHelpers.login(driver, email, password, timeout)
+
     @staticmethod
     def submit_login(driver: WebDriver) -> bool:
         """Click the Sign In button"""
-        return ElementHelpers.safe_click(driver, AuthHelpers.SIGN_IN_BUTTON_SELECTORS)
+        # List order matters here: the first 'Sign In' text is the screen title, not the button
+        return ElementHelpers.safe_click(driver, AuthHelpers.SIGN_IN_BUTTON_SELECTORS, reorder=False)
 
-    def click_nav_bar(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_BAR_BUTTON_SELECTORS)
+    # Navigation clicks keep list order: the TextView fallbacks also match dashboard cards and screen titles,
+    # so selector stats must never promote them above the drawer's buttons
+    def click_nav_bar(driver: WebDriver, settle: bool = False) -> bool:
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_BAR_BUTTON_SELECTORS, reorder=False, settle=settle)
 
     def click_properties(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_PROPERTY_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_PROPERTY_SELECTORS, reorder=False)
 
     def click_inspection(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_INSPECTIONS_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_INSPECTIONS_SELECTORS, reorder=False)
 
     def click_violations(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_VIOLATIONS_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_VIOLATIONS_SELECTORS, reorder=False)
 
     def click_non_compliant(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_NON_COMPLIANT_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_NON_COMPLIANT_SELECTORS, reorder=False)
 
     def click_contracts(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_CONTRACTS_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_CONTRACTS_SELECTORS, reorder=False)
 
     def click_marketplace(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_MARKETPLACE_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_MARKETPLACE_SELECTORS, reorder=False)
 
     def click_payment_history(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_PAYMENT_HISTORY_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_PAYMENT_HISTORY_SELECTORS, reorder=False)
 
     def click_job_filling(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_JOB_FILLING_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_JOB_FILLING_SELECTORS, reorder=False)
 
     def click_qompligov_ai(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_QOMPLIGOV_AI_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_QOMPLIGOV_AI_SELECTORS, reorder=False)
 
     def click_setting(driver: WebDriver) -> bool:
-        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_SETTINGS_SELECTORS)
+        return ElementHelpers.safe_click(driver, AuthHelpers.NAV_SETTINGS_SELECTORS, reorder=False)
 
     @staticmethod
     def check_dashboard(driver: WebDriver) -> bool:
         """Check if dashboard is visible"""
-        return ElementHelpers.element_exists(driver, AuthHelpers.DASHBOARD)
+        return ElementHelpers.element_exists(driver, [AuthHelpers.DASHBOARD])
 
     @staticmethod
     def enter_otp(driver: WebDriver, otp: str) -> bool:
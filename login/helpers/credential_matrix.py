@@ -0,0 +1,199 @@
+import csv
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from selenium.common.exceptions import WebDriverException
+from appium.webdriver.webdriver import WebDriver
+from .auth_helpers import AuthHelpers
+from .form_helpers import FormHelpers
+from .page_snapshot import PageSnapshot
+from .wait_budget import WaitBudget
+
+# Sign-in steps, as read from the hierarchy
+EMAIL_STEP, PASSWORD_STEP, SIGNED_IN = "email", "password", "signed_in"
+# Case outcomes
+INVALID, ERROR, NO_CHANGE = "invalid", "error", "no_change"
+
+
+class CredentialMatrix:
+    """
+    Runs sign-in input cases back to back on one sign-in screen.
+
+    Cases come from a CSV file with the columns of FIELDS; {valid_email}-style
+    placeholders are filled from the credentials passed to load(), other
+    braces are kept as typed. Between
+    cases only the form fields are replaced (one command per field); the app
+    is not relaunched, and leaving the password step or a signed-in session
+    costs one back or one logout. Each submit is followed by hierarchy reads
+    until the screen reacts, and the outcome and message both come from that
+    one snapshot:
+
+        invalid    message on the email step (client-side validation)
+        password   the password step was reached (and no password given)
+        signed_in  the dashboard is visible
+        error      message on the password step, or a driver error
+        no_change  nothing happened within `settle` seconds
+
+    A case passes when its outcome equals expected_outcome (if given) and its
+    message contains expected_message (if given).
+    """
+
+    FIELDS = ["id", "email", "password", "expected_outcome", "expected_message"]
+    RESULT_FIELDS = FIELDS + ["outcome", "message", "seconds", "passed"]
+
+    def __init__(self, driver: WebDriver, message_xpath: str, settle: float = 3.0):
+        self.driver = driver
+        self.message_xpath = message_xpath
+        self.settle = settle
+        self.step: Optional[str] = None
+        self.resets = {"back": 0, "logout": 0}
+        self.elapsed = 0.0
+
+    @staticmethod
+    def load(path: str, credentials: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """Cases from a CSV file; rows without an id are numbered"""
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        cases = []
+        for number, row in enumerate(rows, 1):
+            case = {field: (row.get(field) or "").strip() for field in CredentialMatrix.FIELDS}
+            # Only the known placeholders: any other brace in a case is literal input
+            for name, value in (credentials or {}).items():
+                case["email"] = case["email"].replace(f"{{{name}}}", value)
+                case["password"] = case["password"].replace(f"{{{name}}}", value)
+            case["id"] = case["id"] or str(number)
+            cases.append(case)
+        return cases
+
+    # ----------------------------
+    # Reading the screen
+    # ----------------------------
+    def read_step(self, snapshot: PageSnapshot) -> Optional[str]:
+        """Sign-in step shown in the snapshot; None while the screen is blank or elsewhere"""
+        if snapshot.exists(AuthHelpers.PASSWORD_SELECTORS[:1]):
+            return PASSWORD_STEP
+        if snapshot.exists(AuthHelpers.EMAIL_SELECTORS[:1]):
+            return EMAIL_STEP
+        if snapshot.exists([AuthHelpers.DASHBOARD]):
+            return SIGNED_IN
+        return None
+
+    def read_message(self, snapshot: PageSnapshot) -> str:
+        texts = [node.get("text") or node.get("content-desc") or "" for node in snapshot.find_all(self.message_xpath)]
+        return " | ".join(text for text in texts if text)
+
+    def _back_to_email_step(self) -> bool:
+        """From the password step (back) or a signed-in session (logout) to an empty email step"""
+        if self.step is None:
+            self.step = self.read_step(PageSnapshot.capture(self.driver))
+        if self.step == PASSWORD_STEP:
+            self.resets["back"] += 1
+            self.driver.back()
+        elif self.step == SIGNED_IN:
+            self.resets["logout"] += 1
+            AuthHelpers.click_nav_bar(self.driver)
+            AuthHelpers.logout(self.driver)
+        if self.step != EMAIL_STEP:
+            self.step = PageSnapshot.wait_until(
+                self.driver, lambda s: EMAIL_STEP if self.read_step(s) == EMAIL_STEP else None, self.settle
+            )
+        return self.step == EMAIL_STEP
+
+    def _submit(self, selectors: List[Tuple], value: str) -> Tuple[Optional[str], str]:
+        """Replace one field, tap Sign In and read (step, message) once the screen has reacted"""
+        before = self.step
+        if not FormHelpers.fill_form(self.driver, {tuple(selectors): value}):
+            return before, ""
+        if not AuthHelpers.submit_login(self.driver):
+            return before, ""
+
+        def reacted(snapshot):
+            step = self.read_step(snapshot)
+            message = self.read_message(snapshot)
+            if step is None or (step == before and not message):
+                return None
+            return step, message
+
+        result = PageSnapshot.wait_until(self.driver, reacted, self.settle)
+        return result if result else (before, "")
+
+    # ----------------------------
+    # Running
+    # ----------------------------
+    def run_case(self, case: Dict[str, str]) -> Dict:
+        start = time.time()
+        outcome, message = NO_CHANGE, ""
+        try:
+            if not self._back_to_email_step():
+                outcome, message = ERROR, "could not return to the email step"
+            else:
+                step, message = self._submit(AuthHelpers.EMAIL_SELECTORS, case["email"])
+                if step == PASSWORD_STEP and case["password"]:
+                    self.step = step
+                    step, message = self._submit(AuthHelpers.PASSWORD_SELECTORS, case["password"])
+                    if step == PASSWORD_STEP:
+                        outcome = ERROR if message else NO_CHANGE
+                    else:
+                        outcome = step
+                elif step == EMAIL_STEP:
+                    outcome = INVALID if message else NO_CHANGE
+                else:
+                    outcome = step
+                self.step = step
+        except WebDriverException as e:
+            # One broken case must not end the matrix; the next case reads the screen afresh
+            outcome, message = ERROR, f"{type(e).__name__}: {str(e).strip().splitlines()[0]}"
+            self.step = None
+        passed = (not case["expected_outcome"] or outcome == case["expected_outcome"]) \
+            and case["expected_message"] in message
+        return dict(case, password="*" * len(case["password"]), outcome=outcome, message=message,
+                    seconds=round(time.time() - start, 3), passed=passed)
+
+    def run(self, cases: List[Dict[str, str]], case_budget: Optional[float] = None) -> List[Dict]:
+        """
+        Run all cases; with case_budget, each case gets a fresh WaitBudget of that many seconds
+        and the caller's budget is put back afterwards.
+        """
+        budget = WaitBudget.of(self.driver)
+        start = time.time()
+        results = []
+        try:
+            for case in cases:
+                if case_budget is not None:
+                    WaitBudget.attach(self.driver, case_budget, f"{budget.name if budget else ''} [{case['id']}]")
+                result = self.run_case(case)
+                print(f"{'✓' if result['passed'] else '✗'} {result['id']}: {result['outcome']}"
+                      f"{' - ' + result['message'] if result['message'] else ''}")
+                results.append(result)
+            self._back_to_email_step()
+        finally:
+            if case_budget is not None:
+                self.driver.wait_budget = budget
+            self.elapsed = time.time() - start
+        return results
+
+    # ----------------------------
+    # Reporting
+    # ----------------------------
+    @staticmethod
+    def save(results: List[Dict], path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CredentialMatrix.RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        return path
+
+    @staticmethod
+    def format_table(results: List[Dict]) -> str:
+        lines = [f"{'':2}{'id':<26}{'email':<32}{'outcome':<11}{'seconds':>8}  message"]
+        for r in results:
+            lines.append(f"{'✓' if r['passed'] else '✗':2}{r['id'][:25]:<26}{r['email'][:31]:<32}{r['outcome']:<11}"
+                         f"{r['seconds']:>8.2f}  {r['message']}")
+        return "\n".join(lines)
+
+    def summary(self, results: List[Dict]) -> str:
+        passed = sum(1 for r in results if r["passed"])
+        rate = len(results) / self.elapsed * 60 if self.elapsed else 0.0
+        return (f"Credential matrix: {passed}/{len(results)} passed in {self.elapsed:.1f}s "
+                f"({rate:.0f} cases/min; {self.resets['back']} back, {self.resets['logout']} logout resets)")
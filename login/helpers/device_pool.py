@@ -0,0 +1,117 @@
+import glob
+import json
+import os
+from typing import Dict, List, Optional
+
+
+class DevicePool:
+    """
+    Device inventory shared by parallel pytest workers.
+
+    The inventory is a JSON list, one entry per device:
+        [{"udid": "JFQO7PFEU44XBIIJ", "appium_url": "http://127.0.0.1:4723",
+          "system_port": 8200, "device_name": "vivo 1907_19", "platform_version": "12"}]
+
+    Each pytest-xdist worker (gw0, gw1, ...) is pinned to its own device, so
+    `pytest -n auto login/` starts one worker per device.
+    """
+
+    # Device entry key -> Appium capability
+    CAPABILITY_KEYS = {
+        "udid": "udid",
+        "system_port": "systemPort",
+        "device_name": "deviceName",
+        "platform_version": "platformVersion",
+    }
+
+    def __init__(self, devices: List[Dict]):
+        self.devices = devices
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DevicePool"]:
+        """Load the inventory, or return None if there is no usable inventory file"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                devices = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Failed to load device pool {path}: {e}")
+            return None
+        return cls(devices) if devices else None
+
+    @staticmethod
+    def worker_id() -> str:
+        """pytest-xdist worker id, or 'main' when not running under xdist"""
+        return os.getenv("PYTEST_XDIST_WORKER", "main")
+
+    @staticmethod
+    def worker_index() -> int:
+        worker = DevicePool.worker_id()
+        return int(worker[2:]) if worker.startswith("gw") else 0
+
+    def device_for_worker(self, index: Optional[int] = None) -> Dict:
+        """Return the device assigned to this worker"""
+        if index is None:
+            index = DevicePool.worker_index()
+        return self.devices[index % len(self.devices)]
+
+    @staticmethod
+    def apply(options, device: Dict):
+        """Set the device-specific capabilities on UiAutomator2Options"""
+        for key, capability in DevicePool.CAPABILITY_KEYS.items():
+            if key in device:
+                options.set_capability(capability, device[key])
+        return options
+
+    @staticmethod
+    def write_worker_results(reports_dir: str, device: Optional[Dict], results: List[Dict]) -> str:
+        """Write this worker's test results for merging by the controller"""
+        os.makedirs(reports_dir, exist_ok=True)
+        filepath = os.path.join(reports_dir, f"worker_{DevicePool.worker_id()}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump({"worker": DevicePool.worker_id(), "device": device, "results": results}, f, indent=1)
+        return filepath
+
+    @staticmethod
+    def clear_worker_results(reports_dir: str):
+        for filepath in glob.glob(os.path.join(reports_dir, "worker_*.json")):
+            os.remove(filepath)
+
+    @staticmethod
+    def merge_reports(reports_dir: str) -> Dict:
+        """
+        Merge all worker result files into one report grouped by device.
+        A non-worker (main) file is ignored when xdist worker files exist: under xdist it can only be a
+        stale or controller-side copy of the workers' results.
+        """
+        merged = {"devices": {}, "passed": 0, "failed": 0, "skipped": 0}
+        filepaths = sorted(glob.glob(os.path.join(reports_dir, "worker_*.json")))
+        workers = [f for f in filepaths if os.path.basename(f).startswith("worker_gw")]
+        for filepath in workers or filepaths:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            device = data.get("device") or {}
+            name = device.get("udid") or device.get("device_name") or data["worker"]
+            entry = merged["devices"].setdefault(name, {"device": device, "workers": [], "results": []})
+            entry["workers"].append(data["worker"])
+            entry["results"].extend(data["results"])
+            for result in data["results"]:
+                merged[result["outcome"]] = merged.get(result["outcome"], 0) + 1
+        filepath = os.path.join(reports_dir, "device_report.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=1)
+        return merged
+
+    @staticmethod
+    def format_report(merged: Dict) -> str:
+        lines = [f"Device report: {merged['passed']} passed, {merged['failed']} failed, {merged['skipped']} skipped"]
+        for name, entry in merged["devices"].items():
+            results = entry["results"]
+            passed = sum(1 for r in results if r["outcome"] == "passed")
+            duration = sum(r["duration"] for r in results)
+            lines.append(f"  {name}: {passed}/{len(results)} passed in {duration:.1f}s ({', '.join(entry['workers'])})")
+        return "\n".join(lines)
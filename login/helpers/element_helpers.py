@@ -1,41 +1,114 @@
+import hashlib
 import os
 import time
 from datetime import datetime
 from typing import List, Tuple, Optional
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from appium.webdriver.webdriver import WebDriver
+from .adaptive_timeouts import AdaptiveTimeouts
+from .selector_compiler import SelectorCompiler
+from .wait_budget import WaitBudget
 
 
 class ElementHelpers:
     """Simplified helper class for element interactions and utilities"""
 
+    # Optional SelectorStats; when set, resolutions are recorded and fallback lists reordered
+    selector_stats = None
+
+    # Optional ScreenshotPipeline; when set, take_screenshot writes files in the background
+    screenshot_pipeline = None
+
+    # Optional PageArchive; when set, get_page_source(save_to_file=True) archives instead of writing XML files
+    page_archive = None
+
+    # Optional AdaptiveTimeouts; when set, wait latencies are recorded and
+    # wait_for_element/element_exists without an explicit timeout use the learned value
+    adaptive_timeouts = None
+
+    # When True, XPath selectors are sent to the server as equivalent UiSelector/ID locators where possible
+    compile_selectors = False
+
+    # UI-settle defaults (seconds), see wait_for_idle
+    SETTLE_QUIET_PERIOD = 0.4
+    SETTLE_TIMEOUT = 5.0
+    SETTLE_POLL = 0.2
+
     @staticmethod
-    def element_exists(driver: WebDriver, selectors: List[Tuple], timeout: int = 5) -> bool:
-        """Check if any element from the list of selectors exists"""
-        for by, selector in selectors:
+    def resolve_element(driver: WebDriver, selectors: List[Tuple], timeout: float = 3,
+                        poll_frequency: float = 0.25, reorder: bool = True, expected: bool = False) -> Tuple[int, object]:
+        """
+        Wait for any selector in the list under one shared deadline.
+        Every poll checks all candidates in list order, so the highest-priority
+        match present is returned as soon as it appears.
+        With selector stats enabled and reorder=True, historically fastest winners
+        are tried first; pass reorder=False when list order encodes which match is wanted.
+        The timeout is capped by the driver's WaitBudget, if any.
+        With adaptive timeouts enabled, the wait's latency (or miss) is recorded for the selector list;
+        pass expected=True when the element should be there, so a miss widens the learned timeout.
+        Returns (index of the matching selector in the original list, element).
+        """
+        stats = ElementHelpers.selector_stats
+        ordered = stats.order(selectors) if stats and reorder else list(selectors)
+        locators = SelectorCompiler.compile_list(ordered) if ElementHelpers.compile_selectors else ordered
+
+        def any_present(d):
+            for index, (by, selector) in enumerate(locators):
+                found = d.find_elements(by, selector)
+                if found:
+                    return index, found[0]
+            return False
+
+        start = time.time()
+        with WaitBudget.wait(driver, "resolve_element", timeout, selectors[0][1] if selectors else "") as charge:
             try:
-                WebDriverWait(driver, timeout).until(
-                    EC.presence_of_element_located((by, selector))
+                index, element = WebDriverWait(driver, charge.timeout, poll_frequency=poll_frequency).until(
+                    any_present, f"Element not found with any of {len(selectors)} selectors within {charge.timeout:.1f}s"
+                    + (f" (capped from {timeout}s by the wait budget)" if charge.timeout < timeout else "")
                 )
-                return True
-            except (TimeoutException, NoSuchElementException):
-                continue
-        return False
+            except TimeoutException:
+                if stats:
+                    stats.record(ordered, None, time.time() - start)
+                if ElementHelpers.adaptive_timeouts:
+                    ElementHelpers.adaptive_timeouts.record(AdaptiveTimeouts.key_for(selectors), time.time() - start,
+                                                            False, expected)
+                raise
+        if stats:
+            stats.record(ordered, index, time.time() - start)
+        if ElementHelpers.adaptive_timeouts:
+            ElementHelpers.adaptive_timeouts.record(AdaptiveTimeouts.key_for(selectors), time.time() - start)
+        return selectors.index(ordered[index]), element
 
     @staticmethod
-    def wait_for_element(driver: WebDriver, selectors: List[Tuple], timeout: int = 3):
-        """Wait for and return the first element found from the list of selectors"""
-        last_exception = None
-        for by, selector in selectors:
-            try:
-                return WebDriverWait(driver, timeout).until(
-                    EC.presence_of_element_located((by, selector))
-                )
-            except (TimeoutException, NoSuchElementException) as e:
-                last_exception = e
-        raise TimeoutException(f"Element not found with any selector. Last error: {last_exception}")
+    def timeout_for(selectors: List[Tuple], timeout: Optional[float], default: float, expected: bool = False) -> float:
+        """
+        Explicit timeout, else the learned one for this selector list (if adaptive timeouts are on), else default.
+        Learned values shorten only negative checks; expected waits get at least the default.
+        """
+        if timeout is not None:
+            return timeout
+        if ElementHelpers.adaptive_timeouts:
+            return ElementHelpers.adaptive_timeouts.timeout(AdaptiveTimeouts.key_for(selectors), default, expected)
+        return default
+
+    @staticmethod
+    def element_exists(driver: WebDriver, selectors: List[Tuple], timeout: Optional[float] = None) -> bool:
+        """Check if any element from the list of selectors exists (default timeout: learned, else 5s)"""
+        timeout = ElementHelpers.timeout_for(selectors, timeout, 5)
+        try:
+            ElementHelpers.resolve_element(driver, selectors, timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    @staticmethod
+    def wait_for_element(driver: WebDriver, selectors: List[Tuple], timeout: Optional[float] = None,
+                         reorder: bool = True):
+        """Wait for and return the first element found from the list of selectors (default timeout: learned, else 3s)"""
+        timeout = ElementHelpers.timeout_for(selectors, timeout, 3, expected=True)
+        _, element = ElementHelpers.resolve_element(driver, selectors, timeout, reorder=reorder, expected=True)
+        return element
 
     @staticmethod
     def safe_send_keys(driver: WebDriver, selectors: List[Tuple], text: str, clear_first: bool = True) -> bool:
@@ -51,12 +124,17 @@ class ElementHelpers:
             return False
 
     @staticmethod
-    def safe_click(driver: WebDriver, selectors: List[Tuple]) -> bool:
-        """Safely click an element"""
+    def safe_click(driver: WebDriver, selectors: List[Tuple], reorder: bool = True, settle: bool = False) -> bool:
+        """
+        Safely click an element.
+        With settle=True, also wait for the UI to settle (wait_for_idle) when the caller
+        does not wait for the click's outcome itself; it costs at least SETTLE_QUIET_PERIOD.
+        """
         try:
-            element = ElementHelpers.wait_for_element(driver, selectors)
+            element = ElementHelpers.wait_for_element(driver, selectors, reorder=reorder)
             element.click()
-            time.sleep(0.3)
+            if settle:
+                ElementHelpers.wait_for_idle(driver)
             return True
         except Exception as e:
             print(f"⚠ Error clicking element: {e}")
@@ -64,13 +142,18 @@ class ElementHelpers:
 
     @staticmethod
     def take_screenshot(driver: WebDriver, filename: Optional[str] = None) -> str:
-        """Take a screenshot and save it to screenshots directory"""
+        """
+        Take a screenshot and save it to screenshots directory.
+        With a ScreenshotPipeline set, only the capture happens here; the file is written in the background.
+        """
         screenshots_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "screenshots")
-        os.makedirs(screenshots_dir, exist_ok=True)
         if not filename:
-            filename = f"screenshot_{datetime.now():%Y%m%d_%H%M%S}.png"
-        filepath = os.path.join(screenshots_dir, filename)
+            filename = f"screenshot_{datetime.now():%Y%m%d_%H%M%S_%f}.png"
         try:
+            if ElementHelpers.screenshot_pipeline:
+                return ElementHelpers.screenshot_pipeline.capture(driver, filename)
+            os.makedirs(screenshots_dir, exist_ok=True)
+            filepath = os.path.join(screenshots_dir, filename)
             driver.save_screenshot(filepath)
             print(f"✓ Screenshot saved: {filepath}")
             return filepath
@@ -79,15 +162,23 @@ class ElementHelpers:
             return ""
 
     @staticmethod
-    def get_page_source(driver: WebDriver, save_to_file: bool = False, filename: Optional[str] = None) -> str:
-        """Get page source and optionally save to file"""
+    def get_page_source(driver: WebDriver, save_to_file: bool = False, filename: Optional[str] = None,
+                        step: Optional[str] = None, screen: Optional[str] = None) -> str:
+        """
+        Get page source and optionally save to file.
+        With a PageArchive set, saving stores a deduplicated, compressed snapshot indexed by test/step/screen.
+        """
         try:
             page_source = driver.page_source
             if save_to_file:
+                if ElementHelpers.page_archive:
+                    digest = ElementHelpers.page_archive.add(page_source, step=step or filename, screen=screen)
+                    print(f"✓ Page source archived: {digest[:12]}")
+                    return page_source
                 page_sources_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "page_sources")
                 os.makedirs(page_sources_dir, exist_ok=True)
                 if not filename:
-                    filename = f"page_source_{datetime.now():%Y%m%d_%H%M%S}.xml"
+                    filename = f"page_source_{datetime.now():%Y%m%d_%H%M%S_%f}.xml"
                 filepath = os.path.join(page_sources_dir, filename)
                 with open(filepath, "w", encoding="utf-8") as f:
                     f.write(page_source)
@@ -96,3 +187,32 @@ class ElementHelpers:
         except Exception as e:
             print(f"⚠ Failed to get page source: {e}")
             return ""
+
+    @staticmethod
+    def hierarchy_fingerprint(driver: WebDriver) -> str:
+        """Hash of the current UI hierarchy"""
+        return hashlib.sha1(ElementHelpers.get_page_source(driver).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def wait_for_idle(driver: WebDriver, quiet_period: Optional[float] = None, timeout: Optional[float] = None,
+                      poll_frequency: Optional[float] = None) -> bool:
+        """
+        Wait until the UI is settled: the hierarchy fingerprint has not changed for quiet_period.
+        Returns False if the UI was still changing when timeout ran out.
+        """
+        quiet_period = ElementHelpers.SETTLE_QUIET_PERIOD if quiet_period is None else quiet_period
+        timeout = ElementHelpers.SETTLE_TIMEOUT if timeout is None else timeout
+        poll_frequency = ElementHelpers.SETTLE_POLL if poll_frequency is None else poll_frequency
+        with WaitBudget.wait(driver, "wait_for_idle", timeout) as charge:
+            end_time = time.time() + charge.timeout
+            last = ElementHelpers.hierarchy_fingerprint(driver)
+            stable_since = time.time()
+            while time.time() - stable_since < quiet_period:
+                if time.time() >= end_time:
+                    charge.outcome = "still changing"
+                    return False
+                time.sleep(poll_frequency)
+                current = ElementHelpers.hierarchy_fingerprint(driver)
+                if current != last:
+                    last, stable_since = current, time.time()
+            return True
@@ -0,0 +1,202 @@
+import os
+from typing import Dict, List, Optional
+from appium import webdriver
+from ..config import (
+    get_android_options,
+    APPIUM_SERVER_URL,
+    APP_PACKAGE,
+    APP_VERSION,
+    SELECTOR_STATS_FILE,
+    SELECTOR_STATS_ENABLED,
+    SELECTOR_COMPILER_ENABLED,
+    ADAPTIVE_TIMEOUTS_ENABLED,
+    ADAPTIVE_TIMEOUTS_FILE,
+    ADAPTIVE_TIMEOUT_PERCENTILE,
+    ADAPTIVE_TIMEOUT_MARGIN,
+    ADAPTIVE_TIMEOUT_MAX,
+    ADAPTIVE_TIMEOUT_OVERRIDES,
+    SETTLE_QUIET_PERIOD,
+    SETTLE_TIMEOUT,
+    TEST_WAIT_BUDGET,
+    LONG_WAIT,
+    DEVICE_POOL_FILE,
+    SESSION_BROKER_ADDRESS,
+    SESSION_BROKER_AUTHKEY,
+    TRACE_ENABLED,
+    REPORTS_DIR,
+    SCREENSHOT_ASYNC,
+    SCREENSHOT_WORKERS,
+    SCREENSHOT_MAX_WIDTH,
+    SCREENSHOT_FORMAT,
+    SCREENSHOTS_DIR,
+    PAGE_ARCHIVE_ENABLED,
+    PAGE_ARCHIVE_DIR,
+    NAVIGATION_COSTS_FILE,
+    DEEP_LINKS,
+    SCREEN_CLASSIFIER_ENABLED,
+    SCREEN_LIBRARY_FILE,
+    MESSAGE_WATCHER_ENABLED,
+    MESSAGE_WATCH_INTERVAL,
+    MESSAGE_WATCHES,
+    HTTP_POOL_ENABLED,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_COMMAND_TIMEOUT,
+    HTTP_COMMAND_TIMEOUTS,
+    APP_PROFILER_ENABLED,
+    APP_PROFILER_INTERVAL,
+    APP_PROFILER_FRAME_STATS,
+    APP_PROFILER_BASELINE,
+    APP_PROFILER_MEMORY_TOLERANCE,
+    APP_PROFILER_JANK_TOLERANCE,
+)
+from .adaptive_timeouts import AdaptiveTimeouts
+from .app_profiler import AppProfiler
+from .auth_helpers import AuthHelpers
+from .device_pool import DevicePool
+from .element_helpers import ElementHelpers
+from .instrumentation import Tracer
+from .message_watcher import MessageWatcher
+from .page_archive import PageArchive
+from .pooled_executor import PooledExecutor
+from .screen_navigator import ScreenNavigator
+from .screenshot_pipeline import ScreenshotPipeline
+from .selector_stats import SelectorStats
+from .session_broker import BrokerClient, parse_address
+from .wait_budget import WaitBudget
+
+
+class Features:
+    """
+    One driver session plus the optional helpers switched on in config.py
+    (tracing, selector stats, adaptive timeouts, screenshots, page archive,
+    message watcher, profiler, screen classifier), started together and
+    saved/reported together when the session ends.
+    """
+
+    def __init__(self, screens: Dict[str, str]):
+        self.screens = screens
+        self.driver = None
+        self.broker: Optional[BrokerClient] = None
+        self.tracer: Optional[Tracer] = None
+        self.navigator: Optional[ScreenNavigator] = None
+        self.watcher: Optional[MessageWatcher] = None
+        self.profiler: Optional[AppProfiler] = None
+        self.classifier = None
+
+    def _start_driver(self):
+        options = get_android_options()
+        server_url = APPIUM_SERVER_URL
+        pool = DevicePool.load(DEVICE_POOL_FILE)
+        if pool:
+            # Each parallel worker gets its own device, Appium server and systemPort
+            device = pool.device_for_worker()
+            DevicePool.apply(options, device)
+            server_url = device.get("appium_url", APPIUM_SERVER_URL)
+        executor = server_url
+        if HTTP_POOL_ENABLED:
+            PooledExecutor.configure(HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_CONNECT_TIMEOUT, HTTP_COMMAND_TIMEOUT,
+                                     HTTP_COMMAND_TIMEOUTS)
+            executor = PooledExecutor.for_server(server_url)
+        if SESSION_BROKER_ADDRESS:
+            try:
+                self.broker = BrokerClient(parse_address(SESSION_BROKER_ADDRESS), SESSION_BROKER_AUTHKEY.encode())
+                self.driver = self.broker.acquire(server_url, options, executor)
+            except (OSError, RuntimeError) as e:
+                print(f"⚠ Session broker unavailable, starting a new session: {e}")
+                self.broker = None
+        if not self.broker:
+            self.driver = webdriver.Remote(executor, options=options)
+
+    def start(self, traced: object = None, traced_methods: List[str] = ()) -> "Features":
+        """Start the session and the enabled features; traced_methods of traced show up in the trace"""
+        self._start_driver()
+        if TRACE_ENABLED:
+            self.tracer = Tracer().install()
+            if traced is not None:
+                self.tracer.instrument(traced, list(traced_methods))
+            self.tracer.attach(self.driver)
+        if SELECTOR_STATS_ENABLED:
+            ElementHelpers.selector_stats = SelectorStats(SELECTOR_STATS_FILE, APP_VERSION)
+        if ADAPTIVE_TIMEOUTS_ENABLED:
+            ElementHelpers.adaptive_timeouts = AdaptiveTimeouts(
+                ADAPTIVE_TIMEOUTS_FILE, APP_VERSION, percentile=ADAPTIVE_TIMEOUT_PERCENTILE,
+                margin=ADAPTIVE_TIMEOUT_MARGIN, ceiling=ADAPTIVE_TIMEOUT_MAX, overrides=ADAPTIVE_TIMEOUT_OVERRIDES,
+            )
+        if SCREENSHOT_ASYNC:
+            ElementHelpers.screenshot_pipeline = ScreenshotPipeline(
+                SCREENSHOTS_DIR, SCREENSHOT_WORKERS, max_width=SCREENSHOT_MAX_WIDTH, image_format=SCREENSHOT_FORMAT
+            )
+        self.navigator = ScreenNavigator(self.screens, DEEP_LINKS, NAVIGATION_COSTS_FILE, APP_PACKAGE)
+        if MESSAGE_WATCHER_ENABLED:
+            self.watcher = MessageWatcher(self.driver, MESSAGE_WATCHES, MESSAGE_WATCH_INTERVAL).start()
+        if APP_PROFILER_ENABLED:
+            self.profiler = AppProfiler(self.driver, APP_PACKAGE, APP_PROFILER_INTERVAL,
+                                        APP_PROFILER_FRAME_STATS).start()
+        if SCREEN_CLASSIFIER_ENABLED:
+            # Imported only when enabled: it needs NumPy
+            from .screen_classifier import ScreenClassifier
+            self.classifier = ScreenClassifier(SCREEN_LIBRARY_FILE)
+        if PAGE_ARCHIVE_ENABLED:
+            ElementHelpers.page_archive = PageArchive(PAGE_ARCHIVE_DIR)
+        ElementHelpers.compile_selectors = SELECTOR_COMPILER_ENABLED
+        ElementHelpers.SETTLE_QUIET_PERIOD = SETTLE_QUIET_PERIOD
+        ElementHelpers.SETTLE_TIMEOUT = SETTLE_TIMEOUT
+        ElementHelpers.wait_for_idle(self.driver, timeout=LONG_WAIT)
+        return self
+
+    def begin_test(self, test_id: str):
+        """Attribute traces, archived pages and profile samples to test_id and give it a fresh wait budget"""
+        if self.tracer:
+            self.tracer.set_test(test_id)
+        if ElementHelpers.page_archive:
+            ElementHelpers.page_archive.current_test = test_id
+        WaitBudget.attach(self.driver, TEST_WAIT_BUDGET, test_id)
+        if self.profiler:
+            self.profiler.begin_test(test_id)
+
+    def stop(self):
+        """End the session, then save what the features learned and print their reports"""
+        if self.watcher:
+            self.watcher.stop()
+        if self.profiler:
+            self.profiler.stop()
+        if self.broker:
+            self.broker.release(self.driver)
+            self.broker.close()
+        else:
+            self.driver.quit()
+        self.navigator.save()
+        if self.classifier:
+            self.classifier.save()
+        if ElementHelpers.screenshot_pipeline:
+            ElementHelpers.screenshot_pipeline.close()
+            ElementHelpers.screenshot_pipeline = None
+        stats = ElementHelpers.selector_stats
+        if stats:
+            stats.save()
+            print(stats.format_report())
+        timeouts = ElementHelpers.adaptive_timeouts
+        if timeouts:
+            timeouts.save()
+            print(timeouts.format_report())
+        login_stats = AuthHelpers.LOGIN_STATS
+        print(f"Login: {login_stats['fast_path']} reused, {login_stats['ui_login']} through the UI")
+        if HTTP_POOL_ENABLED:
+            print(PooledExecutor.format_report())
+        if self.profiler:
+            summary = self.profiler.summary()
+            path = self.profiler.save(os.path.join(REPORTS_DIR, f"app_profile_{DevicePool.worker_id()}.json"), summary)
+            print(self.profiler.format_report(summary))
+            print(f"✓ App profile saved: {path}")
+            if APP_PROFILER_BASELINE:
+                regressions = AppProfiler.compare(summary, AppProfiler.load_summary(APP_PROFILER_BASELINE),
+                                                  APP_PROFILER_MEMORY_TOLERANCE, APP_PROFILER_JANK_TOLERANCE)
+                for regression in regressions:
+                    print(f"⚠ Profile regression vs {APP_PROFILER_BASELINE}: {regression}")
+        if self.tracer:
+            self.tracer.uninstall()
+            path = self.tracer.save(os.path.join(REPORTS_DIR, f"trace_{DevicePool.worker_id()}.json"))
+            print(self.tracer.summary())
+            print(f"✓ Trace saved: {path}")
@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional, Tuple, Union
+from selenium.common.exceptions import InvalidArgumentException, UnknownMethodException
+from appium.webdriver.webdriver import WebDriver
+from .element_helpers import ElementHelpers
+from .page_snapshot import PageSnapshot
+
+# A field is one (by, selector) locator or a tuple of fallback locators
+Field = Union[Tuple[str, str], Tuple[Tuple[str, str], ...]]
+
+
+class FormHelpers:
+    """Batched form filling: resolve all fields from one hierarchy read and set each value in one command"""
+
+    # Set to False after the server rejects mobile: replaceElementValue
+    replace_value_supported = True
+
+    @staticmethod
+    def _selectors(field: Field) -> List[Tuple[str, str]]:
+        return [field] if isinstance(field[0], str) else list(field)
+
+    @staticmethod
+    def _set_value(driver: WebDriver, element, value: str):
+        """Replace the field's text in one command; fall back to clear + send_keys"""
+        if FormHelpers.replace_value_supported:
+            try:
+                driver.execute_script("mobile: replaceElementValue", {"elementId": element.id, "text": value})
+                return
+            except (UnknownMethodException, InvalidArgumentException) as e:
+                # Only a rejected command says anything about the server; other errors are the caller's
+                print(f"⚠ replaceElementValue unavailable, typing instead: {e.msg}")
+                FormHelpers.replace_value_supported = False
+        element.clear()
+        element.send_keys(value)
+
+    @staticmethod
+    def fill_form(driver: WebDriver, fields: Dict[Field, str], timeout: float = 3) -> bool:
+        """
+        Fill several fields at once.
+        All fields are located from one page-source read per poll, each value is set with a
+        single command, and the results are verified with one more read. Fields whose text
+        did not stick are retyped with clear + send_keys.
+        """
+        selector_lists = [FormHelpers._selectors(field) for field in fields]
+        snapshot = PageSnapshot.wait_until(
+            driver, lambda s: s if all(s.first_match(sl) is not None for sl in selector_lists) else None, timeout
+        )
+        if not snapshot:
+            print("⚠ Error filling form: not all fields are present")
+            return False
+        try:
+            located = []
+            for selectors, value in zip(selector_lists, fields.values()):
+                by, selector = selectors[snapshot.first_match(selectors)]
+                element = driver.find_element(by, selector)
+                FormHelpers._set_value(driver, element, value)
+                located.append((by, selector, element, value))
+
+            check = PageSnapshot.capture(driver)
+            for by, selector, element, value in located:
+                xpath = PageSnapshot.to_xpath(by, selector)
+                if not xpath or check.attribute(xpath, "password") == "true":
+                    # Masked (or not locally checkable) fields can only be checked for length
+                    text = check.text(xpath) if xpath else None
+                    if text is None or len(text) == len(value):
+                        continue
+                elif check.text(xpath) == value:
+                    continue
+                print(f"⚠ Field {selector} did not take its value, retyping")
+                element.clear()
+                element.send_keys(value)
+            return True
+        except Exception as e:
+            print(f"⚠ Error filling form: {e}")
+            return False
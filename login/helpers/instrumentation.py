@@ -0,0 +1,203 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from appium.webdriver.webdriver import WebDriver
+from .auth_helpers import AuthHelpers
+from .element_helpers import ElementHelpers
+from .form_helpers import FormHelpers
+from .page_snapshot import PageSnapshot
+
+
+class Tracer:
+    """
+    Records every WebDriver command, helper call, wait and sleep, attributed to
+    the current test and the innermost helper call, for finding where run time goes.
+    """
+
+    # Helper methods wrapped by install(); names in WAIT_HELPERS are reported as waits
+    HELPER_METHODS = {
+        ElementHelpers: ["resolve_element", "element_exists", "wait_for_element", "safe_send_keys",
+                         "safe_click", "take_screenshot", "get_page_source", "wait_for_idle"],
+        AuthHelpers: ["fill_login_form", "submit_login", "login", "ensure_logged_in", "is_logged_in", "logout",
+                      "click_nav_bar", "click_properties", "click_inspection", "click_violations",
+                      "click_non_compliant", "click_contracts", "click_marketplace", "click_payment_history",
+                      "click_job_filling", "click_qompligov_ai", "click_setting", "check_dashboard"],
+        PageSnapshot: ["capture", "wait_until"],
+        FormHelpers: ["fill_form"],
+    }
+    WAIT_HELPERS = {"resolve_element", "element_exists", "wait_for_element", "wait_for_idle", "wait_until"}
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.test: Optional[str] = None
+        self.stack: List[str] = []
+        self.wait_depth = 0
+        self.thread_id = threading.get_ident()
+        self.started = time.time()
+        self._patches = []
+
+    # ----------------------------
+    # Installation
+    # ----------------------------
+    def attach(self, driver: WebDriver) -> WebDriver:
+        """Record every remote command sent through this driver (element commands included) from the test thread"""
+        execute = driver.execute
+
+        @functools.wraps(execute)
+        def traced_execute(driver_command, params=None):
+            if threading.get_ident() != self.thread_id:
+                # Background pollers (MessageWatcher) share the driver; their commands are not the test's
+                return execute(driver_command, params)
+            selector = None
+            if params:
+                if "using" in params:
+                    selector = f"{params['using']}={params.get('value')}"
+                elif "script" in params:
+                    selector = params["script"]
+            start = time.time()
+            try:
+                result = execute(driver_command, params)
+            except Exception as e:
+                self.record("command", driver_command, time.time() - start, type(e).__name__, selector)
+                raise
+            self.record("command", driver_command, time.time() - start, "ok", selector)
+            return result
+
+        driver.execute = traced_execute
+        return driver
+
+    def instrument(self, cls, names: List[str]):
+        """Wrap methods of cls so calls show up as helper spans"""
+        for name in names:
+            original = cls.__dict__.get(name)
+            if original is None:
+                continue
+            if isinstance(original, (staticmethod, classmethod)):
+                wrapped = type(original)(self._wrap(original.__func__, name))
+            else:
+                wrapped = self._wrap(original, name)
+            setattr(cls, name, wrapped)
+            self._patches.append((cls, name, original))
+
+    def install(self):
+        """Wrap the helper methods and time.sleep"""
+        for cls, names in Tracer.HELPER_METHODS.items():
+            self.instrument(cls, names)
+        sleep = time.sleep
+
+        def traced_sleep(seconds):
+            start = time.time()
+            sleep(seconds)
+            if threading.get_ident() == self.thread_id:
+                self.record("sleep", "time.sleep", time.time() - start)
+
+        time.sleep = traced_sleep
+        self._patches.append((time, "sleep", sleep))
+        return self
+
+    def uninstall(self):
+        for cls, name, original in reversed(self._patches):
+            setattr(cls, name, original)
+        self._patches = []
+
+    def _wrap(self, func, name):
+        kind = "wait" if name in Tracer.WAIT_HELPERS else "helper"
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            with self.span(name, kind):
+                return func(*args, **kwargs)
+
+        return traced
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def set_test(self, name: Optional[str]):
+        self.test = name
+        self.stack = []
+        self.wait_depth = 0
+        self.record("test", name or "", 0.0)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "helper"):
+        if threading.get_ident() != self.thread_id:
+            # Helpers called from background threads (MessageWatcher, ScreenshotPipeline) are not the test's
+            yield
+            return
+        # Only waits not nested in another wait count towards wait totals
+        outermost = kind == "wait" and not self.wait_depth
+        self.wait_depth += kind == "wait"
+        self.stack.append(name)
+        start = time.time()
+        outcome = "ok"
+        try:
+            yield
+        except Exception as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            self.stack.pop()
+            self.wait_depth -= kind == "wait"
+            self.record(kind, name, time.time() - start, outcome, outermost=outermost)
+
+    def record(self, kind: str, name: str, duration: float, outcome: str = "ok", selector: Optional[str] = None,
+               outermost: bool = False):
+        self.events.append({
+            "t": round(time.time() - self.started - duration, 4),
+            "test": self.test,
+            "helper": self.stack[-1] if self.stack else None,
+            "outermost": outermost,
+            "kind": kind,
+            "name": name,
+            "selector": selector,
+            "duration": round(duration, 4),
+            "outcome": outcome,
+        })
+
+    # ----------------------------
+    # Output
+    # ----------------------------
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"started": self.started, "events": self.events}, f, indent=1)
+        return path
+
+    def per_test(self) -> Dict[str, Dict[str, float]]:
+        """Seconds per test spent in commands, sleeps and waits (outermost only, they include their own commands and sleeps)"""
+        totals = defaultdict(lambda: {"commands": 0.0, "sleep": 0.0, "wait": 0.0, "count": 0})
+        for event in self.events:
+            entry = totals[event["test"] or "(outside tests)"]
+            if event["kind"] == "command":
+                entry["commands"] += event["duration"]
+                entry["count"] += 1
+            elif event["kind"] == "sleep":
+                entry["sleep"] += event["duration"]
+            elif event["outermost"]:
+                entry["wait"] += event["duration"]
+        return dict(totals)
+
+    def summary(self, top: int = 10) -> str:
+        lines = [f"{'test':<50}{'commands':>10}{'cmd (s)':>10}{'sleep (s)':>11}{'wait (s)':>10}"]
+        for test, entry in self.per_test().items():
+            lines.append(f"{test[-50:]:<50}{entry['count']:>10}{entry['commands']:>10.2f}"
+                         f"{entry['sleep']:>11.2f}{entry['wait']:>10.2f}")
+        commands = sum(e["duration"] for e in self.events if e["kind"] == "command")
+        sleeps = sum(e["duration"] for e in self.events if e["kind"] == "sleep")
+        waits = sum(e["duration"] for e in self.events if e["outermost"])
+        lines.append(f"Total: {commands:.2f}s in commands, {sleeps:.2f}s sleeping, {waits:.2f}s in waits "
+                     f"(sleep share of waits: {sleeps / waits * 100 if waits else 0:.0f}%)")
+        lines.append(f"Slowest {top} calls:")
+        slowest = sorted((e for e in self.events if e["kind"] in ("command", "wait", "helper")),
+                         key=lambda e: e["duration"], reverse=True)[:top]
+        for e in slowest:
+            where = f"{e['test'] or ''} > {e['helper'] or ''}"
+            lines.append(f"  {e['duration']:7.3f}s  {e['kind']:<8}{e['name']:<22}{e['outcome']:<10}{where}"
+                         + (f"  [{e['selector']}]" if e["selector"] else ""))
+        return "\n".join(lines)
@@ -0,0 +1,84 @@
+import hashlib
+from typing import Dict, Iterator, Optional, Tuple
+from appium.webdriver.common.appiumby import AppiumBy
+from appium.webdriver.webdriver import WebDriver
+from .page_snapshot import PageSnapshot
+
+
+class ListHarvester:
+    """
+    Streams the rows of a scrolling list.
+
+    Each page costs one hierarchy read plus one `mobile: scrollGesture`. Rows
+    are the container's children, reduced to {"text", "bounds", "resource_id"}
+    records and identified by a hash of their content (not their bounds,
+    which change as the list moves). Only the previous page's hashes are kept
+    (consecutive pages overlap, earlier pages cannot come back into view), so
+    memory stays constant however long the list is; two identical adjacent
+    rows are therefore reported once. The list has ended when a scroll brings
+    nothing new, or right after the gesture reports it cannot scroll further.
+
+        for row in ListHarvester(driver):
+            assert "BIN" in row["text"]
+    """
+
+    DEFAULT_CONTAINER = (AppiumBy.XPATH, "//*[@scrollable='true']")
+
+    def __init__(self, driver: WebDriver, container: Tuple[str, str] = DEFAULT_CONTAINER,
+                 item_xpath: str = "./*", percent: float = 0.9, max_pages: int = 1000):
+        self.driver = driver
+        self.container = container
+        self.item_xpath = item_xpath
+        self.percent = percent
+        self.max_pages = max_pages
+        self.pages = 0
+        self.items = 0
+
+    @staticmethod
+    def record(node) -> Dict[str, str]:
+        """Compact record of one row: its own and descendants' texts, bounds and resource-id"""
+        texts = [t for t in (n.get("text") or n.get("content-desc") for n in node.iter()) if t]
+        return {
+            "text": " | ".join(texts),
+            "bounds": node.get("bounds", ""),
+            "resource_id": node.get("resource-id") or next(
+                (n.get("resource-id") for n in node.iter() if n.get("resource-id")), ""),
+        }
+
+    @staticmethod
+    def fingerprint(record: Dict[str, str]) -> str:
+        return hashlib.sha1(f"{record['resource_id']}\x00{record['text']}".encode("utf-8")).hexdigest()
+
+    def _page(self) -> Optional[list]:
+        """Row nodes of the container from one hierarchy read, None if the container is not on screen"""
+        self.pages += 1
+        xpath = PageSnapshot.to_xpath(*self.container)
+        containers = PageSnapshot.capture(self.driver).find_all(xpath) if xpath else []
+        if not containers:
+            return None
+        return containers[0].xpath(self.item_xpath)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        element = self.driver.find_element(*self.container)
+        previous = set()
+        can_scroll = True
+        while self.pages < self.max_pages:
+            nodes = self._page()
+            if nodes is None:
+                return
+            current = set()
+            fresh = 0
+            for node in nodes:
+                row = ListHarvester.record(node)
+                key = ListHarvester.fingerprint(row)
+                current.add(key)
+                if key not in previous:
+                    fresh += 1
+                    self.items += 1
+                    yield row
+            if not can_scroll or (not fresh and self.pages > 1):
+                return
+            previous = current
+            can_scroll = bool(self.driver.execute_script(
+                "mobile: scrollGesture", {"elementId": element.id, "direction": "down", "percent": self.percent}
+            ))
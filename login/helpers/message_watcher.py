@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from appium.webdriver.webdriver import WebDriver
+from .page_snapshot import PageSnapshot
+from .wait_budget import WaitBudget
+
+
+class MessageWatcher:
+    """
+    Background thread that records transient messages (toasts, tooltips, error labels).
+
+    Every `interval` seconds it reads the hierarchy once and evaluates all
+    watched XPaths locally. A message is recorded when it appears, and its
+    last_seen time is updated while it stays on screen. Events live in a
+    bounded ring buffer, so assertions can ask "did X appear after T"
+    without racing the UI:
+
+        since = watcher.mark()
+        AuthHelpers.submit_login(driver)
+        assert watcher.wait_for("Invalid Credentials", since=since, timeout=3)
+    """
+
+    def __init__(self, driver: WebDriver, watches: Dict[str, str], interval: float = 0.2, capacity: int = 500):
+        self.driver = driver
+        self.watches = dict(watches)
+        self.interval = interval
+        self.events = deque(maxlen=capacity)
+        self.active: Dict[tuple, Dict] = {}
+        self.condition = threading.Condition()
+        self.polls = 0
+        self.errors = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self) -> "MessageWatcher":
+        if self.thread is None:
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="message-watcher", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def watch(self, name: str, xpath: str):
+        with self.condition:
+            self.watches[name] = xpath
+
+    def _run(self):
+        while not self.stopping.is_set():
+            started = time.time()
+            try:
+                # Raw page source, not ElementHelpers/PageSnapshot.capture: those are traced on the test thread.
+                # Timestamped on arrival, so a message is never dated before a mark() taken mid-request
+                source = self.driver.page_source
+                self.poll(PageSnapshot(source), time.time())
+            except Exception:
+                # Transport errors (urllib3 read timeouts, refused connections) arrive unwrapped; keep polling
+                self.errors += 1
+            self.stopping.wait(max(0.0, self.interval - (time.time() - started)))
+
+    def poll(self, snapshot: PageSnapshot, now: float):
+        """Record messages that appeared in this snapshot and retire the ones that are gone"""
+        seen = set()
+        with self.condition:
+            self.polls += 1
+            for name, xpath in self.watches.items():
+                for node in snapshot.find_all(xpath):
+                    text = node.get("text") or node.get("content-desc") or ""
+                    key = (name, text)
+                    seen.add(key)
+                    event = self.active.get(key)
+                    if event is None:
+                        event = {"name": name, "text": text, "first_seen": now, "last_seen": now}
+                        self.active[key] = event
+                        self.events.append(event)
+                    event["last_seen"] = now
+            for key in [key for key in self.active if key not in seen]:
+                del self.active[key]
+            self.condition.notify_all()
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    @staticmethod
+    def mark() -> float:
+        """Timestamp to pass as `since`: messages first seen after this point"""
+        return time.time()
+
+    @staticmethod
+    def _matches(event: Dict, text: Optional[str], name: Optional[str], since: float) -> bool:
+        return event["first_seen"] >= since and (name is None or event["name"] == name) \
+            and (text is None or text in event["text"])
+
+    def history(self, text: Optional[str] = None, name: Optional[str] = None, since: float = 0.0) -> List[Dict]:
+        """Recorded events matching text (substring) and/or watch name that appeared at or after since"""
+        with self.condition:
+            return [dict(e) for e in self.events if MessageWatcher._matches(e, text, name, since)]
+
+    def seen(self, text: Optional[str] = None, name: Optional[str] = None, since: float = 0.0) -> Optional[Dict]:
+        """Instant check: the first matching event, or None"""
+        found = self.history(text, name, since)
+        return found[0] if found else None
+
+    def wait_for(self, text: Optional[str] = None, name: Optional[str] = None, since: float = 0.0,
+                 timeout: float = 5) -> Optional[Dict]:
+        """Block until a matching event is recorded (or already was); None after timeout (capped by the WaitBudget)"""
+        with WaitBudget.wait(self.driver, "wait_for_message", timeout, text or name or "") as charge:
+            end_time = time.time() + charge.timeout
+            with self.condition:
+                while True:
+                    for event in self.events:
+                        if MessageWatcher._matches(event, text, name, since):
+                            return dict(event)
+                    remaining = end_time - time.time()
+                    if remaining <= 0 or self.thread is None:
+                        charge.outcome = "timeout"
+                        return None
+                    self.condition.wait(remaining)
@@ -0,0 +1,132 @@
+import argparse
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class PageArchive:
+    """
+    Content-addressed, gzip-compressed store of page sources.
+    Identical hierarchies are stored once; index.jsonl maps (test, step, screen, timestamp) to a blob hash.
+
+    Layout:
+        <root>/blobs/ab/abcdef....xml.gz
+        <root>/index.jsonl
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.current_test: Optional[str] = None
+        self.lock = threading.Lock()
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}.xml.gz")
+
+    def add(self, source: str, test: Optional[str] = None, step: Optional[str] = None,
+            screen: Optional[str] = None) -> str:
+        """Store the source (once per distinct content), index it and return its hash"""
+        data = source.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        with self.lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                # Unique temp file: parallel workers may store the same blob at once
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path), suffix=".tmp")
+                # GzipFile leaves a passed-in fileobj open, so the raw file gets its own with
+                with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+            entry = {
+                "hash": digest, "test": test or self.current_test, "step": step, "screen": screen,
+                "timestamp": time.time(), "size": len(data),
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return digest
+
+    def entries(self) -> List[Dict]:
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def query(self, test: Optional[str] = None, step: Optional[str] = None, screen: Optional[str] = None,
+              since: Optional[float] = None) -> List[Dict]:
+        """Index entries matching all given filters (test matches by substring)"""
+        return [
+            e for e in self.entries()
+            if (test is None or test in (e["test"] or ""))
+            and (step is None or e["step"] == step)
+            and (screen is None or e["screen"] == screen)
+            and (since is None or e["timestamp"] >= since)
+        ]
+
+    def resolve(self, prefix: str) -> str:
+        """Expand a unique hash prefix to the full hash"""
+        matches = {e["hash"] for e in self.entries() if e["hash"].startswith(prefix)}
+        if len(matches) != 1:
+            raise KeyError(f"{len(matches)} snapshots match '{prefix}'")
+        return matches.pop()
+
+    def get(self, digest: str) -> str:
+        with gzip.open(self._blob_path(self.resolve(digest)), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def diff(self, digest_a: str, digest_b: str) -> List[str]:
+        """Unified diff of two snapshots, one node per line"""
+        digest_a, digest_b = self.resolve(digest_a), self.resolve(digest_b)
+        a = self.get(digest_a).replace("><", ">\n<").splitlines()
+        b = self.get(digest_b).replace("><", ">\n<").splitlines()
+        return list(difflib.unified_diff(a, b, digest_a[:12], digest_b[:12], lineterm=""))
+
+    def stats(self) -> Dict:
+        entries = self.entries()
+        blobs = {e["hash"]: e["size"] for e in entries}
+        stored = sum(os.path.getsize(self._blob_path(h)) for h in blobs if os.path.exists(self._blob_path(h)))
+        return {
+            "snapshots": len(entries), "unique": len(blobs),
+            "raw_bytes": sum(e["size"] for e in entries), "stored_bytes": stored,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the page-source archive")
+    parser.add_argument("root", help="archive directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    listing = sub.add_parser("list", help="list indexed snapshots")
+    listing.add_argument("--test")
+    listing.add_argument("--step")
+    listing.add_argument("--screen")
+    sub.add_parser("stats", help="deduplication and compression totals")
+    show = sub.add_parser("show", help="print a snapshot")
+    show.add_argument("hash")
+    diff = sub.add_parser("diff", help="diff two snapshots")
+    diff.add_argument("hash_a")
+    diff.add_argument("hash_b")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.root)
+    if args.command == "list":
+        for e in archive.query(args.test, args.step, args.screen):
+            print(f"{e['hash'][:12]}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['timestamp']))}"
+                  f"  {e['screen'] or '-':<16}{e['step'] or '-':<24}{e['test'] or '-'}")
+    elif args.command == "stats":
+        print(json.dumps(archive.stats(), indent=1))
+    elif args.command == "show":
+        print(archive.get(args.hash))
+    else:
+        print("\n".join(archive.diff(args.hash_a, args.hash_b)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from lxml import etree
+from appium.webdriver.common.appiumby import AppiumBy
+from appium.webdriver.webdriver import WebDriver
+from .element_helpers import ElementHelpers
+from .wait_budget import WaitBudget
+
+T = TypeVar("T")
+
+
+class PageSnapshot:
+    """
+    Parsed copy of the UI hierarchy for evaluating queries locally.
+    One page-source fetch answers any number of XPath/text/attribute
+    queries; a real element handle is only fetched when we must interact.
+    """
+
+    _compiled: Dict[str, etree.XPath] = {}
+
+    def __init__(self, source: str):
+        self.source = source
+        self.root = None
+        if source:
+            try:
+                self.root = etree.fromstring(source.encode("utf-8"))
+            except etree.XMLSyntaxError as e:
+                print(f"⚠ Failed to parse page source: {e}")
+
+    @classmethod
+    def capture(cls, driver: WebDriver) -> "PageSnapshot":
+        """Fetch the hierarchy once and wrap it"""
+        return cls(ElementHelpers.get_page_source(driver))
+
+    @staticmethod
+    def compile(xpath: str) -> etree.XPath:
+        """Return a precompiled XPath expression, cached by its source text"""
+        compiled = PageSnapshot._compiled.get(xpath)
+        if compiled is None:
+            compiled = PageSnapshot._compiled[xpath] = etree.XPath(xpath)
+        return compiled
+
+    @staticmethod
+    def literal(value: str) -> str:
+        """XPath string literal for value; XPath 1.0 has no escapes, so mixed quotes go through concat()"""
+        if "'" not in value:
+            return f"'{value}'"
+        if '"' not in value:
+            return f'"{value}"'
+        return "concat(" + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ")"
+
+    @staticmethod
+    def to_xpath(by: str, selector: str) -> Optional[str]:
+        """Translate a (by, selector) locator to XPath, or None if it has no local equivalent"""
+        if by == AppiumBy.XPATH:
+            return selector
+        if by == AppiumBy.ID:
+            return f"//*[@resource-id={PageSnapshot.literal(selector)}]"
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            return f"//*[@content-desc={PageSnapshot.literal(selector)}]"
+        if by == AppiumBy.CLASS_NAME:
+            return f"//{selector}"
+        return None
+
+    def find_all(self, xpath: str) -> list:
+        """Return all nodes matching the XPath"""
+        if self.root is None:
+            return []
+        return PageSnapshot.compile(xpath)(self.root)
+
+    def first_match(self, selectors: List[Tuple]) -> Optional[int]:
+        """Return the index of the first selector that matches, or None"""
+        for index, (by, selector) in enumerate(selectors):
+            xpath = PageSnapshot.to_xpath(by, selector)
+            if xpath and self.find_all(xpath):
+                return index
+        return None
+
+    def exists(self, selectors: List[Tuple]) -> bool:
+        """Check if any selector from the list matches"""
+        return self.first_match(selectors) is not None
+
+    def attribute(self, xpath: str, name: str) -> Optional[str]:
+        """Return an attribute of the first node matching the XPath"""
+        nodes = self.find_all(xpath)
+        return nodes[0].get(name) if nodes else None
+
+    def text(self, xpath: str) -> Optional[str]:
+        """Return the text of the first node matching the XPath"""
+        return self.attribute(xpath, "text")
+
+    def texts(self, xpath: str = "//*[@text]") -> List[str]:
+        """Return the text of every node matching the XPath"""
+        return [node.get("text") or "" for node in self.find_all(xpath)]
+
+    def find_text(self, substring: str, xpath: str = "//android.widget.TextView") -> Optional[str]:
+        """Return the first text containing substring, or None"""
+        for text in self.texts(xpath):
+            if substring in text:
+                return text
+        return None
+
+    @staticmethod
+    def element(driver: WebDriver, xpath: str):
+        """Fetch a real element handle for interaction"""
+        return driver.find_element(AppiumBy.XPATH, xpath)
+
+    @staticmethod
+    def wait_until(driver: WebDriver, query: Callable[["PageSnapshot"], T], timeout: float = 5,
+                   poll_frequency: float = 0.3) -> Optional[T]:
+        """Re-capture once per poll until query returns a truthy value; None on timeout (capped by the WaitBudget)"""
+        with WaitBudget.wait(driver, "wait_until", timeout) as charge:
+            end_time = time.time() + charge.timeout
+            while True:
+                result = query(PageSnapshot.capture(driver))
+                if result:
+                    return result
+                if time.time() >= end_time:
+                    charge.outcome = "timeout"
+                    return None
+                time.sleep(poll_frequency)
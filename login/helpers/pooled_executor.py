@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import urllib3
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+from appium.webdriver.appium_connection import AppiumConnection
+from appium.webdriver.client_config import AppiumClientConfig
+
+
+class _ResetRetry(Retry):
+    """
+    Bounded retries for connection failures and resets.
+    Failures before the request was sent are always retried. Resets after it was
+    sent are retried only where replaying is harmless (GET/DELETE, and new-session
+    requests, which carry an idempotency key): replaying a click could tap twice.
+    Read timeouts are never retried, so a hung command fails after one timeout.
+    """
+
+    REPLAYABLE_METHODS = {"GET", "DELETE", "HEAD"}
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if error is not None and self._is_read_error(error) and (
+                isinstance(error, ReadTimeoutError)
+                or not (method in _ResetRetry.REPLAYABLE_METHODS or (url or "").rstrip("/").endswith("/session"))):
+            raise error.with_traceback(_stacktrace)
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if error is not None:
+            PooledExecutor.count("retries")
+        return retry
+
+
+class _SharedPool:
+    """PoolManager front end that applies the calling thread's command timeout and survives session close()"""
+
+    def __init__(self, manager: urllib3.PoolManager, local: threading.local):
+        self.manager = manager
+        self.local = local
+
+    def request(self, method, url, timeout=None, **kwargs):
+        timeout = getattr(self.local, "timeout", None) or timeout
+        return self.manager.request(method, url, timeout=timeout, **kwargs)
+
+    def clear(self):
+        # Other sessions keep using the pool; see PooledExecutor.close_all
+        pass
+
+
+class PooledExecutor(AppiumConnection):
+    """
+    Remote command executor whose keep-alive connection pool is shared by every
+    session to the same Appium server, instead of one default pool per driver.
+
+        driver = webdriver.Remote(PooledExecutor.for_server(url), options=options)
+
+    Each command gets its own timeout (COMMAND_TIMEOUTS by command name, e.g.
+    newSession, else COMMAND_TIMEOUT) so a hung command fails fast while session
+    startup may take minutes. Connection failures and resets are retried up to
+    RETRIES times (see _ResetRetry). metrics() reports connections opened and
+    reused, retries, and request latency per command.
+    """
+
+    POOL_SIZE = 4
+    RETRIES = 2
+    CONNECT_TIMEOUT = 10.0
+    COMMAND_TIMEOUT = 60.0
+    COMMAND_TIMEOUTS: Dict[str, float] = {"newSession": 300.0}
+
+    _pools: Dict[str, urllib3.PoolManager] = {}
+    _lock = threading.Lock()
+    _counters = {"retries": 0, "errors": 0, "timeouts": 0}
+    _latency: Dict[str, Dict] = {}
+
+    def __init__(self, client_config: AppiumClientConfig):
+        self._local = threading.local()
+        super().__init__(client_config=client_config)
+
+    @classmethod
+    def configure(cls, pool_size: Optional[int] = None, retries: Optional[int] = None,
+                  connect_timeout: Optional[float] = None, command_timeout: Optional[float] = None,
+                  command_timeouts: Optional[Dict[str, float]] = None):
+        """Set pool and timeout defaults; pools already created keep their size and retries"""
+        cls.POOL_SIZE = cls.POOL_SIZE if pool_size is None else pool_size
+        cls.RETRIES = cls.RETRIES if retries is None else retries
+        cls.CONNECT_TIMEOUT = cls.CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        cls.COMMAND_TIMEOUT = cls.COMMAND_TIMEOUT if command_timeout is None else command_timeout
+        if command_timeouts:
+            cls.COMMAND_TIMEOUTS = dict(cls.COMMAND_TIMEOUTS, **command_timeouts)
+
+    @classmethod
+    def for_server(cls, server_url: str) -> "PooledExecutor":
+        """New executor (one per driver) on the shared pool for this server"""
+        return cls(AppiumClientConfig(remote_server_addr=server_url, keep_alive=True, timeout=cls.COMMAND_TIMEOUT))
+
+    @staticmethod
+    def _pool_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _get_connection_manager(self):
+        key = PooledExecutor._pool_key(self._client_config.remote_server_addr)
+        with PooledExecutor._lock:
+            manager = PooledExecutor._pools.get(key)
+            if manager is None:
+                retries = _ResetRetry(total=PooledExecutor.RETRIES, connect=PooledExecutor.RETRIES,
+                                      read=PooledExecutor.RETRIES, status=0, allowed_methods=None,
+                                      backoff_factor=0.2, raise_on_redirect=False)
+                manager = urllib3.PoolManager(
+                    num_pools=4, maxsize=PooledExecutor.POOL_SIZE, block=False, retries=retries,
+                    timeout=urllib3.Timeout(connect=PooledExecutor.CONNECT_TIMEOUT, read=PooledExecutor.COMMAND_TIMEOUT),
+                )
+                PooledExecutor._pools[key] = manager
+        return _SharedPool(manager, self._local)
+
+    def execute(self, command, params):
+        """Send one command under its own read timeout and record its latency"""
+        seconds = PooledExecutor.COMMAND_TIMEOUTS.get(command, PooledExecutor.COMMAND_TIMEOUT)
+        self._local.timeout = urllib3.Timeout(connect=PooledExecutor.CONNECT_TIMEOUT, read=seconds)
+        start = time.time()
+        try:
+            return super().execute(command, params)
+        except ReadTimeoutError:
+            PooledExecutor.count("timeouts")
+            raise
+        except Exception:
+            PooledExecutor.count("errors")
+            raise
+        finally:
+            self._local.timeout = None
+            PooledExecutor._observe(command, time.time() - start)
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    @classmethod
+    def count(cls, name: str):
+        with cls._lock:
+            cls._counters[name] += 1
+
+    @classmethod
+    def _observe(cls, command: str, seconds: float):
+        with cls._lock:
+            entry = cls._latency.setdefault(command, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+
+    @classmethod
+    def metrics(cls) -> Dict:
+        """Connections opened and reused, retries, timeouts, errors and per-command latency since start"""
+        with cls._lock:
+            opened = requests = 0
+            for manager in cls._pools.values():
+                for key in manager.pools.keys():
+                    pool = manager.pools[key]
+                    opened += pool.num_connections
+                    requests += pool.num_requests
+            latency = {command: dict(entry, mean=entry["total"] / entry["count"])
+                       for command, entry in cls._latency.items()}
+            return dict(cls._counters, connections_opened=opened, http_requests=requests,
+                        connections_reused=max(0, requests - opened), latency=latency)
+
+    @classmethod
+    def format_report(cls, top: int = 8) -> str:
+        m = cls.metrics()
+        commands = sum(entry["count"] for entry in m["latency"].values())
+        total = sum(entry["total"] for entry in m["latency"].values())
+        lines = [f"HTTP executor: {commands} commands over {m['connections_opened']} connection(s) "
+                 f"({m['connections_reused']} reused); {m['retries']} retries, {m['timeouts']} timeouts, "
+                 f"{m['errors']} errors; {total:.1f}s in requests"]
+        slowest = sorted(m["latency"].items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+        for command, entry in slowest:
+            lines.append(f"  {command:<28}{entry['count']:>6}x  mean {entry['mean'] * 1000:7.1f}ms  "
+                         f"max {entry['max'] * 1000:7.1f}ms")
+        return "\n".join(lines)
+
+    @classmethod
+    def close_all(cls):
+        """Close every shared pool's connections (end of the run)"""
+        with cls._lock:
+            for manager in cls._pools.values():
+                manager.clear()
+            cls._pools.clear()
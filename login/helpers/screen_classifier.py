@@ -0,0 +1,258 @@
+import argparse
+import io
+import json
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from appium.webdriver.webdriver import WebDriver
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow is optional; without it only 8-bit, non-interlaced PNGs can be decoded (and more slowly)
+    Image = None
+
+# What a corrupt or unsupported screenshot raises while decoding (Pillow's errors are OSErrors)
+DECODE_ERRORS = (ValueError, OSError, zlib.error, struct.error)
+
+
+class ScreenClassifier:
+    """
+    "Where am I" from one screenshot.
+
+    Each screenshot is reduced to a DCT perceptual hash (grey, area-resampled
+    to 4*hash_size square, low-frequency block thresholded at its median) and
+    compared with a library of reference hashes per screen by Hamming
+    distance, all references at once. Near-identical renders of a screen land
+    within a few bits of each other; different layouts are tens of bits apart.
+    Screens sharing a layout can still be close, so treat a match as a
+    pre-filter and confirm with the hierarchy where it matters.
+    """
+
+    def __init__(self, library_path: Optional[str] = None, hash_size: int = 16, max_distance: Optional[int] = None):
+        self.library_path = library_path
+        self.hash_size = hash_size
+        # Default threshold: 10% of the hash bits
+        self.max_distance = max_distance if max_distance is not None else int(hash_size * hash_size * 0.1)
+        self.labels: List[str] = []
+        self.hashes = np.zeros((0, hash_size * hash_size // 8), dtype=np.uint8)
+        self._dct = ScreenClassifier._dct_matrix(hash_size * 4)
+        if library_path and os.path.exists(library_path):
+            with open(library_path, "r", encoding="utf-8") as f:
+                library = json.load(f)
+            if library.get("hash_size") == hash_size:
+                for screen, hexes in library["screens"].items():
+                    for value in hexes:
+                        self._append(screen, np.frombuffer(bytes.fromhex(value), dtype=np.uint8))
+            else:
+                print(f"⚠ Ignoring screen library {library_path}: built with hash size {library.get('hash_size')}")
+
+    # ----------------------------
+    # Hashing
+    # ----------------------------
+    @staticmethod
+    def _dct_matrix(n: int) -> np.ndarray:
+        k = np.arange(n)[:, None]
+        matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+        matrix[0] /= np.sqrt(2)
+        return matrix * np.sqrt(2 / n)
+
+    @staticmethod
+    def _unfilter(filters: np.ndarray, rows: np.ndarray, channels: int) -> np.ndarray:
+        """
+        Reverse the PNG row filters (0 None, 1 Sub, 2 Up, 3 Average, 4 Paeth) of a whole image.
+        Average and Paeth need the decoded byte to the left as well as the row above, so the image is
+        decoded one anti-diagonal (x + y) of pixels at a time, every filter kind in one vectorized step.
+        """
+        unknown = set(np.unique(filters).tolist()) - {0, 1, 2, 3, 4}
+        if unknown:
+            raise ValueError(f"Unknown PNG row filter {min(unknown)}")
+        height, stride = rows.shape
+        width = stride // channels
+        data = rows.reshape(height, width, channels)
+        # Skewed layout: pixel (y, x) lives at out[x + y + 2, y + 1], so a diagonal's neighbours are plain
+        # slices; slots outside the image stay 0, which is what PNG assumes there
+        out = np.zeros((height + width + 1, height + 1, channels), dtype=np.uint8)
+        sub, up_row, average, paeth = ((filters == kind)[:, None] for kind in (1, 2, 3, 4))
+        for t in range(height + width - 1):
+            y0, y1 = max(0, t - width + 1), min(height, t + 1)
+            ys = np.arange(y0, y1)
+            left = out[t + 1, y0 + 1:y1 + 1].astype(np.int16)
+            up = out[t + 1, y0:y1].astype(np.int16)
+            predicted = np.where(sub[y0:y1], left, np.where(up_row[y0:y1], up, 0))
+            if average[y0:y1].any():
+                predicted = np.where(average[y0:y1], (left + up) >> 1, predicted)
+            if paeth[y0:y1].any():
+                upper_left = out[t, y0:y1].astype(np.int16)
+                pa, pb, pc = np.abs(up - upper_left), np.abs(left - upper_left), np.abs(left + up - 2 * upper_left)
+                nearest = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+                predicted = np.where(paeth[y0:y1], nearest, predicted)
+            # Assigning into uint8 wraps modulo 256, as the filters are defined
+            out[t + 2, y0 + 1:y1 + 1] = data[ys, t - ys] + predicted
+        ys, xs = np.indices((height, width))
+        return out[ys + xs + 2, ys + 1].reshape(height, stride)
+
+    @staticmethod
+    def _decode_png(data: bytes) -> np.ndarray:
+        """Minimal 8-bit, non-interlaced PNG decoder (grey/RGB/RGBA) for when Pillow is missing"""
+        if data[:8] != b"\x89PNG\r\n\x1a\n":
+            raise ValueError("Not a PNG image")
+        offset, idat = 8, []
+        width = height = depth = color = interlace = None
+        while offset < len(data):
+            length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+            body = data[offset + 8:offset + 8 + length]
+            if kind == b"IHDR":
+                width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+            elif kind == b"IDAT":
+                idat.append(body)
+            offset += length + 12
+        channels = {0: 1, 2: 3, 4: 2, 6: 4}.get(color)
+        if depth != 8 or channels is None or interlace:
+            raise ValueError("Unsupported PNG format without Pillow (install Pillow)")
+        stride = width * channels
+        raw = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(height, stride + 1)
+        image = ScreenClassifier._unfilter(raw[:, 0], raw[:, 1:], channels).reshape(height, width, channels)
+        return image[..., 0] if channels <= 2 else image[..., :3] @ np.array([0.299, 0.587, 0.114])
+
+    @staticmethod
+    def grey(image: Union[bytes, str]) -> np.ndarray:
+        """Grey float image from PNG bytes or a file path"""
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                image = f.read()
+        if Image is not None:
+            return np.asarray(Image.open(io.BytesIO(image)).convert("L"), dtype=np.float64)
+        return np.asarray(ScreenClassifier._decode_png(image), dtype=np.float64)
+
+    @staticmethod
+    def _resample(grey: np.ndarray, size: int) -> np.ndarray:
+        """Area-average down to size x size (smaller images are first enlarged by repeating pixels)"""
+        for axis in (0, 1):
+            if grey.shape[axis] < size:
+                grey = np.repeat(grey, -(-size // grey.shape[axis]), axis=axis)
+        rows = np.linspace(0, grey.shape[0], size + 1).astype(int)[:-1]
+        cols = np.linspace(0, grey.shape[1], size + 1).astype(int)[:-1]
+        sums = np.add.reduceat(np.add.reduceat(grey, rows, axis=0), cols, axis=1)
+        counts = np.outer(np.diff(np.append(rows, grey.shape[0])), np.diff(np.append(cols, grey.shape[1])))
+        return sums / counts
+
+    def phash(self, image: Union[bytes, str]) -> np.ndarray:
+        """Packed perceptual hash (hash_size * hash_size bits)"""
+        small = ScreenClassifier._resample(ScreenClassifier.grey(image), self.hash_size * 4)
+        low = (self._dct @ small @ self._dct.T)[:self.hash_size, :self.hash_size].reshape(-1)
+        return np.packbits(low > np.median(low[1:]))
+
+    # ----------------------------
+    # Library
+    # ----------------------------
+    def _append(self, screen: str, value: np.ndarray):
+        self.labels.append(screen)
+        self.hashes = np.vstack([self.hashes, value[None, :]])
+
+    def add(self, screen: str, image: Union[bytes, str]) -> np.ndarray:
+        value = self.phash(image)
+        self._append(screen, value)
+        return value
+
+    def learn(self, driver: WebDriver, screen: str, image: Optional[bytes] = None) -> bool:
+        """Add a reference for a screen verified by other means, unless the screenshot already classifies as it"""
+        image = image if image is not None else driver.get_screenshot_as_png()
+        try:
+            value = self.phash(image)
+            if self._closest(value)[0] == screen:
+                return False
+            self._append(screen, value)
+        except DECODE_ERRORS as e:
+            print(f"⚠ Screen classifier: could not decode the {screen} screenshot: {e}")
+            return False
+        return True
+
+    def save(self):
+        if not self.library_path:
+            return
+        screens: Dict[str, List[str]] = {}
+        for screen, value in zip(self.labels, self.hashes):
+            screens.setdefault(screen, []).append(value.tobytes().hex())
+        os.makedirs(os.path.dirname(self.library_path) or ".", exist_ok=True)
+        # Unique temp file: parallel workers save the same library file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.library_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"hash_size": self.hash_size, "screens": screens}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.library_path)
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def distances(self, value: np.ndarray) -> np.ndarray:
+        """Hamming distance from value to every reference"""
+        differing = np.bitwise_xor(self.hashes, value[None, :])
+        if hasattr(np, "bitwise_count"):
+            return np.bitwise_count(differing).sum(axis=1)
+        return np.unpackbits(differing, axis=1).sum(axis=1)
+
+    def candidates(self, image: Union[bytes, str], max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Screens with a reference within max_distance, closest first (best distance per screen)"""
+        if not self.labels:
+            return []
+        limit = self.max_distance if max_distance is None else max_distance
+        best: Dict[str, int] = {}
+        for screen, distance in zip(self.labels, self.distances(self.phash(image)).tolist()):
+            if distance <= limit and distance < best.get(screen, limit + 1):
+                best[screen] = distance
+        return sorted(best.items(), key=lambda item: item[1])
+
+    def classify(self, image: Union[bytes, str]) -> Tuple[Optional[str], Optional[int]]:
+        """(closest screen, distance), or (None, distance) if nothing is within max_distance"""
+        return self._closest(self.phash(image))
+
+    def _closest(self, value: np.ndarray) -> Tuple[Optional[str], Optional[int]]:
+        if not self.labels:
+            return None, None
+        distances = self.distances(value)
+        index = int(np.argmin(distances))
+        distance = int(distances[index])
+        return (self.labels[index] if distance <= self.max_distance else None), distance
+
+    def where_am_i(self, driver: WebDriver) -> Optional[str]:
+        """One screenshot, one lookup: the current screen or None if it is not in the library (or not decodable)"""
+        try:
+            return self.classify(driver.get_screenshot_as_png())[0]
+        except DECODE_ERRORS as e:
+            print(f"⚠ Screen classifier: could not decode the screenshot: {e}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a screen reference library")
+    parser.add_argument("library", help="library JSON file")
+    parser.add_argument("--hash-size", type=int, default=16)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="add reference screenshots for a screen")
+    add.add_argument("screen")
+    add.add_argument("images", nargs="+")
+    classify = sub.add_parser("classify", help="identify screenshots")
+    classify.add_argument("images", nargs="+")
+    sub.add_parser("list", help="references per screen")
+    args = parser.parse_args()
+
+    classifier = ScreenClassifier(args.library, args.hash_size)
+    if args.command == "add":
+        for path in args.images:
+            classifier.add(args.screen, path)
+        classifier.save()
+        print(f"✓ {len(args.images)} reference(s) added for {args.screen}")
+    elif args.command == "classify":
+        for path in args.images:
+            screen, distance = classifier.classify(path)
+            print(f"{path}: {screen or '(unknown)'} (distance {distance})")
+    else:
+        for screen in sorted(set(classifier.labels)):
+            print(f"{screen:<24}{classifier.labels.count(screen)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from lxml import etree
+from appium.webdriver.webdriver import WebDriver
+from .element_helpers import ElementHelpers
+from .page_snapshot import PageSnapshot
+from .screen_navigator import DRAWER, SIGNED_OUT
+from .state_scheduler import LOGGED_IN, LOGGED_OUT, SCREEN_PREFIX
+
+PASSWORD_STEP = "(password step)"
+
+
+class ScreenFingerprints:
+    """
+    Structural fingerprints of each screen, per app build, for change-impact test selection.
+
+    A fingerprint hashes the hierarchy with everything that changes between
+    two visits of an unchanged screen removed: bounds and state attributes,
+    toasts, digits and e-mail addresses in texts, the texts inside scrollable
+    lists (their rows are data) and repeated identical siblings (list length).
+    Each screen also records which known selectors resolve on it, so a new
+    build can be compared with a baseline build by:
+
+        changed(build, against)          screens whose structure differs
+        selectors_on(screens, *builds)   selectors to re-verify on those screens
+        dead_selectors(build, against)   selectors that resolved before and resolve nowhere now
+        select_tests(tests, changed)     tests whose declared states touch a changed screen
+    """
+
+    SCHEMA_VERSION = 1
+    # Attributes that identify a node; everything else (bounds, focus, selection...) is state
+    KEPT_ATTRIBUTES = ("class", "resource-id", "content-desc", "text", "hint", "clickable", "scrollable",
+                       "password", "checkable")
+    TRANSIENT_CLASSES = {"android.widget.Toast"}
+    VOLATILE_TEXT = [re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+"), re.compile(r"\d+")]
+
+    def __init__(self, path: str, max_builds: int = 10):
+        self.path = path
+        self.max_builds = max_builds
+        self.builds = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("schema") != ScreenFingerprints.SCHEMA_VERSION:
+            print(f"⚠ Discarding screen fingerprints with schema {data.get('schema')}: {self.path}")
+            return {}
+        return data.get("builds", {})
+
+    # ----------------------------
+    # Fingerprinting
+    # ----------------------------
+    @staticmethod
+    def _canonical(node, in_list: bool) -> str:
+        """Normalized subtree as a string, with runs of identical siblings collapsed to one"""
+        attributes = []
+        for name in ScreenFingerprints.KEPT_ATTRIBUTES:
+            value = node.get(name) or ""
+            if name == "text":
+                value = "" if in_list else value
+                for pattern in ScreenFingerprints.VOLATILE_TEXT:
+                    value = pattern.sub("#", value)
+            if value:
+                attributes.append(f"{name}={value}")
+        in_list = in_list or node.get("scrollable") == "true"
+        children, previous = [], None
+        for child in node:
+            if not isinstance(child.tag, str) or child.get("class", child.tag) in ScreenFingerprints.TRANSIENT_CLASSES:
+                continue
+            canonical = ScreenFingerprints._canonical(child, in_list)
+            if canonical != previous:
+                children.append(canonical)
+            previous = canonical
+        return f"<{node.tag} {' '.join(attributes)}>{''.join(children)}</{node.tag}>"
+
+    @staticmethod
+    def normalize(source: str) -> str:
+        return ScreenFingerprints._canonical(etree.fromstring(source.encode("utf-8")), False)
+
+    @staticmethod
+    def fingerprint(source: str) -> str:
+        return hashlib.sha1(ScreenFingerprints.normalize(source).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def named_selectors(owner) -> Dict[str, str]:
+        """'by|selector' -> attribute name (e.g. EMAIL_SELECTORS[1]) for every locator declared on a class"""
+        named = {}
+        for attribute, value in vars(owner).items():
+            if not attribute.isupper():
+                continue
+            if isinstance(value, tuple) and len(value) == 2 and all(isinstance(v, str) for v in value):
+                named.setdefault(f"{value[0]}|{value[1]}", attribute)
+            elif isinstance(value, list):
+                for index, item in enumerate(value):
+                    if isinstance(item, tuple) and len(item) == 2:
+                        named.setdefault(f"{item[0]}|{item[1]}", f"{attribute}[{index}]")
+        return named
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def record(self, build: str, screen: str, source: str, selectors: List[str]):
+        """Store a screen's fingerprint and the selector keys ('by|selector') that resolve on it"""
+        snapshot = PageSnapshot(source)
+        resolved = []
+        for key in selectors:
+            by, _, selector = key.partition("|")
+            xpath = PageSnapshot.to_xpath(by, selector)
+            try:
+                if xpath and snapshot.find_all(xpath):
+                    resolved.append(key)
+            except etree.XPathError:
+                pass
+        entry = self.builds.setdefault(build, {"saved": time.time(), "screens": {}})
+        entry["saved"] = time.time()
+        entry["screens"][screen] = {"hash": ScreenFingerprints.fingerprint(source), "selectors": resolved}
+
+    def crawl(self, driver: WebDriver, build: str, steps: List[Tuple[str, Callable[[WebDriver], bool]]],
+              selectors: List[str]) -> List[str]:
+        """Run each (screen, go) step, then fingerprint the settled screen; returns the screens reached"""
+        reached = []
+        for screen, go in steps:
+            start = time.time()
+            if not go(driver):
+                print(f"⚠ Could not reach {screen}; it will count as changed")
+                self.builds.setdefault(build, {"saved": time.time(), "screens": {}})["screens"].pop(screen, None)
+                continue
+            ElementHelpers.wait_for_idle(driver)
+            self.record(build, screen, ElementHelpers.get_page_source(driver), selectors)
+            reached.append(screen)
+            print(f"✓ {screen:<20}{time.time() - start:6.2f}s  {self.builds[build]['screens'][screen]['hash'][:12]}")
+        return reached
+
+    # ----------------------------
+    # Comparison
+    # ----------------------------
+    def screens(self, build: str) -> Dict[str, Dict]:
+        return self.builds.get(build, {}).get("screens", {})
+
+    def changed(self, build: str, against: str) -> List[str]:
+        """Screens added, removed or structurally different between two builds"""
+        new, old = self.screens(build), self.screens(against)
+        return sorted(s for s in set(new) | set(old) if new.get(s, {}).get("hash") != old.get(s, {}).get("hash"))
+
+    def selectors_on(self, screens: List[str], *builds: str) -> List[str]:
+        """Selector keys resolving on any of the screens in any of the builds"""
+        keys = set()
+        for build in builds:
+            for screen in screens:
+                keys.update(self.screens(build).get(screen, {}).get("selectors", []))
+        return sorted(keys)
+
+    def _resolving(self, build: str) -> Set[str]:
+        return {key for entry in self.screens(build).values() for key in entry["selectors"]}
+
+    def dead_selectors(self, build: str, against: str) -> List[str]:
+        """Selectors that resolved somewhere in the baseline build and nowhere in this one"""
+        return sorted(self._resolving(against) - self._resolving(build))
+
+    def never_resolved(self, build: str, selectors: List[str]) -> List[str]:
+        return sorted(set(selectors) - self._resolving(build))
+
+    @staticmethod
+    def screens_touched(requires: Optional[str], produces: Optional[str]) -> Set[str]:
+        """Screens a test passes through, from its declared StateScheduler states"""
+        touched = set()
+        for state in (requires, produces):
+            if state == LOGGED_OUT:
+                touched.update({SIGNED_OUT, PASSWORD_STEP})
+            elif state == LOGGED_IN:
+                touched.update({"Dashboard", DRAWER})
+            elif state and state.startswith(SCREEN_PREFIX):
+                touched.update({state[len(SCREEN_PREFIX):], DRAWER})
+        return touched
+
+    @staticmethod
+    def select_tests(tests: List[Tuple[str, Optional[str], Optional[str]]], changed: List[str]) -> List[str]:
+        """Names of (name, requires, produces) tests touching a changed screen; undeclared tests always run"""
+        changed = set(changed)
+        return [name for name, requires, produces in tests
+                if not (requires or produces) or ScreenFingerprints.screens_touched(requires, produces) & changed]
+
+    def format_report(self, build: str, against: str, named: Optional[Dict[str, str]] = None) -> str:
+        named = named or {}
+        changed = self.changed(build, against)
+        lines = [f"Screens changed in build {build} vs {against}: {len(changed)} of "
+                 f"{len(set(self.screens(build)) | set(self.screens(against)))}"]
+        for screen in changed:
+            state = "new" if screen not in self.screens(against) else (
+                "missing" if screen not in self.screens(build) else "changed")
+            lines.append(f"  {state:<8}{screen}")
+        dead = self.dead_selectors(build, against)
+        if dead:
+            lines.append("⚠ Selectors that no longer resolve on any crawled screen:")
+            lines.extend(f"  {named.get(key, '?'):<34}{key}" for key in dead)
+        return "\n".join(lines)
+
+    def save(self):
+        """Keep the most recently saved builds and write atomically"""
+        newest = sorted(self.builds, key=lambda b: self.builds[b]["saved"], reverse=True)
+        for build in newest[self.max_builds:]:
+            del self.builds[build]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Unique temp file: two crawls may save the same fingerprints file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"schema": ScreenFingerprints.SCHEMA_VERSION, "builds": self.builds}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
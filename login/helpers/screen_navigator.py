@@ -0,0 +1,167 @@
+import heapq
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from appium.webdriver.webdriver import WebDriver
+from .auth_helpers import AuthHelpers
+from .element_helpers import ElementHelpers
+from .page_snapshot import PageSnapshot
+
+DRAWER = "(nav drawer)"
+SIGNED_OUT = "(sign in)"
+
+
+class ScreenNavigator:
+    """
+    Navigation model over the app's screens.
+
+    The current screen is detected from one hierarchy read using the screen
+    title XPaths (constants.MENU_TITLES). Moves are planned as a cheapest path over
+    the graph: screen -> drawer (nav bar button), drawer -> screen (NAV_*
+    selectors), and optional direct deep links. Every executed transition
+    updates a persisted moving average of its cost, so path choices follow
+    what the app actually does.
+    """
+
+    NAV_SELECTORS = {
+        "Dashboard": AuthHelpers.NAV_DASHBOARD_SELECTORS,
+        "Properties": AuthHelpers.NAV_PROPERTY_SELECTORS,
+        "Inspections": AuthHelpers.NAV_INSPECTIONS_SELECTORS,
+        "Violations": AuthHelpers.NAV_VIOLATIONS_SELECTORS,
+        "Non-Compliant": AuthHelpers.NAV_NON_COMPLIANT_SELECTORS,
+        "Contracts": AuthHelpers.NAV_CONTRACTS_SELECTORS,
+        "Marketplace": AuthHelpers.NAV_MARKETPLACE_SELECTORS,
+        "Payment History": AuthHelpers.NAV_PAYMENT_HISTORY_SELECTORS,
+        "Job Filing": AuthHelpers.NAV_JOB_FILLING_SELECTORS,
+        "QompliGov AI": AuthHelpers.NAV_QOMPLIGOV_AI_SELECTORS,
+        "Settings": AuthHelpers.NAV_SETTINGS_SELECTORS,
+    }
+
+    # Initial cost guesses (seconds) before any transition has been measured
+    DEFAULT_COSTS = {"open_drawer": 1.0, "menu": 1.5, "deep_link": 2.5}
+    SMOOTHING = 0.3
+
+    def __init__(self, titles: Dict[str, str], deep_links: Optional[Dict[str, str]] = None,
+                 costs_file: Optional[str] = None, app_package: Optional[str] = None):
+        self.titles = titles
+        self.deep_links = deep_links or {}
+        self.costs_file = costs_file
+        self.app_package = app_package
+        self.costs: Dict[str, float] = {}
+        if costs_file and os.path.exists(costs_file):
+            try:
+                with open(costs_file, "r", encoding="utf-8") as f:
+                    self.costs = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Ignoring navigation costs {costs_file}: {e}")
+
+    # ----------------------------
+    # Detection
+    # ----------------------------
+    @staticmethod
+    def _top(node) -> int:
+        match = re.match(r"\[\d+,(\d+)\]", node.get("bounds", ""))
+        return int(match.group(1)) if match else 0
+
+    def detect(self, snapshot: PageSnapshot) -> Tuple[Optional[str], bool]:
+        """Return (current screen, drawer open) from one snapshot; the screen is None if unknown"""
+        if snapshot.exists(AuthHelpers.EMAIL_SELECTORS[:1]):
+            return SIGNED_OUT, False
+        drawer_open = snapshot.exists(AuthHelpers.SIGN_OUT_SELECTORS[:1])
+        best, best_top = None, None
+        for screen, xpath in self.titles.items():
+            nodes = snapshot.find_all(xpath)
+            if nodes:
+                # Body text can repeat another screen's title; the header title is the top-most match
+                top = min(ScreenNavigator._top(node) for node in nodes)
+                if best_top is None or top < best_top:
+                    best, best_top = screen, top
+        return best, drawer_open
+
+    # ----------------------------
+    # Planning
+    # ----------------------------
+    def cost(self, edge: str) -> float:
+        return self.costs.get(edge, self.DEFAULT_COSTS[edge.split(":")[0]])
+
+    def _edges(self, state: str) -> List[Tuple[str, str]]:
+        """(edge, next state) pairs leaving a state"""
+        edges = []
+        if state == DRAWER:
+            edges += [(f"menu:{screen}", screen) for screen in self.titles if screen in self.NAV_SELECTORS]
+        elif state != SIGNED_OUT:
+            edges.append(("open_drawer", DRAWER))
+        if state != SIGNED_OUT:
+            edges += [(f"deep_link:{screen}", screen) for screen in self.deep_links]
+        return edges
+
+    def plan(self, current: str, drawer_open: bool, target: str) -> Optional[List[Tuple[str, str]]]:
+        """Cheapest list of (edge, resulting state) from the current state to target, [] if already there"""
+        start = DRAWER if drawer_open else current
+        if start == target:
+            return []
+        queue = [(0.0, start, [])]
+        seen = set()
+        while queue:
+            total, state, path = heapq.heappop(queue)
+            if state == target:
+                return path
+            if state in seen:
+                continue
+            seen.add(state)
+            for edge, next_state in self._edges(state):
+                if next_state not in seen:
+                    heapq.heappush(queue, (total + self.cost(edge), next_state, path + [(edge, next_state)]))
+        return None
+
+    # ----------------------------
+    # Execution
+    # ----------------------------
+    def _run_edge(self, driver: WebDriver, edge: str) -> bool:
+        kind, _, screen = edge.partition(":")
+        # Every edge settles: its learned cost covers the whole transition, not just the tap
+        if kind == "open_drawer":
+            return AuthHelpers.click_nav_bar(driver, settle=True)
+        if kind == "menu":
+            # List order matters: the TextView fallbacks also match cards and titles (see AuthHelpers.click_nav_bar)
+            return ElementHelpers.safe_click(driver, self.NAV_SELECTORS[screen], reorder=False, settle=True)
+        args = {"url": self.deep_links[screen]}
+        if self.app_package:
+            args["package"] = self.app_package
+        driver.execute_script("mobile: deepLink", args)
+        ElementHelpers.wait_for_idle(driver)
+        return True
+
+    def _record(self, edge: str, seconds: float):
+        previous = self.costs.get(edge)
+        self.costs[edge] = seconds if previous is None else (1 - self.SMOOTHING) * previous + self.SMOOTHING * seconds
+
+    def navigate(self, driver: WebDriver, target: str) -> bool:
+        """Go to target by the cheapest known path; False if the path could not be planned or executed"""
+        current, drawer_open = self.detect(PageSnapshot.capture(driver))
+        if current is None and not drawer_open:
+            print(f"⚠ Current screen unknown, cannot plan a path to {target}")
+            return False
+        path = self.plan(current, drawer_open, target)
+        if path is None:
+            print(f"⚠ No path from {current} to {target}")
+            return False
+        for edge, _ in path:
+            start = time.time()
+            if not self._run_edge(driver, edge):
+                return False
+            self._record(edge, time.time() - start)
+        return True
+
+    def save(self):
+        if not self.costs_file:
+            return
+        os.makedirs(os.path.dirname(self.costs_file) or ".", exist_ok=True)
+        # Unique temp file: parallel workers save the same costs file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.costs_file) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.costs, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.costs_file)
@@ -0,0 +1,96 @@
+import atexit
+import base64
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
+from appium.webdriver.webdriver import WebDriver
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow is optional; without it screenshots are written as captured
+    Image = None
+
+
+class ScreenshotPipeline:
+    """
+    Non-blocking screenshots: the test thread only fetches the base64 payload,
+    decoding, optional downscaling/re-encoding and the disk write run on a
+    background worker pool. The queue is bounded (capture blocks when it is
+    full) and pending writes are flushed on close() and at interpreter exit.
+    """
+
+    def __init__(self, directory: str, workers: int = 2, max_pending: int = 16,
+                 max_width: Optional[int] = None, image_format: str = "png"):
+        self.directory = directory
+        self.max_width = max_width
+        self.image_format = image_format.lower()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.closed = False
+        if (max_width or self.image_format != "png") and Image is None:
+            print("⚠ Pillow not installed; screenshots will be saved as captured PNGs")
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close)
+
+    def capture(self, driver: WebDriver, filename: str) -> str:
+        """Grab the screenshot and queue it for writing; returns the path it will be written to"""
+        if Image is not None and self.image_format != "png":
+            filename = f"{os.path.splitext(filename)[0]}.{self.image_format}"
+        filepath = os.path.join(self.directory, filename)
+        payload = driver.get_screenshot_as_base64()
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self._write, payload, filepath)
+        except Exception:
+            # e.g. RuntimeError after close(): the slot would otherwise never be released
+            self.slots.release()
+            raise
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._done)
+        return filepath
+
+    def _done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+        self.slots.release()
+
+    def _write(self, payload: str, filepath: str):
+        try:
+            data = base64.b64decode(payload)
+            if Image is not None and (self.max_width or self.image_format != "png"):
+                image = Image.open(io.BytesIO(data))
+                if self.max_width and image.width > self.max_width:
+                    image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+                if self.image_format in ("jpg", "jpeg"):
+                    image = image.convert("RGB")
+                buffer = io.BytesIO()
+                image.save(buffer, format="JPEG" if self.image_format == "jpg" else self.image_format.upper())
+                data = buffer.getvalue()
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
+            print(f"✓ Screenshot saved: {filepath}")
+        except Exception as e:
+            print(f"⚠ Failed to save screenshot: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued screenshots to be written; False if some are still pending after timeout"""
+        with self.lock:
+            pending = list(self.pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        self.executor.shutdown(wait=True)
+        atexit.unregister(self.close)
@@ -0,0 +1,105 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from appium.webdriver.common.appiumby import AppiumBy
+
+
+class SelectorCompiler:
+    """
+    Rewrites common XPath shapes to `-android uiautomator` UiSelector (or ID) locators,
+    which UiAutomator2 resolves without serializing the whole hierarchy.
+
+    Recognized shapes (anything else is returned unchanged):
+        //Class                            -> className
+        //Class[@text='X'], //*[@text='X'] -> className + text
+        //Class[contains(@text, 'X')]      -> className + textContains
+        //*[@resource-id='pkg:id/R']       -> ID locator (unqualified ids stay UiSelector resourceId,
+                                              the id strategy would prefix them with the app package)
+        (//...)[N]                         -> instance(N-1)
+    Predicates on @text, @content-desc, @resource-id and @class may be joined with 'and'.
+    Toast lookups, positional steps such as //Class[2] or paths through parents are not rewritten:
+    they have no exact UiSelector equivalent.
+    """
+
+    _LITERAL = r"(?:'(?P<{0}s>[^']*)'|\"(?P<{0}d>[^\"]*)\")"
+    _INSTANCE = re.compile(r"^\((?P<inner>//.+)\)\[(?P<index>\d+)\]$")
+    _STEP = re.compile(r"^//(?P<cls>\*|[A-Za-z_][\w.]*)(?:\[(?P<predicates>.+)\])?$")
+    _EQUALS = re.compile(r"^@(?P<attr>[\w-]+)\s*=\s*" + _LITERAL.format("v") + r"$")
+    _CONTAINS = re.compile(r"^contains\(\s*@(?P<attr>[\w-]+)\s*,\s*" + _LITERAL.format("v") + r"\s*\)$")
+
+    # XPath attribute -> (UiSelector exact method, UiSelector contains method)
+    _METHODS = {
+        "text": ("text", "textContains"),
+        "content-desc": ("description", "descriptionContains"),
+        "resource-id": ("resourceId", None),
+        "class": ("className", None),
+    }
+
+    # Toasts are only visible to UiAutomator2's XPath search
+    XPATH_ONLY_CLASSES = {"android.widget.Toast"}
+
+    _cache: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    @staticmethod
+    def _predicate(predicate: str) -> Optional[Tuple[str, str]]:
+        """Return (UiSelector method, value) for one predicate, or None if not translatable"""
+        for pattern, contains in ((SelectorCompiler._EQUALS, False), (SelectorCompiler._CONTAINS, True)):
+            match = pattern.match(predicate.strip())
+            if match:
+                methods = SelectorCompiler._METHODS.get(match.group("attr"))
+                method = methods and methods[contains]
+                if not method:
+                    return None
+                value = match.group("vs") if match.group("vs") is not None else match.group("vd")
+                return method, value
+        return None
+
+    @staticmethod
+    def to_uiselector(xpath: str) -> Optional[Tuple[str, str]]:
+        """Translate an XPath to an equivalent (by, selector), or None if no rewrite is safe"""
+        xpath = xpath.strip()
+        instance = None
+        match = SelectorCompiler._INSTANCE.match(xpath)
+        if match:
+            xpath, instance = match.group("inner"), int(match.group("index")) - 1
+        match = SelectorCompiler._STEP.match(xpath)
+        if not match or instance is not None and instance < 0:
+            return None
+        calls: List[Tuple[str, str]] = []
+        if match.group("cls") != "*":
+            calls.append(("className", match.group("cls")))
+        predicates = match.group("predicates")
+        if predicates:
+            # Only flat 'and' conjunctions; any other operator, nesting or position predicate is unsafe
+            if re.search(r"\bor\b|\[|\]|\bnot\(|^\d+$", predicates):
+                return None
+            for predicate in re.split(r"\s+and\s+", predicates):
+                translated = SelectorCompiler._predicate(predicate)
+                if translated is None:
+                    return None
+                calls.append(translated)
+        if not calls or any(m == "className" and v in SelectorCompiler.XPATH_ONLY_CLASSES for m, v in calls):
+            return None
+        if len(calls) == 1 and calls[0][0] == "resourceId" and ":id/" in calls[0][1] and instance is None:
+            return AppiumBy.ID, calls[0][1]
+        selector = "new UiSelector()" + "".join(f".{method}({SelectorCompiler._quote(value)})" for method, value in calls)
+        if instance is not None:
+            selector += f".instance({instance})"
+        return AppiumBy.ANDROID_UIAUTOMATOR, selector
+
+    @staticmethod
+    def compile(by: str, selector: str) -> Tuple[str, str]:
+        """Return the fastest equivalent locator, falling back to the original"""
+        key = (by, selector)
+        compiled = SelectorCompiler._cache.get(key)
+        if compiled is None:
+            compiled = (SelectorCompiler.to_uiselector(selector) if by == AppiumBy.XPATH else None) or key
+            SelectorCompiler._cache[key] = compiled
+        return compiled
+
+    @staticmethod
+    def compile_list(selectors: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return [SelectorCompiler.compile(by, selector) for by, selector in selectors]
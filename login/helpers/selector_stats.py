@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class SelectorStats:
+    """
+    On-disk record of which fallback selector actually matched, per app version.
+    Used to try historically fastest winners first and to report dead selectors.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: str, app_version: str = "unknown", max_versions: int = 5, max_age_days: int = 30):
+        self.path = path
+        self.app_version = app_version
+        self.max_versions = max_versions
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.versions = self._load()
+        self.version = self.versions.setdefault(app_version, {"last_used": time.time(), "selectors": {}})
+
+    @staticmethod
+    def key(by: str, selector: str) -> str:
+        return f"{by}|{selector}"
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("schema") != SelectorStats.SCHEMA_VERSION:
+            print(f"⚠ Discarding selector stats with schema {data.get('schema')}: {self.path}")
+            return {}
+        return data.get("versions", {})
+
+    def record(self, selectors: List[Tuple], winner: Optional[int], latency: float):
+        """
+        Record one resolution: winner (if any) matched after latency seconds.
+        Selectors after the winner were never queried, so only the winner and those before it count as attempted
+        (all of them on a miss).
+        """
+        now = time.time()
+        self.version["last_used"] = now
+        entries = self.version["selectors"]
+        tried = selectors if winner is None else selectors[:winner + 1]
+        for index, (by, selector) in enumerate(tried):
+            entry = entries.setdefault(SelectorStats.key(by, selector),
+                                       {"attempts": 0, "hits": 0, "total_latency": 0.0, "last_seen": now})
+            entry["attempts"] += 1
+            entry["last_seen"] = now
+            if index == winner:
+                entry["hits"] += 1
+                entry["total_latency"] += latency
+
+    def order(self, selectors: List[Tuple]) -> List[Tuple]:
+        """Return selectors with past winners first (fastest mean latency first), others in original order"""
+        entries = self.version["selectors"]
+
+        def rank(item):
+            index, (by, selector) = item
+            entry = entries.get(SelectorStats.key(by, selector))
+            if entry and entry["hits"]:
+                return 0, entry["total_latency"] / entry["hits"], index
+            return 1, 0.0, index
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=rank)]
+
+    def never_matched(self) -> List[Tuple[str, int]]:
+        """Return (selector key, attempts) for selectors tried but never matched on this app version"""
+        return sorted(
+            (key, entry["attempts"]) for key, entry in self.version["selectors"].items()
+            if entry["attempts"] and not entry["hits"]
+        )
+
+    def format_report(self) -> str:
+        lines = [f"Selector stats for app version {self.app_version}:"]
+        for key, entry in sorted(self.version["selectors"].items()):
+            mean = entry["total_latency"] / entry["hits"] if entry["hits"] else 0.0
+            lines.append(f"  {entry['hits']:>4}/{entry['attempts']:<4} hits  {mean:6.2f}s  {key}")
+        dead = self.never_matched()
+        if dead:
+            lines.append("Never matched:")
+            lines.extend(f"  {key} ({attempts} attempts)" for key, attempts in dead)
+        return "\n".join(lines)
+
+    def _evict(self):
+        """Drop stale selectors and keep only the most recently used app versions"""
+        cutoff = time.time() - self.max_age_seconds
+        for data in self.versions.values():
+            data["selectors"] = {k: v for k, v in data["selectors"].items() if v["last_seen"] >= cutoff}
+        newest = sorted(self.versions, key=lambda v: self.versions[v]["last_used"], reverse=True)
+        for version in newest[self.max_versions:]:
+            del self.versions[version]
+
+    def save(self):
+        """Evict and write atomically"""
+        self._evict()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        try:
+            # Unique temp file: parallel workers save the same stats file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"schema": SelectorStats.SCHEMA_VERSION, "versions": self.versions}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠ Failed to save selector stats: {e}")
+
+
+if __name__ == "__main__":
+    # python helpers/selector_stats.py <stats file> [app version]
+    stats = SelectorStats(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "unknown")
+    print(stats.format_report())
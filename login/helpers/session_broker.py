@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import secrets
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional, Tuple
+from appium import webdriver
+from appium.options.common import AppiumOptions
+
+
+class AttachedDriver(webdriver.Remote):
+    """WebDriver bound to an existing Appium session instead of creating a new one"""
+
+    def __init__(self, command_executor, session_id: str, capabilities: Dict):
+        self._attach_session_id = session_id
+        self._attach_capabilities = capabilities
+        super().__init__(command_executor, options=AppiumOptions().load_capabilities(capabilities))
+
+    def start_session(self, capabilities, browser_profile=None) -> None:
+        self.session_id = self._attach_session_id
+        self.caps = self._attach_capabilities
+
+
+class SessionBroker:
+    """
+    Long-lived process that keeps warm Appium sessions per capability set and
+    hands them out to test processes, so a run skips the session handshake and
+    UiAutomator2 bootstrap. Sessions are health-checked on every hand-out and
+    in the background, recycled after max_uses/max_age and reaped when idle.
+
+    Run with: python login/helpers/session_broker.py --address 127.0.0.1:47230
+    Connections exchange pickles, so the broker only listens on localhost unless
+    a host is given, and clients need its authkey (SESSION_BROKER_AUTHKEY).
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, idle_timeout: float = 600,
+                 max_uses: int = 50, max_age: float = 3600, health_interval: float = 60):
+        self.address = address
+        self.authkey = authkey
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.health_interval = health_interval
+        self.sessions: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(server_url: str, capabilities: Dict) -> str:
+        return f"{server_url}|{json.dumps(capabilities, sort_keys=True)}"
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.current_package
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, session_id: str, reason: str):
+        """Forget a session and quit it; call without holding the lock (quit is a network round trip)"""
+        with self.lock:
+            entry = self.sessions.pop(session_id, None)
+        if entry:
+            print(f"✓ Recycling session {session_id} ({reason})")
+            try:
+                entry["driver"].quit()
+            except Exception as e:
+                print(f"⚠ Error quitting session {session_id}: {e}")
+
+    def _expired(self, entry: Dict) -> Optional[str]:
+        if entry["uses"] >= self.max_uses:
+            return "max uses"
+        if time.time() - entry["created"] >= self.max_age:
+            return "max age"
+        return None
+
+    def _check(self, entry: Dict) -> Optional[str]:
+        """Reason to recycle a session, or None; runs outside the lock with the session reserved"""
+        return self._expired(entry) or (None if SessionBroker._healthy(entry["driver"]) else "unhealthy")
+
+    def acquire(self, server_url: str, capabilities: Dict) -> Tuple[str, Dict]:
+        """Lease a healthy idle session for these capabilities, creating one if needed"""
+        key = SessionBroker._key(server_url, capabilities)
+        while True:
+            with self.lock:
+                candidate = next(((sid, e) for sid, e in self.sessions.items() if e["key"] == key and not e["leased"]),
+                                 None)
+                if candidate:
+                    # Reserved while it is health-checked outside the lock
+                    candidate[1]["leased"] = True
+            if not candidate:
+                break
+            session_id, entry = candidate
+            reason = self._check(entry)
+            if reason:
+                self._discard(session_id, reason)
+                continue
+            with self.lock:
+                entry.update(uses=entry["uses"] + 1, last_used=time.time())
+            return session_id, entry["driver"].caps
+        # Create outside the lock; session startup takes tens of seconds
+        driver = webdriver.Remote(server_url, options=AppiumOptions().load_capabilities(capabilities))
+        now = time.time()
+        with self.lock:
+            self.sessions[driver.session_id] = {
+                "driver": driver, "key": key, "leased": True, "uses": 1, "created": now, "last_used": now,
+            }
+        print(f"✓ Started session {driver.session_id}")
+        return driver.session_id, driver.caps
+
+    def release(self, session_id: str, healthy: bool = True):
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if not entry:
+                return
+            if healthy:
+                entry.update(leased=False, last_used=time.time())
+                return
+        self._discard(session_id, "released unhealthy")
+
+    def reap(self):
+        """Quit idle, expired or unhealthy sessions; health checks also keep Appium from timing them out"""
+        with self.lock:
+            idle = [(sid, e) for sid, e in self.sessions.items() if not e["leased"]]
+            for _, entry in idle:
+                entry["leased"] = True
+        # Checked and quit outside the lock, so acquire/release are not held up by the network
+        for session_id, entry in idle:
+            reason = "idle" if time.time() - entry["last_used"] >= self.idle_timeout else self._check(entry)
+            if reason:
+                self._discard(session_id, reason)
+            else:
+                with self.lock:
+                    entry["leased"] = False
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "leased": sum(1 for e in self.sessions.values() if e["leased"]),
+            }
+
+    def _reaper_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.reap()
+
+    def _handle(self, conn):
+        # Sessions leased over this connection; a client that disconnects still holding one loses it
+        leases = set()
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                command, args = request[0], request[1:]
+                try:
+                    if command == "acquire":
+                        session_id, capabilities = self.acquire(*args)
+                        leases.add(session_id)
+                        conn.send(("ok", (session_id, capabilities)))
+                    elif command == "release":
+                        self.release(*args)
+                        leases.discard(args[0])
+                        conn.send(("ok", None))
+                    elif command == "stats":
+                        conn.send(("ok", self.stats()))
+                    else:
+                        conn.send(("error", f"unknown command {command}"))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+        finally:
+            conn.close()
+            for session_id in leases:
+                # The client crashed or disconnected mid-lease: the app state is unknown, so do not hand it out again
+                self._discard(session_id, "client disconnected")
+
+    def serve_forever(self):
+        threading.Thread(target=self._reaper_loop, daemon=True).start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"✓ Session broker listening on {self.address[0]}:{self.address[1]}")
+            try:
+                while True:
+                    threading.Thread(target=self._handle, args=(listener.accept(),), daemon=True).start()
+            finally:
+                with self.lock:
+                    session_ids = list(self.sessions)
+                for session_id in session_ids:
+                    self._discard(session_id, "shutdown")
+
+
+class BrokerClient:
+    """Test-process side of the session broker"""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes):
+        if not authkey:
+            raise RuntimeError("SESSION_BROKER_AUTHKEY is not set")
+        self.conn = Client(address, authkey=authkey)
+
+    def _call(self, *request):
+        self.conn.send(request)
+        status, value = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Session broker error: {value}")
+        return value
+
+    def acquire(self, server_url: str, options, command_executor=None) -> webdriver.Remote:
+        """Return a driver attached to a warm session for these options (through command_executor, if given)"""
+        session_id, capabilities = self._call("acquire", server_url, options.to_capabilities())
+        return AttachedDriver(command_executor or server_url, session_id, capabilities)
+
+    def release(self, driver, healthy: bool = True):
+        """Hand the session back to the broker instead of quitting it"""
+        self._call("release", driver.session_id, healthy)
+
+    def close(self):
+        self.conn.close()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """host:port, :port or port; the host defaults to localhost"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm Appium session broker")
+    parser.add_argument("--address", default="127.0.0.1:47230")
+    parser.add_argument("--authkey", default=os.getenv("SESSION_BROKER_AUTHKEY", ""),
+                        help="defaults to $SESSION_BROKER_AUTHKEY, else a random key is generated")
+    parser.add_argument("--idle-timeout", type=float, default=600)
+    parser.add_argument("--max-uses", type=int, default=50)
+    parser.add_argument("--max-age", type=float, default=3600)
+    parser.add_argument("--health-interval", type=float, default=60)
+    args = parser.parse_args()
+    if not args.authkey:
+        args.authkey = secrets.token_urlsafe(32)
+        print(f"✓ Generated authkey; start the tests with SESSION_BROKER_AUTHKEY={args.authkey}")
+    SessionBroker(
+        parse_address(args.address), args.authkey.encode(), idle_timeout=args.idle_timeout,
+        max_uses=args.max_uses, max_age=args.max_age, health_interval=args.health_interval,
+    ).serve_forever()
@@ -0,0 +1,125 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+LOGGED_OUT = "logged_out"
+LOGGED_IN = "logged_in"
+SCREEN_PREFIX = "screen:"
+
+
+class StateScheduler:
+    """
+    Orders tests by the app state they need and leave behind.
+
+    Tests declare `requires` / `produces` states (logged_out, logged_in or a
+    screen, which implies logged_in) with StateScheduler.declare. plan() splits
+    them into independent chains, one per worker, each starting from a fresh
+    app launch, picking at every step the test and chain that keep the
+    estimated transition cost (launch, login, logout, navigation) lowest.
+    """
+
+    # Estimated seconds per transition; a fresh chain starts with an app launch on the sign-in screen
+    DEFAULT_COSTS = {"launch": 6.0, "login": 8.0, "logout": 3.0, "navigate": 2.5}
+
+    def __init__(self, costs: Optional[Dict[str, float]] = None, test_cost: float = 1.0):
+        self.costs = dict(StateScheduler.DEFAULT_COSTS, **(costs or {}))
+        self.test_cost = test_cost
+
+    # ----------------------------
+    # Declarations
+    # ----------------------------
+    @staticmethod
+    def screen(name: str) -> str:
+        return f"{SCREEN_PREFIX}{name}"
+
+    @staticmethod
+    def declare(requires: Optional[str] = None, produces: Optional[str] = None) -> Callable:
+        """Decorator recording the state a test needs and the state it leaves (default: unchanged)"""
+        def decorate(func):
+            func.app_state = (requires, produces or requires)
+            return func
+        return decorate
+
+    @staticmethod
+    def states(func) -> Tuple[Optional[str], Optional[str]]:
+        return getattr(func, "app_state", (None, None))
+
+    # ----------------------------
+    # Cost model
+    # ----------------------------
+    @staticmethod
+    def satisfies(state: Optional[str], required: Optional[str]) -> bool:
+        if required is None or state == required:
+            return True
+        return required == LOGGED_IN and state is not None and state.startswith(SCREEN_PREFIX)
+
+    @staticmethod
+    def signed_in(state: Optional[str]) -> Optional[bool]:
+        return None if state is None else state != LOGGED_OUT
+
+    def transition_cost(self, state: Optional[str], required: Optional[str]) -> float:
+        """Estimated seconds to get from state (None = fresh chain) to the required state"""
+        if state is None:
+            return self.costs["launch"] + self.transition_cost(LOGGED_OUT, required)
+        if StateScheduler.satisfies(state, required):
+            return 0.0
+        if required == LOGGED_OUT:
+            return self.costs["logout"]
+        cost = self.costs["login"] if state == LOGGED_OUT else 0.0
+        return cost + (self.costs["navigate"] if required.startswith(SCREEN_PREFIX) else 0.0)
+
+    def chain_cost(self, chain: List[Tuple[str, Optional[str], Optional[str]]]) -> float:
+        """Transition cost of running (name, requires, produces) tests in this order from a fresh launch"""
+        state, total = None, 0.0
+        for _, requires, produces in chain:
+            total += self.transition_cost(state, requires)
+            state = produces if produces is not None else (state or LOGGED_OUT)
+        return total
+
+    # ----------------------------
+    # Planning
+    # ----------------------------
+    def plan(self, tests: List[Tuple[str, Optional[str], Optional[str]]], workers: int = 1) -> List[List[Tuple]]:
+        """
+        Split (name, requires, produces) tests into at most `workers` chains.
+        Greedy: repeatedly append the test whose chain would finish earliest
+        (transitions plus test_cost per test), preferring tests that leave the
+        app signed in/out as it was (so logout runs after the other signed-in
+        tests); remaining ties keep the original order.
+        """
+        remaining = list(tests)
+        chains: List[List[Tuple]] = [[] for _ in range(max(1, workers))]
+        states: List[Optional[str]] = [None] * len(chains)
+        totals = [0.0] * len(chains)
+        while remaining:
+            best = None
+            for c in range(len(chains)):
+                for t, (_, requires, produces) in enumerate(remaining):
+                    transition = self.transition_cost(states[c], requires)
+                    before = StateScheduler.signed_in(requires) if requires else StateScheduler.signed_in(states[c])
+                    switches = produces is not None and StateScheduler.signed_in(produces) != before
+                    key = (totals[c] + transition + self.test_cost, transition, switches, c, t)
+                    if best is None or key < best:
+                        best = key
+            finish, _, _, c, t = best
+            name, requires, produces = remaining.pop(t)
+            chains[c].append((name, requires, produces))
+            totals[c] = finish
+            states[c] = produces if produces is not None else (states[c] or LOGGED_OUT)
+        return [chain for chain in chains if chain]
+
+    def format_summary(self, tests: List[Tuple], chains: List[List[Tuple]]) -> str:
+        """Per-chain costs and the estimated saving against running the tests in collection order"""
+        sequential = self.chain_cost(tests)
+        planned = sum(self.chain_cost(chain) for chain in chains)
+        lines = [f"State plan: {len(tests)} tests in {len(chains)} chain(s)"]
+        for i, chain in enumerate(chains):
+            lines.append(f"  chain {i}: ~{self.chain_cost(chain):.1f}s transitions  "
+                         + " -> ".join(name.rsplit("::", 1)[-1].rsplit(".", 1)[-1] for name, _, _ in chain))
+        lines.append(f"Estimated transitions: {planned:.1f}s planned vs {sequential:.1f}s in collection order "
+                     f"({sequential - planned:.1f}s saved)")
+        if len(chains) > 1:
+            # Parallel chains pay their own launch/login, so compare wall time rather than transition totals
+            makespan = max(self.chain_cost(chain) + self.test_cost * len(chain) for chain in chains)
+            in_order = sequential + self.test_cost * len(tests)
+            lines.append(f"Longest chain ~{makespan:.1f}s incl. tests vs ~{in_order:.1f}s running sequentially "
+                         f"in collection order ({in_order - makespan:.1f}s saved)")
+        return "\n".join(lines)
@@ -0,0 +1,127 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from appium.webdriver.webdriver import WebDriver
+
+
+class WaitCharge:
+    """One wait drawn from a budget: the timeout it asked for, the one it got and how it ended"""
+
+    def __init__(self, label: str, requested: float, granted: float, step: str = "", depth: int = 0,
+                 detail: str = ""):
+        self.label = label
+        self.detail = detail
+        self.requested = requested
+        self.timeout = granted
+        self.step = step
+        self.depth = depth
+        self.spent = 0.0
+        self.outcome = "ok"
+
+
+class WaitBudget:
+    """
+    Time budget for one test, shared by every helper wait on its driver.
+
+    Explicit waits ask for a timeout and get at most what is left of the
+    budget (and of the innermost step), so nested helpers draw from one
+    deadline instead of each starting a fresh one. The budget lives on the
+    driver object, which reaches every helper regardless of import path.
+    Attaching a budget turns the driver's implicit wait off: every lookup in
+    the helpers is an explicit wait, and an implicit wait would stretch each
+    of their find_elements polls.
+    """
+
+    def __init__(self, total: float, name: str = ""):
+        self.total = total
+        self.name = name
+        self.started = time.time()
+        self.steps: List[Dict] = [{"name": name, "deadline": self.started + total}]
+        self.charges: List[WaitCharge] = []
+        self.depth = 0
+
+    # ----------------------------
+    # Driver binding
+    # ----------------------------
+    @staticmethod
+    def attach(driver: WebDriver, total: float, name: str = "") -> "WaitBudget":
+        """Start a fresh budget for this driver (call once per test)"""
+        if not getattr(driver, "implicit_wait_disabled", False):
+            driver.implicitly_wait(0)
+            driver.implicit_wait_disabled = True
+        budget = driver.wait_budget = WaitBudget(total, name)
+        return budget
+
+    @staticmethod
+    def of(driver: WebDriver) -> Optional["WaitBudget"]:
+        return getattr(driver, "wait_budget", None)
+
+    # ----------------------------
+    # Spending
+    # ----------------------------
+    def remaining(self) -> float:
+        return max(0.0, min(step["deadline"] for step in self.steps) - time.time())
+
+    @contextmanager
+    def step(self, name: str, seconds: Optional[float] = None):
+        """Sub-budget for one step; it can never outlast the test budget"""
+        deadline = time.time() + seconds if seconds is not None else self.steps[-1]["deadline"]
+        self.steps.append({"name": name, "deadline": deadline})
+        try:
+            yield self
+        finally:
+            self.steps.pop()
+
+    @contextmanager
+    def charge(self, label: str, requested: float, detail: str = ""):
+        granted = min(requested, self.remaining())
+        charge = WaitCharge(label, requested, granted, " > ".join(s["name"] for s in self.steps[1:]), self.depth, detail)
+        self.charges.append(charge)
+        self.depth += 1
+        start = time.time()
+        try:
+            yield charge
+        except Exception as e:
+            charge.outcome = type(e).__name__
+            raise
+        finally:
+            self.depth -= 1
+            charge.spent = time.time() - start
+
+    @staticmethod
+    @contextmanager
+    def wait(driver: WebDriver, label: str, requested: float, detail: str = ""):
+        """
+        Wrap a helper wait: yields a WaitCharge whose timeout is the granted one.
+        Without a budget on the driver the requested timeout is used unchanged.
+        """
+        budget = WaitBudget.of(driver)
+        if budget is None:
+            yield WaitCharge(label, requested, requested, detail=detail)
+            return
+        with budget.charge(label, requested, detail) as charge:
+            yield charge
+
+    @staticmethod
+    def step_for(driver: WebDriver, name: str, seconds: Optional[float] = None):
+        """budget.step() for the driver's budget, or a no-op context without one"""
+        budget = WaitBudget.of(driver)
+        return budget.step(name, seconds) if budget else _no_step()
+
+    # ----------------------------
+    # Reporting
+    # ----------------------------
+    def format_report(self) -> str:
+        spent = sum(c.spent for c in self.charges if c.depth == 0)
+        lines = [f"Wait budget {self.name}: {spent:.2f}s of {self.total:.1f}s spent waiting, "
+                 f"{time.time() - self.started:.2f}s elapsed, {self.remaining():.2f}s left"]
+        for c in self.charges:
+            clamped = " (clamped)" if c.timeout < c.requested else ""
+            lines.append(f"  {'  ' * c.depth}{c.label:<20}{c.spent:>7.2f}s of {c.timeout:.2f}s{clamped:<10}"
+                         f" {c.outcome:<18}{c.step:<24}{c.detail}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def _no_step():
+    yield None
@@ -0,0 +1,159 @@
+"""
+Change-impact test selection: crawl the app's screens, fingerprint them per build and select the tests that touch changed screens.
+
+    python -m login.impact --build 1.4.0                      # crawl APPIUM_SERVER_URL, store the baseline build
+    python -m login.impact --build 1.5.0 --against 1.4.0 --server http://127.0.0.1:4723
+    IMPACT_SELECTION_FILE=login/.cache/impact_selection.json APP_VERSION=1.5.0 pytest login
+
+The crawl visits the sign-in screen, the password step, the dashboard, the navigation drawer and every
+MENU_TITLES screen, and stores a structural fingerprint of each (see helpers/screen_fingerprints.py) plus the
+AuthHelpers selectors that resolve on it. Compared with the baseline build, it writes a selection file listing
+the changed screens, the tests whose declared states touch them, the selectors on them, and the selectors that
+no longer resolve anywhere. conftest deselects the other declared tests when IMPACT_SELECTION_FILE points to it
+and APP_VERSION is the crawled build.
+Without a baseline build every screen counts as changed, so every test is selected.
+--fake crawls the offline fake's canned screens instead (--screens-dir simulates a build): its fingerprints go
+to a separate file and its selection file is marked as fake, which conftest ignores, since canned screens say
+nothing about a real build.
+"""
+import argparse
+import json
+import os
+import sys
+import unittest
+from typing import Iterator
+
+from appium import webdriver
+from appium.webdriver.common.appiumby import AppiumBy
+
+from login.config import get_android_options, APPIUM_SERVER_URL, APP_VERSION, APP_PACKAGE, DEEP_LINKS, TEST_CREDENTIALS
+from login.constants import MENU_TITLES
+from login.fake_appium.server import FakeAppiumServer, SCREENS_DIR
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.form_helpers import FormHelpers
+from login.helpers.page_snapshot import PageSnapshot
+from login.helpers.screen_fingerprints import ScreenFingerprints, PASSWORD_STEP
+from login.helpers.screen_navigator import ScreenNavigator, DRAWER, SIGNED_OUT
+from login.helpers.state_scheduler import StateScheduler
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+FINGERPRINTS_FILE = os.path.join(CACHE_DIR, "screen_fingerprints.json")
+FAKE_FINGERPRINTS_FILE = os.path.join(CACHE_DIR, "screen_fingerprints_fake.json")
+SELECTION_FILE = os.path.join(CACHE_DIR, "impact_selection.json")
+
+
+def _visible(driver, selectors, timeout: float) -> bool:
+    return bool(PageSnapshot.wait_until(driver, lambda s: s.exists(selectors), timeout))
+
+
+def crawl_steps(navigator: ScreenNavigator, email: str, password: str, timeout: float):
+    """(screen, go) steps from wherever the app is to every screen, signing in on the way"""
+    def sign_in(driver):
+        if AuthHelpers.is_logged_in(driver):
+            AuthHelpers.click_nav_bar(driver)
+            AuthHelpers.logout(driver)
+        return _visible(driver, AuthHelpers.EMAIL_SELECTORS[:1], timeout)
+
+    def password_step(driver):
+        FormHelpers.fill_form(driver, {tuple(AuthHelpers.EMAIL_SELECTORS): email})
+        AuthHelpers.submit_login(driver)
+        return _visible(driver, AuthHelpers.PASSWORD_SELECTORS[:1], timeout)
+
+    def dashboard(driver):
+        FormHelpers.fill_form(driver, {tuple(AuthHelpers.PASSWORD_SELECTORS): password})
+        AuthHelpers.submit_login(driver)
+        return _visible(driver, [AuthHelpers.DASHBOARD], timeout)
+
+    def screen(name):
+        return lambda driver: navigator.navigate(driver, name) and _visible(driver, [(AppiumBy.XPATH, MENU_TITLES[name])], timeout)
+
+    steps = [(SIGNED_OUT, sign_in), (PASSWORD_STEP, password_step), ("Dashboard", dashboard),
+             (DRAWER, AuthHelpers.click_nav_bar)]
+    return steps + [(name, screen(name)) for name in MENU_TITLES if name != "Dashboard"]
+
+
+def _test_cases(suite) -> Iterator[unittest.TestCase]:
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _test_cases(test)
+        else:
+            yield test
+
+
+def declared_tests():
+    """(name, requires, produces) of every test in the suite that declares the app states it needs"""
+    suite = unittest.defaultTestLoader.discover(os.path.dirname(os.path.abspath(__file__)),
+                                                top_level_dir=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tests = []
+    for test in _test_cases(suite):
+        name = getattr(test, "_testMethodName", "")
+        requires, produces = StateScheduler.states(getattr(type(test), name, None))
+        if requires or produces:
+            tests.append((name, requires, produces))
+    return tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default=APPIUM_SERVER_URL, help="Appium server to crawl (default: APPIUM_SERVER_URL)")
+    parser.add_argument("--fake", action="store_true",
+                        help="crawl the offline fake's canned screens instead; its selection is not used by conftest")
+    parser.add_argument("--screens-dir", default=SCREENS_DIR, help="screens the offline fake serves (a simulated build)")
+    parser.add_argument("--build", default=APP_VERSION, help="app build being crawled")
+    parser.add_argument("--against", help="baseline build (default: the most recently crawled other build)")
+    parser.add_argument("--fingerprints", help="per-build fingerprints file (default: one for real and one for fake crawls)")
+    parser.add_argument("--selection", default=SELECTION_FILE, help="selection file written for conftest")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for each screen")
+    args = parser.parse_args()
+
+    fingerprints = ScreenFingerprints(args.fingerprints or (FAKE_FINGERPRINTS_FILE if args.fake else FINGERPRINTS_FILE))
+    named = ScreenFingerprints.named_selectors(AuthHelpers)
+    navigator = ScreenNavigator(MENU_TITLES, DEEP_LINKS, app_package=APP_PACKAGE)
+    fake = None
+    if args.fake:
+        fake = FakeAppiumServer(screens_dir=args.screens_dir).start()
+    driver = webdriver.Remote(fake.url if fake else args.server, options=get_android_options())
+    try:
+        driver.implicitly_wait(0)
+        print(f"Crawling build {args.build}" + (f" (fake screens from {args.screens_dir})" if fake else f" on {args.server}"))
+        steps = crawl_steps(navigator, TEST_CREDENTIALS["valid_email"], TEST_CREDENTIALS["valid_password"], args.timeout)
+        fingerprints.crawl(driver, args.build, steps, sorted(named))
+    finally:
+        driver.quit()
+        if fake:
+            fake.stop()
+    fingerprints.save()
+
+    others = sorted((b for b in fingerprints.builds if b != args.build),
+                    key=lambda b: fingerprints.builds[b]["saved"], reverse=True)
+    against = args.against or (others[0] if others else None)
+    if against not in fingerprints.builds:
+        print(f"No baseline build {against or '(none crawled yet)'}: every screen counts as changed")
+    changed = fingerprints.changed(args.build, against or "")
+    declared = declared_tests()
+    tests = ScreenFingerprints.select_tests(declared, changed)
+    selectors = fingerprints.selectors_on(changed, args.build, against or "")
+    dead = fingerprints.dead_selectors(args.build, against or "")
+
+    print(fingerprints.format_report(args.build, against or "(none)", named))
+    print(f"Selected {len(tests)} of {len(declared)} tests: {', '.join(tests) or '(none)'}")
+    print(f"Selectors to re-verify on changed screens: {len(selectors)}")
+    for key in selectors:
+        print(f"  {named.get(key, '?'):<34}{key}")
+    never = fingerprints.never_resolved(args.build, sorted(named))
+    if never:
+        print(f"{len(never)} AuthHelpers selector(s) resolve on no crawled screen (fallbacks or screens not crawled):")
+        for key in never:
+            print(f"  {named[key]:<34}{key}")
+
+    os.makedirs(os.path.dirname(args.selection) or ".", exist_ok=True)
+    with open(args.selection, "w", encoding="utf-8") as f:
+        json.dump({"build": args.build, "against": against, "fake": args.fake, "changed": changed, "tests": tests,
+                   "selectors": selectors, "dead_selectors": dead}, f, indent=1)
+    print(f"✓ Selection saved: {args.selection}" + (" (from fake screens: conftest ignores it)" if args.fake else ""))
+    if dead:
+        sys.exit(f"⚠ {len(dead)} selector(s) stopped resolving in build {args.build}")
+
+
+if __name__ == "__main__":
+    main()
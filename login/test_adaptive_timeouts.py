@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+
+from login.helpers.adaptive_timeouts import AdaptiveTimeouts
+
+TARGET = AdaptiveTimeouts.screen("Dashboard")
+
+
+class AdaptiveTimeoutsTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "timeouts.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def learn(self, timeouts: AdaptiveTimeouts, latency: float, count: int = 5):
+        for _ in range(count):
+            timeouts.record(TARGET, latency)
+
+    def test_default_until_enough_samples(self):
+        timeouts = AdaptiveTimeouts(self.path, min_samples=5)
+        self.learn(timeouts, 0.4, 4)
+        self.assertEqual(timeouts.timeout(TARGET, 3), 3)
+        self.learn(timeouts, 0.4, 1)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3), 0.4 * 1.5 + 0.5)
+
+    def test_expected_wait_is_never_shortened(self):
+        timeouts = AdaptiveTimeouts(self.path)
+        self.learn(timeouts, 0.4)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3), 1.1)
+        self.assertEqual(timeouts.timeout(TARGET, 3, expected=True), 3)
+        self.learn(timeouts, 4.0, 50)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3, expected=True), 4.0 * 1.5 + 0.5)
+
+    def test_negative_check_miss_does_not_widen(self):
+        timeouts = AdaptiveTimeouts(self.path)
+        self.learn(timeouts, 0.4)
+        timeouts.record(TARGET, 1.1, found=False)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3), 1.1)
+        self.assertEqual(timeouts.version["targets"][TARGET]["misses"], 1)
+
+    def test_expected_miss_doubles_the_timeout(self):
+        timeouts = AdaptiveTimeouts(self.path, ceiling=5.0)
+        self.learn(timeouts, 0.4)
+        timeouts.record(TARGET, 1.1, found=False, expected=True)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3), 2.2)
+        self.learn(timeouts, 0.4)
+        self.assertAlmostEqual(timeouts.timeout(TARGET, 3), 2.2)
+        timeouts.record(TARGET, 2.2, found=False, expected=True)
+        timeouts.record(TARGET, 4.4, found=False, expected=True)
+        self.assertEqual(timeouts.timeout(TARGET, 3), 5.0)
+
+    def test_expected_miss_raises_the_default_before_learning(self):
+        timeouts = AdaptiveTimeouts(self.path)
+        timeouts.record(TARGET, 3.0, found=False, expected=True)
+        self.assertEqual(timeouts.timeout(TARGET, 3), 6.0)
+        self.assertEqual(timeouts.timeout(TARGET, 10), 10)
+
+    def test_override_wins(self):
+        timeouts = AdaptiveTimeouts(self.path, overrides={TARGET: 7.0})
+        timeouts.record(TARGET, 3.0, found=False, expected=True)
+        self.assertEqual(timeouts.timeout(TARGET, 3), 7.0)
+
+    def test_save_keeps_recent_versions(self):
+        for version, used in (("1.0", 1), ("1.1", 2), ("1.2", 3)):
+            timeouts = AdaptiveTimeouts(self.path, version, max_versions=2)
+            self.learn(timeouts, 0.4)
+            timeouts.version["last_used"] = used
+            timeouts.save()
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(sorted(json.load(f)["versions"]), ["1.1", "1.2"])
+        self.assertEqual(os.listdir(self.dir.name), ["timeouts.json"])
+        reloaded = AdaptiveTimeouts(self.path, "1.2")
+        self.assertAlmostEqual(reloaded.timeout(TARGET, 3), 0.4 * 1.5 + 0.5)
+
+    def test_parallel_saves_merge(self):
+        first, second = AdaptiveTimeouts(self.path), AdaptiveTimeouts(self.path)
+        self.learn(first, 0.4, 3)
+        self.learn(second, 0.6, 2)
+        second.record(TARGET, 1.0, found=False, expected=True)
+        first.save()
+        second.save()
+        entry = AdaptiveTimeouts(self.path).version["targets"][TARGET]
+        self.assertEqual(sorted(entry["samples"]), [0.4] * 3 + [0.6] * 2)
+        self.assertEqual((entry["misses"], entry["widened"]), (1, 2.0))
+        second.save()
+        self.assertEqual(len(AdaptiveTimeouts(self.path).version["targets"][TARGET]["samples"]), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
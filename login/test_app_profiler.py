@@ -0,0 +1,129 @@
+import time
+import unittest
+
+from appium import webdriver
+from selenium.common.exceptions import UnknownMethodException, WebDriverException
+from urllib3.exceptions import ReadTimeoutError
+
+from login.config import get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.app_profiler import AppProfiler, COLUMNS, OUTSIDE_STEPS
+
+PERFORMANCE, SHELL = "mobile: getPerformanceData", "mobile: shell"
+CPU = [["user", "kernel"], ["10.0", "2.5"]]
+
+
+def segment(screen, pss, frames, janky):
+    values = {"t": [float(i) for i in range(len(pss))], "cpu": [12.5] * len(pss), "pss_kb": pss,
+              "heap_kb": [None] * len(pss), "frames": frames, "janky_frames": janky}
+    return {"test": "t", "step": "s", "screen": screen, "start": 0.0, **values}
+
+
+class _Driver:
+    """execute_script answers from `replies` (script -> value, exception or callable), in order per script"""
+
+    def __init__(self, replies):
+        self.replies = {script: list(queue) for script, queue in replies.items()}
+
+    def execute_script(self, script, args):
+        queue = self.replies.get(script) or [UnknownMethodException("unknown")]
+        reply = queue.pop(0) if len(queue) > 1 else queue[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply() if callable(reply) else reply
+
+
+class AppProfilerTests(unittest.TestCase):
+    def test_delta_counts_resets_from_zero(self):
+        self.assertEqual(AppProfiler._delta([segment("A", [1, 1, 1], [100, 160, 20], [0, 0, 0])], "frames"), 80)
+        self.assertEqual(AppProfiler._delta([segment("A", [1, 1], [None, 50], [0, 0]),
+                                             segment("A", [1, 1], [60, 90], [0, 0])], "frames"), 30)
+
+    def test_summary_and_compare(self):
+        profiler = AppProfiler(None, "com.app", frame_stats=False)
+        profiler.segments = [segment("Properties", [1000, 1400], [0, 100], [0, 5]),
+                             segment("Properties", [1500, 1200], [100, 200], [5, 25]),
+                             segment("Violations", [900, 900], [0, 60], [0, 1])]
+        summary = profiler.summary()
+        self.assertEqual(summary["Properties"]["samples"], 4)
+        self.assertEqual((summary["Properties"]["pss_max_kb"], summary["Properties"]["pss_growth_kb"]), (1500, 200))
+        self.assertEqual((summary["Properties"]["frames"], summary["Properties"]["janky_pct"]), (200, 12.5))
+        baseline = {"Properties": dict(summary["Properties"], pss_max_kb=1200, janky_pct=2.0),
+                    "Violations": summary["Violations"]}
+        self.assertEqual(AppProfiler.compare(summary, baseline),
+                         ["Properties: PSS peak 1.2 -> 1.5 MB", "Properties: janky frames 2.0% -> 12.5%"])
+        self.assertIn("Violations", profiler.format_report(summary))
+
+    def test_unavailable_data_type_is_dropped_once(self):
+        profiler = AppProfiler(_Driver({PERFORMANCE: [UnknownMethodException("no")]}), "com.app",
+                               frame_stats=False)
+        profiler._read("cpuinfo")
+        profiler._read("cpuinfo")
+        self.assertEqual(profiler.data_types, ["memoryinfo"])
+
+    def test_transport_errors_do_not_stop_the_sampler(self):
+        timeout = ReadTimeoutError(None, "/execute/sync", "read timed out")
+        driver = _Driver({PERFORMANCE: [timeout, timeout, CPU],
+                          SHELL: [ConnectionResetError(), "Total frames rendered: 60\nJanky frames: 1\n"]})
+        profiler = AppProfiler(driver, "com.app", interval=0.01).start()
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and not AppProfiler._values(profiler._copy(), "cpu"):
+                time.sleep(0.01)
+        finally:
+            profiler.stop()
+        self.assertTrue(AppProfiler._values(profiler._copy(), "cpu"))
+        self.assertEqual(profiler.data_types, ["cpuinfo", "memoryinfo"])
+        self.assertTrue(profiler.frame_stats)
+        self.assertGreaterEqual(profiler.errors, 3)
+
+    def test_only_a_refused_shell_turns_frame_stats_off(self):
+        profiler = AppProfiler(_Driver({SHELL: [WebDriverException("An unknown server-side error occurred")]}),
+                               "com.app")
+        self.assertEqual(profiler._read_frames(), {})
+        self.assertTrue(profiler.frame_stats)
+        self.assertEqual(profiler.errors, 1)
+        insecure = WebDriverException("Potentially insecure feature 'adb_shell' has not been enabled")
+        for refusal in (UnknownMethodException("unknown method"), insecure):
+            profiler = AppProfiler(_Driver({SHELL: [refusal]}), "com.app")
+            profiler._read_frames()
+            self.assertFalse(profiler.frame_stats)
+            self.assertEqual(profiler.errors, 0)
+
+    def test_sample_lands_in_the_segment_current_when_it_started(self):
+        profiler = AppProfiler(None, "com.app", frame_stats=False)
+        profiler.begin_test("test_a")
+
+        def step_opens_mid_sample():
+            profiler._open("test_a", "navigate", "Properties")
+            return CPU
+
+        profiler.driver = _Driver({PERFORMANCE: [step_opens_mid_sample, CPU]})
+        profiler.data_types = ["cpuinfo"]
+        profiler.sample()
+        first, second = profiler.segments
+        self.assertEqual((first["step"], len(first["t"])), (OUTSIDE_STEPS, 1))
+        self.assertEqual((second["screen"], second["t"]), ("Properties", []))
+
+
+class AppProfilerFakeServerTests(unittest.TestCase):
+    def test_step_samples_per_screen(self):
+        fake = FakeAppiumServer(start_screen="dashboard").start()
+        driver = webdriver.Remote(fake.url, options=get_android_options())
+        try:
+            profiler = AppProfiler(driver, "com.app", interval=60)
+            profiler.begin_test("test_violations")
+            with profiler.step("navigate to Violations", screen="Violations"):
+                driver.execute_script("mobile: deepLink", {"url": "qompli://violations"})
+        finally:
+            driver.quit()
+            fake.stop()
+        summary = profiler.summary()
+        self.assertEqual(list(summary), ["Violations"])
+        self.assertEqual((summary["Violations"]["samples"], summary["Violations"]["frames"]), (2, 60))
+        self.assertEqual(summary["Violations"]["pss_growth_kb"], 256)
+        self.assertEqual(len(profiler.segments[-1][COLUMNS[0]]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
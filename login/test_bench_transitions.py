@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+from login.benchmarks.bench_transitions import compare, format_table, load_baselines, percentiles, save_baselines
+
+
+class TransitionBenchmarkTests(unittest.TestCase):
+    def test_no_samples_have_no_percentiles(self):
+        self.assertEqual(percentiles([]), {"p50": None, "p95": None, "p99": None, "n": 0})
+        self.assertEqual(percentiles([0.4])["p95"], 0.4)
+
+    def test_failures_are_regressions_with_or_without_baseline(self):
+        results = {"Properties": dict(percentiles([]), failures=3)}
+        self.assertEqual(compare(results, {}, 0.2, 0.05), ["Properties"])
+        baseline = {"Properties": dict(percentiles([0.3, 0.3]), failures=0)}
+        self.assertEqual(compare(results, baseline, 0.2, 0.05), ["Properties"])
+        self.assertIn("✗ REGRESSION", format_table(results, None, ["Properties"]))
+
+    def test_p95_regression_needs_both_thresholds(self):
+        baseline = {"Violations": dict(percentiles([0.30, 0.30]), failures=0)}
+        small = {"Violations": dict(percentiles([0.34, 0.34]), failures=0)}
+        large = {"Violations": dict(percentiles([0.50, 0.50]), failures=0)}
+        self.assertEqual(compare(small, baseline, 0.1, 0.05), [])
+        self.assertEqual(compare(large, baseline, 0.1, 0.05), ["Violations"])
+
+    def test_save_baselines_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baseline.json")
+            save_baselines(path, {"1.4.0": {"Properties": dict(percentiles([0.3]), failures=0)}})
+            self.assertEqual(load_baselines(path)["1.4.0"]["Properties"]["p95"], 0.3)
+            self.assertEqual(os.listdir(folder), ["baseline.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from appium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from login.config import CREDENTIAL_MATRIX_MESSAGE_XPATH, TEST_CREDENTIALS, get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.credential_matrix import CredentialMatrix, ERROR, INVALID, SIGNED_IN
+from login.helpers.form_helpers import FormHelpers
+from login.helpers.wait_budget import WaitBudget
+
+CSV = """id,email,password,expected_outcome,expected_message
+login,{valid_email},{valid_password},signed_in,
+,dgfg,,invalid,Please include an '@'
+braces,{user}@example.com,p{a}ss{valid_password},,
+"""
+
+
+class CredentialMatrixLoadTests(unittest.TestCase):
+    def test_only_known_placeholders_are_filled(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "cases.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(CSV)
+            cases = CredentialMatrix.load(path, {"valid_email": "me@example.com", "valid_password": "Secret1!"})
+        self.assertEqual([case["id"] for case in cases], ["login", "2", "braces"])
+        self.assertEqual((cases[0]["email"], cases[0]["password"]), ("me@example.com", "Secret1!"))
+        self.assertEqual((cases[2]["email"], cases[2]["password"]), ("{user}@example.com", "p{a}ssSecret1!"))
+
+
+class CredentialMatrixFakeServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeAppiumServer(start_screen="sign_in").start()
+        cls.driver = webdriver.Remote(cls.fake.url, options=get_android_options())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+        cls.fake.stop()
+
+    def setUp(self):
+        self.fake.reset("sign_in")
+        self.matrix = CredentialMatrix(self.driver, CREDENTIAL_MATRIX_MESSAGE_XPATH, settle=3)
+
+    @staticmethod
+    def case(case_id, email, password="", expected_outcome="", expected_message=""):
+        return {"id": case_id, "email": email, "password": password,
+                "expected_outcome": expected_outcome, "expected_message": expected_message}
+
+    def test_driver_error_is_recorded_and_the_run_goes_on(self):
+        test_budget = WaitBudget.attach(self.driver, 60, "test")
+        fill_form, calls = FormHelpers.fill_form, []
+
+        def device_goes_away_once(driver, fields):
+            calls.append(fields)
+            if len(calls) == 1:
+                raise WebDriverException("device went away")
+            return fill_form(driver, fields)
+
+        cases = [self.case("broken", "a@example.com"),
+                 self.case("invalid", "dgfg", expected_outcome=INVALID, expected_message="@"),
+                 self.case("login", TEST_CREDENTIALS["valid_email"], TEST_CREDENTIALS["valid_password"], SIGNED_IN)]
+        with mock.patch.object(FormHelpers, "fill_form", side_effect=device_goes_away_once):
+            results = self.matrix.run(cases, case_budget=20)
+        self.assertEqual([r["outcome"] for r in results], [ERROR, INVALID, SIGNED_IN])
+        self.assertEqual(results[0]["message"], "WebDriverException: Message: device went away")
+        self.assertEqual([r["passed"] for r in results[1:]], [True, True])
+        self.assertEqual(results[2]["password"], "*" * len(TEST_CREDENTIALS["valid_password"]))
+        self.assertIs(WaitBudget.of(self.driver), test_budget)
+
+
+if __name__ == "__main__":
+    unittest.main()
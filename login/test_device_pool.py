@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from login.helpers.device_pool import DevicePool
+
+DEVICES = [{"udid": "A", "appium_url": "http://127.0.0.1:4723"}, {"udid": "B", "appium_url": "http://127.0.0.1:4724"}]
+
+
+def _write(reports_dir, worker, device, outcomes):
+    results = [{"test": f"t{i}", "outcome": outcome, "duration": 1.0} for i, outcome in enumerate(outcomes)]
+    with open(os.path.join(reports_dir, f"worker_{worker}.json"), "w", encoding="utf-8") as f:
+        json.dump({"worker": worker, "device": device, "results": results}, f)
+    return results
+
+
+class DevicePoolTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_device_for_worker_wraps_around(self):
+        pool = DevicePool(DEVICES)
+        self.assertEqual([pool.device_for_worker(i)["udid"] for i in range(3)], ["A", "B", "A"])
+
+    def test_merge_ignores_controller_file_next_to_worker_files(self):
+        first = _write(self.dir.name, "gw0", DEVICES[0], ["passed", "failed"])
+        second = _write(self.dir.name, "gw1", DEVICES[1], ["passed"])
+        # A controller copy holding every result, attributed to device 0
+        _write(self.dir.name, "main", DEVICES[0], [r["outcome"] for r in first + second])
+        merged = DevicePool.merge_reports(self.dir.name)
+        self.assertEqual((merged["passed"], merged["failed"]), (2, 1))
+        self.assertEqual(len(merged["devices"]["A"]["results"]), 2)
+        self.assertEqual(len(merged["devices"]["B"]["results"]), 1)
+        self.assertEqual(merged["devices"]["A"]["workers"], ["gw0"])
+
+    def test_merge_plain_run(self):
+        _write(self.dir.name, "main", None, ["passed", "skipped"])
+        merged = DevicePool.merge_reports(self.dir.name)
+        self.assertEqual((merged["passed"], merged["skipped"]), (1, 1))
+        self.assertEqual(list(merged["devices"]), ["main"])
+
+
+if __name__ == "__main__":
+    unittest.main()
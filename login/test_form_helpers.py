@@ -0,0 +1,71 @@
+import unittest
+
+from appium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, UnknownMethodException
+
+from login.config import TEST_CREDENTIALS, get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.form_helpers import FormHelpers
+
+
+class _Element:
+    id = "field"
+
+    def __init__(self):
+        self.typed = []
+
+    def clear(self):
+        self.typed.clear()
+
+    def send_keys(self, value):
+        self.typed.append(value)
+
+
+class _Driver:
+    """execute_script raises the given error"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def execute_script(self, script, args):
+        raise self.error
+
+
+class SetValueTests(unittest.TestCase):
+    def tearDown(self):
+        FormHelpers.replace_value_supported = True
+
+    def test_rejected_command_falls_back_to_typing(self):
+        element = _Element()
+        FormHelpers._set_value(_Driver(UnknownMethodException("unknown method")), element, "a@example.com")
+        self.assertEqual(element.typed, ["a@example.com"])
+        self.assertFalse(FormHelpers.replace_value_supported)
+
+    def test_other_errors_are_raised_and_keep_the_command(self):
+        with self.assertRaises(StaleElementReferenceException):
+            FormHelpers._set_value(_Driver(StaleElementReferenceException("stale")), _Element(), "a@example.com")
+        self.assertTrue(FormHelpers.replace_value_supported)
+
+
+class FillLoginFormTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeAppiumServer(start_screen="sign_in").start()
+        cls.driver = webdriver.Remote(cls.fake.url, options=get_android_options())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+        cls.fake.stop()
+
+    def test_email_step_then_password_step(self):
+        self.fake.reset("sign_in")
+        email, password = TEST_CREDENTIALS["valid_email"], TEST_CREDENTIALS["valid_password"]
+        self.assertTrue(AuthHelpers.fill_login_form(self.driver, email, password))
+        self.assertEqual(self.fake.screen, "sign_in_password")
+        self.assertEqual(self.fake.fields.get("Password"), password)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import threading
+import unittest
+
+from login.helpers.instrumentation import Tracer
+
+
+class TracerTests(unittest.TestCase):
+    def test_nested_waits_count_once(self):
+        tracer = Tracer()
+        tracer.set_test("t1")
+        with tracer.span("wait_for_element", "wait"):
+            with tracer.span("resolve_element", "wait"):
+                tracer.record("sleep", "time.sleep", 0.1)
+        self.assertEqual([e["name"] for e in tracer.events if e["outermost"]], ["wait_for_element"])
+        self.assertEqual(tracer.per_test()["t1"]["sleep"], 0.1)
+
+    def test_spans_from_other_threads_leave_test_attribution_alone(self):
+        tracer = Tracer()
+        tracer.set_test("t1")
+        inside, release = threading.Event(), threading.Event()
+
+        def background():
+            with tracer.span("get_page_source"):
+                inside.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=background)
+        with tracer.span("login"):
+            thread.start()
+            inside.wait(5)
+            self.assertEqual(tracer.stack, ["login"])
+            release.set()
+            thread.join()
+        self.assertEqual([e["name"] for e in tracer.events if e["kind"] == "helper"], ["login"])
+        self.assertEqual(tracer.stack, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
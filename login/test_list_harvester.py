@@ -0,0 +1,66 @@
+import unittest
+
+from appium import webdriver
+
+from login.config import get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.list_harvester import ListHarvester
+
+# Rows the recorded Properties screen shows at once
+VISIBLE = 8
+
+
+class ListHarvesterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeAppiumServer(start_screen="properties").start()
+        cls.driver = webdriver.Remote(cls.fake.url, options=get_android_options())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+        cls.fake.stop()
+
+    def harvest(self, list_length: int):
+        self.fake.list_length = list_length
+        self.fake.reset("properties")
+        self.fake.reset_stats()
+        harvester = ListHarvester(self.driver)
+        return harvester, list(harvester)
+
+    def test_overlapping_pages_yield_each_row_once(self):
+        harvester, rows = self.harvest(25)
+        texts = [row["text"] for row in rows]
+        self.assertEqual(len(texts), 25)
+        self.assertEqual(len(set(texts)), 25)
+        self.assertGreater(harvester.pages, 2)
+        self.assertEqual(harvester.items, 25)
+
+    def test_short_list_is_read_from_one_page(self):
+        harvester, rows = self.harvest(0)
+        self.assertEqual(len(rows), VISIBLE)
+        # One gesture to learn the list cannot scroll, then one read to confirm nothing moved
+        self.assertEqual(self.fake.stats["execute"], 1)
+        self.assertEqual(harvester.pages, 2)
+
+    def test_stops_after_the_gesture_reports_the_end(self):
+        scroll = self.fake.scroll
+
+        def last_scroll(direction, percent):
+            scroll(direction, percent)
+            return False
+
+        self.fake.scroll = last_scroll
+        try:
+            harvester, rows = self.harvest(25)
+        finally:
+            del self.fake.scroll
+        # The page the last gesture brought into view is still read, nothing after it
+        self.assertEqual(harvester.pages, 2)
+        self.assertEqual(self.fake.stats["execute"], 1)
+        self.assertLess(len(rows), 25)
+        self.assertGreater(len(rows), VISIBLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
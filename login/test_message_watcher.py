@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from urllib3.exceptions import ReadTimeoutError
+
+from login.helpers.message_watcher import MessageWatcher
+from login.helpers.page_snapshot import PageSnapshot
+
+TOAST = "//android.widget.Toast"
+
+
+def snapshot(*toasts: str) -> PageSnapshot:
+    nodes = "".join(f'<android.widget.Toast text="{text}"/>' for text in toasts)
+    return PageSnapshot(f"<hierarchy><android.widget.FrameLayout>{nodes}</android.widget.FrameLayout></hierarchy>")
+
+
+class _Driver:
+    """page_source raises the queued errors first, then returns the hierarchy"""
+
+    def __init__(self, errors, source):
+        self.errors = list(errors)
+        self.source = source
+
+    @property
+    def page_source(self):
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.source
+
+
+class MessageWatcherTests(unittest.TestCase):
+    def test_poll_records_appearances_once(self):
+        watcher = MessageWatcher(None, {"toast": TOAST})
+        watcher.poll(snapshot("Saved"), 1.0)
+        watcher.poll(snapshot("Saved"), 2.0)
+        watcher.poll(snapshot(), 3.0)
+        watcher.poll(snapshot("Saved", "Welcome"), 4.0)
+        self.assertEqual([(e["text"], e["first_seen"], e["last_seen"]) for e in watcher.history()],
+                         [("Saved", 1.0, 2.0), ("Saved", 4.0, 4.0), ("Welcome", 4.0, 4.0)])
+        self.assertEqual(watcher.seen("Welcome")["name"], "toast")
+        self.assertEqual(len(watcher.history("Saved", since=3.0)), 1)
+        self.assertIsNone(watcher.seen(name="other"))
+
+    def test_transport_errors_do_not_stop_polling(self):
+        driver = _Driver([ReadTimeoutError(None, "/source", "read timed out"), ConnectionResetError()],
+                         snapshot("Saved").source)
+        watcher = MessageWatcher(driver, {"toast": TOAST}, interval=0.01).start()
+        try:
+            event = watcher.wait_for("Saved", timeout=5)
+        finally:
+            watcher.stop()
+        self.assertIsNotNone(event)
+        self.assertEqual(watcher.errors, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
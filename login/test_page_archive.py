@@ -0,0 +1,49 @@
+import gc
+import os
+import tempfile
+import unittest
+import warnings
+
+from login.helpers.page_archive import PageArchive
+
+SIGN_IN = "<hierarchy><android.widget.EditText text='Email'/></hierarchy>"
+DASHBOARD = "<hierarchy><android.widget.TextView text='Dashboard'/></hierarchy>"
+
+
+class PageArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.archive = PageArchive(self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_identical_sources_are_stored_once(self):
+        first = self.archive.add(SIGN_IN, test="t1", step="open")
+        second = self.archive.add(SIGN_IN, test="t2", step="open")
+        self.archive.add(DASHBOARD, test="t2", step="login", screen="Dashboard")
+        self.assertEqual(first, second)
+        stats = self.archive.stats()
+        self.assertEqual((stats["snapshots"], stats["unique"]), (3, 2))
+        self.assertEqual(self.archive.get(first[:8]), SIGN_IN)
+        blobs = [name for _, _, names in os.walk(os.path.join(self.dir.name, "blobs")) for name in names]
+        self.assertFalse([name for name in blobs if name.endswith(".tmp")])
+
+    def test_blob_files_are_closed(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            self.archive.add(SIGN_IN)
+            gc.collect()
+        self.assertFalse([w for w in caught if issubclass(w.category, ResourceWarning)])
+
+    def test_query_and_diff(self):
+        self.archive.current_test = "SignInTests.test_001"
+        a = self.archive.add(SIGN_IN, step="open")
+        b = self.archive.add(DASHBOARD, step="login", screen="Dashboard")
+        self.assertEqual([e["hash"] for e in self.archive.query(test="test_001", screen="Dashboard")], [b])
+        diff = self.archive.diff(a, b)
+        self.assertIn("+<android.widget.TextView text='Dashboard'/>", diff)
+
+
+if __name__ == "__main__":
+    unittest.main()
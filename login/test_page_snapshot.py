@@ -0,0 +1,33 @@
+import unittest
+
+from login.helpers.page_snapshot import PageSnapshot
+
+SOURCE = """<hierarchy>
+<android.widget.TextView resource-id="com.app:id/title" text="Dashboard"/>
+<android.widget.Button content-desc="Don't save" text="Cancel"/>
+<android.widget.Button content-desc='Say "hi" and don&apos;t wait' text="Send"/>
+</hierarchy>"""
+
+
+class PageSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = PageSnapshot(SOURCE)
+
+    def test_literal_quoting(self):
+        self.assertEqual(PageSnapshot.literal("plain"), "'plain'")
+        self.assertEqual(PageSnapshot.literal("Don't"), '"Don\'t"')
+        self.assertEqual(PageSnapshot.literal("a'b\"c"), "concat('a', \"'\", 'b\"c')")
+
+    def test_locators_with_quotes_resolve(self):
+        self.assertEqual(self.snapshot.first_match([("accessibility id", "Don't save")]), 0)
+        self.assertEqual(self.snapshot.first_match([("id", "missing"), ("accessibility id", "Say \"hi\" and don't wait")]), 1)
+        self.assertEqual(self.snapshot.text(PageSnapshot.to_xpath("id", "com.app:id/title")), "Dashboard")
+
+    def test_queries(self):
+        self.assertEqual(self.snapshot.texts("//android.widget.Button"), ["Cancel", "Send"])
+        self.assertEqual(self.snapshot.find_text("Dash"), "Dashboard")
+        self.assertFalse(PageSnapshot("").exists([("id", "com.app:id/title")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
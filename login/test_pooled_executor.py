@@ -0,0 +1,81 @@
+import socket
+import unittest
+
+from appium import webdriver
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+
+from login.config import get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.pooled_executor import PooledExecutor
+
+
+def closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class PooledExecutorTests(unittest.TestCase):
+    def setUp(self):
+        # Class-wide settings and metrics; put back so the suite's own HTTP report is unaffected
+        self.defaults = (PooledExecutor.RETRIES, PooledExecutor.COMMAND_TIMEOUTS,
+                         dict(PooledExecutor._counters), dict(PooledExecutor._latency))
+        PooledExecutor.configure(retries=2)
+        self.fake = FakeAppiumServer(start_screen="dashboard", command_latency={"page_source": 0.5}).start()
+
+    def tearDown(self):
+        self.fake.stop()
+        PooledExecutor.close_all()
+        PooledExecutor.RETRIES, PooledExecutor.COMMAND_TIMEOUTS, counters, latency = self.defaults
+        PooledExecutor._counters.update(counters)
+        PooledExecutor._latency.clear()
+        PooledExecutor._latency.update(latency)
+
+    def test_sessions_share_keep_alive_connections(self):
+        before = PooledExecutor.metrics()
+        drivers = [webdriver.Remote(PooledExecutor.for_server(self.fake.url), options=get_android_options())
+                   for _ in range(2)]
+        for driver in drivers:
+            for _ in range(3):
+                driver.find_elements("id", "missing")
+            driver.quit()
+        # Deltas: other tests in this process may have used the executor already
+        after = PooledExecutor.metrics()
+        self.assertEqual(after["connections_opened"] - before["connections_opened"], 1)
+        self.assertGreaterEqual(after["connections_reused"] - before["connections_reused"], 9)
+        finds = [m["latency"].get("findElements", {}).get("count", 0) for m in (before, after)]
+        self.assertEqual(finds[1] - finds[0], 6)
+
+    def test_read_timeout_is_not_retried(self):
+        driver = webdriver.Remote(PooledExecutor.for_server(self.fake.url), options=get_android_options())
+        PooledExecutor.configure(command_timeouts={"getPageSource": 0.2})
+        before = PooledExecutor.metrics()
+        try:
+            with self.assertRaises(ReadTimeoutError):
+                driver.page_source
+        finally:
+            PooledExecutor.configure(command_timeouts={"getPageSource": PooledExecutor.COMMAND_TIMEOUT})
+            driver.quit()
+        after = PooledExecutor.metrics()
+        self.assertEqual(self.fake.stats["page_source"], 1)
+        self.assertEqual(after["timeouts"] - before["timeouts"], 1)
+        self.assertEqual(after["retries"], before["retries"])
+
+    def test_refused_connection_is_retried(self):
+        executor = PooledExecutor.for_server(f"http://127.0.0.1:{closed_port()}")
+        before = PooledExecutor.metrics()
+        with self.assertRaises(MaxRetryError):
+            executor.execute("getPageSource", {"sessionId": "any"})
+        after = PooledExecutor.metrics()
+        self.assertEqual(after["retries"] - before["retries"], 2)
+        self.assertEqual(after["errors"] - before["errors"], 1)
+
+    def test_close_all_drops_the_pools(self):
+        webdriver.Remote(PooledExecutor.for_server(self.fake.url), options=get_android_options()).quit()
+        self.assertGreater(PooledExecutor.metrics()["connections_opened"], 0)
+        PooledExecutor.close_all()
+        self.assertEqual(PooledExecutor.metrics()["connections_opened"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+import numpy as np
+
+from login.helpers.screen_classifier import ScreenClassifier
+
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+
+def encode_png(pixels: np.ndarray, filters) -> bytes:
+    """RGB PNG whose row y uses filters[y % len(filters)] (the forward PNG filters)"""
+    height, width, channels = pixels.shape
+    rows, previous = [], [0] * (width * channels)
+    for y in range(height):
+        current = pixels[y].reshape(-1).tolist()
+        kind = filters[y % len(filters)]
+        out = []
+        for i, value in enumerate(current):
+            left = current[i - channels] if i >= channels else 0
+            upper_left = previous[i - channels] if i >= channels else 0
+            predicted = [0, left, previous[i], (left + previous[i]) >> 1, _paeth(left, previous[i], upper_left)][kind]
+            out.append((value - predicted) & 0xFF)
+        rows.append(bytes([kind] + out))
+        previous = current
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b"".join(rows))) + chunk(b"IEND", b""))
+
+
+def screen(bars: int, width: int = 40, height: int = 72) -> np.ndarray:
+    pixels = np.full((height, width, 3), 240, dtype=np.uint8)
+    for i in range(bars):
+        pixels[8 + i * 12:14 + i * 12, 4:width - 4 - i * 5] = (30 + i * 40, 90, 200 - i * 30)
+    return pixels
+
+
+class ScreenClassifierTests(unittest.TestCase):
+    def test_fallback_decoder_reverses_every_row_filter(self):
+        pixels = np.random.default_rng(7).integers(0, 256, (9, 7, 3), dtype=np.uint8)
+        decoded = ScreenClassifier._decode_png(encode_png(pixels, [0, 1, 2, 3, 4]))
+        self.assertTrue(np.allclose(decoded, pixels.astype(np.float64) @ np.array([0.299, 0.587, 0.114])))
+
+    def test_fallback_decoder_handles_wide_and_tall_images(self):
+        rng = np.random.default_rng(3)
+        for shape in ((3, 11, 3), (13, 2, 3), (1, 1, 3)):
+            pixels = rng.integers(0, 256, shape, dtype=np.uint8)
+            decoded = ScreenClassifier._decode_png(encode_png(pixels, [4, 3, 1, 0, 2]))
+            self.assertTrue(np.allclose(decoded, pixels.astype(np.float64) @ np.array([0.299, 0.587, 0.114])))
+
+    def test_resample_enlarges_small_images(self):
+        small = ScreenClassifier._resample(np.arange(6, dtype=np.float64).reshape(2, 3), 8)
+        self.assertEqual(small.shape, (8, 8))
+        self.assertTrue(np.isfinite(small).all())
+        self.assertEqual(ScreenClassifier(hash_size=4).phash(encode_png(screen(1, 6, 6), [4])).size, 2)
+
+    def test_classify_learned_screens(self):
+        classifier = ScreenClassifier(hash_size=8)
+        dashboard, properties = encode_png(screen(2), [1, 4]), encode_png(screen(5), [3, 2])
+        self.assertTrue(classifier.learn(None, "Dashboard", dashboard))
+        self.assertTrue(classifier.learn(None, "Properties", properties))
+        self.assertFalse(classifier.learn(None, "Dashboard", dashboard))
+        self.assertEqual(classifier.classify(dashboard), ("Dashboard", 0))
+        self.assertEqual(classifier.classify(properties)[0], "Properties")
+
+    def test_learn_hashes_the_screenshot_once(self):
+        classifier = ScreenClassifier(hash_size=8)
+        with mock.patch.object(classifier, "phash", wraps=classifier.phash) as phash:
+            classifier.learn(None, "Dashboard", encode_png(screen(2), [0]))
+        self.assertEqual(phash.call_count, 1)
+
+    def test_learn_skips_undecodable_screenshots(self):
+        classifier = ScreenClassifier(hash_size=8)
+        self.assertFalse(classifier.learn(None, "Dashboard", b"not a png"))
+        self.assertFalse(classifier.learn(None, "Dashboard", encode_png(screen(2), [0])[:60]))
+        self.assertEqual(classifier.labels, [])
+
+    def test_save_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "screens.json")
+            classifier = ScreenClassifier(path, hash_size=8)
+            classifier.add("Dashboard", encode_png(screen(2), [0]))
+            classifier.save()
+            self.assertEqual(ScreenClassifier(path, hash_size=8).labels, ["Dashboard"])
+            self.assertEqual(ScreenClassifier(path, hash_size=16).labels, [])
+            self.assertEqual(os.listdir(folder), ["screens.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from login import conftest
+from login.helpers.screen_fingerprints import ScreenFingerprints, PASSWORD_STEP
+from login.helpers.screen_navigator import DRAWER, SIGNED_OUT
+from login.helpers.state_scheduler import LOGGED_IN, LOGGED_OUT, StateScheduler
+
+
+def screen(title: str, *rows: str, toast: str = "") -> str:
+    items = "".join(f'<node class="android.widget.TextView" text="{row}"/>' for row in rows)
+    extra = f'<node class="android.widget.Toast" text="{toast}"/>' if toast else ""
+    return (f'<hierarchy><node class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">'
+            f'<node class="android.widget.TextView" text="{title}"/>'
+            f'<node class="android.widget.ListView" scrollable="true">{items}</node>{extra}</node></hierarchy>')
+
+
+class _Item:
+    def __init__(self, name, requires=None, produces=None):
+        self.name = name
+        self.obj = StateScheduler.declare(requires, produces)(lambda: None) if requires or produces else None
+
+
+class ScreenFingerprintsTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "fingerprints.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_fingerprint_ignores_data_and_transient_nodes(self):
+        base = ScreenFingerprints.fingerprint(screen("Properties", "12 Main St", "14 Oak Ave"))
+        self.assertEqual(ScreenFingerprints.fingerprint(screen("Properties", "3 Elm Rd", toast="Saved")), base)
+        self.assertNotEqual(ScreenFingerprints.fingerprint(screen("Property list", "3 Elm Rd")), base)
+
+    def test_changed_screens_and_selected_tests(self):
+        fingerprints = ScreenFingerprints(self.path)
+        for build, title in (("1.0", "Properties"), ("1.1", "Property list")):
+            fingerprints.record(build, "Properties", screen(title), ["xpath|//*[@text='Properties']"])
+            fingerprints.record(build, "Violations", screen("Violations"), [])
+        self.assertEqual(fingerprints.changed("1.1", "1.0"), ["Properties"])
+        self.assertEqual(fingerprints.dead_selectors("1.1", "1.0"), ["xpath|//*[@text='Properties']"])
+        tests = [("test_properties", LOGGED_IN, StateScheduler.screen("Properties")),
+                 ("test_violations", LOGGED_IN, StateScheduler.screen("Violations")),
+                 ("test_undeclared", None, None)]
+        self.assertEqual(ScreenFingerprints.select_tests(tests, ["Properties"]), ["test_properties", "test_undeclared"])
+        self.assertEqual(ScreenFingerprints.select_tests(tests, [DRAWER]),
+                         ["test_properties", "test_violations", "test_undeclared"])
+
+    def test_screens_touched(self):
+        self.assertEqual(ScreenFingerprints.screens_touched(LOGGED_OUT, None), {SIGNED_OUT, PASSWORD_STEP})
+        self.assertEqual(ScreenFingerprints.screens_touched(LOGGED_IN, StateScheduler.screen("Contracts")),
+                         {"Dashboard", DRAWER, "Contracts"})
+
+    def test_save_keeps_newest_builds(self):
+        fingerprints = ScreenFingerprints(self.path, max_builds=1)
+        fingerprints.record("1.0", "Violations", screen("Violations"), [])
+        fingerprints.builds["1.0"]["saved"] = 1
+        fingerprints.record("1.1", "Violations", screen("Violations"), [])
+        fingerprints.save()
+        self.assertEqual(os.listdir(self.dir.name), ["fingerprints.json"])
+        self.assertEqual(list(ScreenFingerprints(self.path).builds), ["1.1"])
+
+    def test_selection_for_another_build_runs_everything(self):
+        selection = os.path.join(self.dir.name, "selection.json")
+        with open(selection, "w", encoding="utf-8") as f:
+            json.dump({"build": "1.1", "against": "1.0", "changed": ["Properties"], "tests": ["test_properties"]}, f)
+        config = mock.Mock(spec=["hook"])
+        for version, expected in (("1.2", ["test_properties", "test_violations"]), ("1.1", ["test_properties"])):
+            items = [_Item("test_properties", LOGGED_IN, StateScheduler.screen("Properties")),
+                     _Item("test_violations", LOGGED_IN, StateScheduler.screen("Violations"))]
+            with mock.patch.object(conftest, "IMPACT_SELECTION_FILE", selection), \
+                    mock.patch.object(conftest, "APP_VERSION", version):
+                conftest._apply_impact_selection(config, items)
+            self.assertEqual([item.name for item in items], expected)
+
+    def test_selection_from_fake_screens_runs_everything(self):
+        selection = os.path.join(self.dir.name, "selection.json")
+        with open(selection, "w", encoding="utf-8") as f:
+            json.dump({"build": "1.1", "against": "1.0", "fake": True, "changed": [], "tests": []}, f)
+        items = [_Item("test_properties", LOGGED_IN, StateScheduler.screen("Properties"))]
+        with mock.patch.object(conftest, "IMPACT_SELECTION_FILE", selection), \
+                mock.patch.object(conftest, "APP_VERSION", "1.1"):
+            conftest._apply_impact_selection(mock.Mock(spec=["hook"]), items)
+        self.assertEqual([item.name for item in items], ["test_properties"])
+
+
+if __name__ == "__main__":
+    unittest.main()
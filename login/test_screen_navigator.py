@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from appium import webdriver
+
+from login.constants import MENU_TITLES
+from login.config import get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.page_snapshot import PageSnapshot
+from login.helpers.screen_navigator import ScreenNavigator, DRAWER, SIGNED_OUT
+
+
+class ScreenNavigatorPlanTests(unittest.TestCase):
+    def setUp(self):
+        self.navigator = ScreenNavigator(MENU_TITLES, {"Settings": "qompli://settings"})
+
+    def test_plan_through_the_drawer(self):
+        self.assertEqual(self.navigator.plan("Dashboard", False, "Properties"),
+                         [("open_drawer", DRAWER), ("menu:Properties", "Properties")])
+        self.assertEqual(self.navigator.plan("Dashboard", True, "Properties"), [("menu:Properties", "Properties")])
+        self.assertEqual(self.navigator.plan("Properties", False, "Properties"), [])
+
+    def test_plan_follows_measured_costs(self):
+        self.navigator.costs["deep_link:Settings"] = 0.5
+        self.assertEqual(self.navigator.plan("Dashboard", False, "Settings"), [("deep_link:Settings", "Settings")])
+        self.assertIsNone(self.navigator.plan(SIGNED_OUT, False, "Settings"))
+
+    def test_save_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "costs.json")
+            self.navigator.costs_file = path
+            self.navigator._record("open_drawer", 2.0)
+            self.navigator._record("open_drawer", 1.0)
+            self.navigator.save()
+            self.assertEqual(os.listdir(directory), ["costs.json"])
+            self.assertAlmostEqual(ScreenNavigator(MENU_TITLES, costs_file=path).cost("open_drawer"), 1.7)
+
+
+class ScreenNavigatorFakeServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeAppiumServer(start_screen="dashboard").start()
+        cls.driver = webdriver.Remote(cls.fake.url, options=get_android_options())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+        cls.fake.stop()
+
+    def setUp(self):
+        self.fake.reset()
+        self.navigator = ScreenNavigator(MENU_TITLES)
+
+    def test_navigate_and_detect(self):
+        self.assertEqual(self.navigator.detect(PageSnapshot.capture(self.driver)), ("Dashboard", False))
+        self.assertTrue(self.navigator.navigate(self.driver, "Violations"))
+        self.assertEqual(self.navigator.detect(PageSnapshot.capture(self.driver)), ("Violations", False))
+        self.assertEqual(set(self.navigator.costs), {"open_drawer", "menu:Violations"})
+
+    def test_detect_open_drawer(self):
+        self.fake.reset("nav_drawer")
+        self.assertTrue(self.navigator.detect(PageSnapshot.capture(self.driver))[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import base64
+import os
+import tempfile
+import unittest
+
+from login.helpers.screenshot_pipeline import ScreenshotPipeline
+
+PNG = base64.b64encode(b"\x89PNG\r\n\x1a\n not really an image").decode()
+
+
+class _Screen:
+    def get_screenshot_as_base64(self):
+        return PNG
+
+
+class ScreenshotPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_capture_writes_in_background(self):
+        pipeline = ScreenshotPipeline(self.dir.name, workers=1)
+        paths = [pipeline.capture(_Screen(), f"shot_{i}.png") for i in range(3)]
+        pipeline.close()
+        for path in paths:
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), base64.b64decode(PNG))
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["shot_0.png", "shot_1.png", "shot_2.png"])
+
+    def test_failed_submit_releases_its_slot(self):
+        pipeline = ScreenshotPipeline(self.dir.name, workers=1, max_pending=1)
+        pipeline.close()
+        with self.assertRaises(RuntimeError):
+            pipeline.capture(_Screen(), "late.png")
+        self.assertTrue(pipeline.slots.acquire(timeout=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from login.helpers.selector_compiler import SelectorCompiler
+
+UIAUTOMATOR = "-android uiautomator"
+
+
+class SelectorCompilerTests(unittest.TestCase):
+    def test_class_and_text(self):
+        self.assertEqual(SelectorCompiler.to_uiselector("//android.widget.EditText"),
+                         (UIAUTOMATOR, 'new UiSelector().className("android.widget.EditText")'))
+        self.assertEqual(SelectorCompiler.to_uiselector("//*[@text='Sign In']"),
+                         (UIAUTOMATOR, 'new UiSelector().text("Sign In")'))
+
+    def test_contains_and_conjunction(self):
+        self.assertEqual(
+            SelectorCompiler.to_uiselector("//android.widget.TextView[contains(@text, 'Please') and @content-desc=\"x\"]"),
+            (UIAUTOMATOR, 'new UiSelector().className("android.widget.TextView").textContains("Please").description("x")'))
+
+    def test_qualified_resource_id_becomes_id_locator(self):
+        self.assertEqual(SelectorCompiler.to_uiselector("//*[@resource-id='com.app:id/login']"), ("id", "com.app:id/login"))
+        self.assertEqual(SelectorCompiler.to_uiselector("//*[@resource-id='login']"),
+                         (UIAUTOMATOR, 'new UiSelector().resourceId("login")'))
+
+    def test_instance(self):
+        self.assertEqual(SelectorCompiler.to_uiselector("(//android.widget.TextView[@text='Properties'])[2]"),
+                         (UIAUTOMATOR, 'new UiSelector().className("android.widget.TextView").text("Properties").instance(1)'))
+        self.assertIsNone(SelectorCompiler.to_uiselector("(//android.widget.TextView)[0]"))
+
+    def test_quotes_are_escaped(self):
+        self.assertEqual(SelectorCompiler.to_uiselector('//*[@text=\'Say "hi"\']'),
+                         (UIAUTOMATOR, 'new UiSelector().text("Say \\"hi\\"")'))
+
+    def test_unsafe_shapes_are_not_rewritten(self):
+        for xpath in ("//android.widget.Toast[@text='Saved']",
+                      "//android.widget.EditText[1]",
+                      "//android.widget.LinearLayout/android.widget.TextView",
+                      "//*[@text='a' or @text='b']",
+                      "//*[@bounds='[0,0][10,10]']",
+                      "//*[starts-with(@text, 'A')]"):
+            self.assertIsNone(SelectorCompiler.to_uiselector(xpath), xpath)
+            self.assertEqual(SelectorCompiler.compile("xpath", xpath), ("xpath", xpath))
+
+    def test_compile_leaves_other_strategies_alone(self):
+        self.assertEqual(SelectorCompiler.compile_list([("id", "login"), ("xpath", "//android.widget.Button")]),
+                         [("id", "login"), (UIAUTOMATOR, 'new UiSelector().className("android.widget.Button")')])
+
+
+if __name__ == "__main__":
+    unittest.main()
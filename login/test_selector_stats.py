@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.element_helpers import ElementHelpers
+from login.helpers.selector_stats import SelectorStats
+
+SELECTORS = [("id", "primary"), ("xpath", "//fallback"), ("accessibility id", "last")]
+
+
+class SelectorStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "stats.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_selectors_after_the_winner_are_not_attempted(self):
+        stats = SelectorStats(self.path, "1.0")
+        stats.record(SELECTORS, 0, 0.1)
+        self.assertEqual(list(stats.version["selectors"]), ["id|primary"])
+        self.assertEqual(stats.never_matched(), [])
+
+    def test_miss_attempts_every_selector(self):
+        stats = SelectorStats(self.path, "1.0")
+        stats.record(SELECTORS, None, 3.0)
+        self.assertEqual([key for key, _ in stats.never_matched()],
+                         sorted(SelectorStats.key(by, s) for by, s in SELECTORS))
+
+    def test_order_puts_fastest_winner_first(self):
+        stats = SelectorStats(self.path, "1.0")
+        stats.record(SELECTORS, 1, 0.2)
+        stats.record(SELECTORS, 2, 0.1)
+        self.assertEqual(stats.order(SELECTORS), [SELECTORS[2], SELECTORS[1], SELECTORS[0]])
+
+    def test_save_round_trip_per_version(self):
+        stats = SelectorStats(self.path, "1.0")
+        stats.record(SELECTORS, 1, 0.2)
+        stats.save()
+        self.assertEqual(os.listdir(self.dir.name), ["stats.json"])
+        self.assertEqual(SelectorStats(self.path, "1.0").order(SELECTORS)[0], SELECTORS[1])
+        self.assertEqual(SelectorStats(self.path, "2.0").order(SELECTORS), SELECTORS)
+
+
+class _Element:
+    def __init__(self, clicks, selector):
+        self.clicks, self.selector = clicks, selector
+
+    def click(self):
+        self.clicks.append(self.selector)
+
+
+class _Driver:
+    """Every selector matches; clicks are recorded by selector"""
+
+    def __init__(self):
+        self.clicks = []
+        self.source_reads = 0
+
+    @property
+    def page_source(self):
+        self.source_reads += 1
+        return "<hierarchy/>"
+
+    def find_elements(self, by, selector):
+        return [_Element(self.clicks, selector)]
+
+
+class NavigationOrderTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.settle = ElementHelpers.SETTLE_QUIET_PERIOD
+        ElementHelpers.SETTLE_QUIET_PERIOD = 0
+        ElementHelpers.selector_stats = SelectorStats(os.path.join(self.dir.name, "stats.json"), "1.0")
+
+    def tearDown(self):
+        ElementHelpers.selector_stats = None
+        ElementHelpers.SETTLE_QUIET_PERIOD = self.settle
+        self.dir.cleanup()
+
+    def test_menu_clicks_ignore_stats_that_favour_text_fallbacks(self):
+        selectors = AuthHelpers.NAV_PROPERTY_SELECTORS
+        for _ in range(5):
+            ElementHelpers.selector_stats.record(selectors, 1, 0.1)
+        self.assertEqual(ElementHelpers.selector_stats.order(selectors)[0], selectors[1])
+        driver = _Driver()
+        self.assertTrue(AuthHelpers.click_properties(driver))
+        self.assertEqual(driver.clicks, [selectors[0][1]])
+
+    def test_click_only_settles_when_asked(self):
+        driver = _Driver()
+        self.assertTrue(ElementHelpers.safe_click(driver, AuthHelpers.SIGN_IN_BUTTON_SELECTORS))
+        self.assertEqual(driver.source_reads, 0)
+        self.assertTrue(ElementHelpers.safe_click(driver, AuthHelpers.SIGN_IN_BUTTON_SELECTORS, settle=True))
+        self.assertGreater(driver.source_reads, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
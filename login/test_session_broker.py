@@ -0,0 +1,84 @@
+import unittest
+
+from login.config import get_android_options
+from login.fake_appium.server import FakeAppiumServer
+from login.helpers.session_broker import BrokerClient, SessionBroker, parse_address
+
+
+class _Connection:
+    """Client end of a broker connection: replays requests (callables get the replies so far), then disconnects"""
+
+    def __init__(self, *requests):
+        self.requests = list(requests)
+        self.sent = []
+
+    def recv(self):
+        if not self.requests:
+            raise EOFError
+        request = self.requests.pop(0)
+        return request(self.sent) if callable(request) else request
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def close(self):
+        pass
+
+
+class SessionBrokerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeAppiumServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.broker = SessionBroker(("127.0.0.1", 0), b"test", idle_timeout=600)
+        self.capabilities = get_android_options().to_capabilities()
+
+    def tearDown(self):
+        for session_id in list(self.broker.sessions):
+            self.broker._discard(session_id, "test done")
+
+    def test_released_session_is_reused(self):
+        first, _ = self.broker.acquire(self.fake.url, self.capabilities)
+        self.broker.release(first)
+        second, _ = self.broker.acquire(self.fake.url, self.capabilities)
+        self.assertEqual(first, second)
+        self.assertEqual(self.broker.sessions[first]["uses"], 2)
+
+    def test_lease_dropped_when_client_disconnects(self):
+        conn = _Connection(("acquire", self.fake.url, self.capabilities))
+        self.broker._handle(conn)
+        self.assertEqual(conn.sent[0][0], "ok")
+        self.assertEqual(self.broker.stats(), {"sessions": 0, "leased": 0})
+
+    def test_released_lease_survives_disconnect(self):
+        conn = _Connection(("acquire", self.fake.url, self.capabilities), lambda sent: ("release", sent[0][1][0]))
+        self.broker._handle(conn)
+        self.assertEqual(self.broker.stats(), {"sessions": 1, "leased": 0})
+
+    def test_reap_quits_idle_sessions_and_keeps_leased_ones(self):
+        idle, _ = self.broker.acquire(self.fake.url, self.capabilities)
+        self.broker.release(idle)
+        leased, _ = self.broker.acquire(self.fake.url, dict(self.capabilities, **{"appium:udid": "other"}))
+        self.broker.sessions[idle]["last_used"] -= 601
+        self.broker.reap()
+        self.assertEqual(list(self.broker.sessions), [leased])
+
+
+class BrokerAddressTests(unittest.TestCase):
+    def test_host_defaults_to_localhost(self):
+        self.assertEqual(parse_address("47230"), ("127.0.0.1", 47230))
+        self.assertEqual(parse_address(":47230"), ("127.0.0.1", 47230))
+        self.assertEqual(parse_address("10.0.0.5:47230"), ("10.0.0.5", 47230))
+
+    def test_client_requires_authkey(self):
+        with self.assertRaises(RuntimeError):
+            BrokerClient(("127.0.0.1", 47230), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
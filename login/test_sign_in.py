@@ -1,41 +1,41 @@
 import unittest
-import time
 import sys
 import os
+import time
+from contextlib import nullcontext
 
-from appium import webdriver
 from appium.webdriver.common.appiumby import AppiumBy
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
+# Import everything through the `login` package, as conftest does: importing the helpers a second time as
+# top-level `helpers.*` modules would give them separate class-level state (login stats, shared HTTP pools)
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
 
-from config import (
-    get_android_options,
-    APPIUM_SERVER_URL,
+from login.config import (
     TEST_CREDENTIALS,
-    APP_PACKAGE
+    APP_PACKAGE,
+    WAIT_TIMEOUT,
+    TEST_WAIT_BUDGET,
+    REPORTS_DIR,
+    SCREENSHOT_EACH_STEP,
+    PAGE_ARCHIVE_EACH_STEP,
+    CREDENTIAL_MATRIX_FILE,
+    CREDENTIAL_MATRIX_SETTLE,
+    CREDENTIAL_MATRIX_MESSAGE_XPATH,
 )
-from helpers.auth_helpers import AuthHelpers
-from helpers.element_helpers import ElementHelpers
-
-
-# ============================================
-# Central reusable mapping for all menu titles
-# ============================================
-MENU_TITLES = {
-    "Dashboard": "//android.widget.TextView[@text='Dashboard']",
-    "Properties": "(//android.widget.TextView[@text='Properties'])[1]",
-    "Inspections": "(//android.widget.TextView[@text='Inspections'])[1]",
-    "Violations": "(//android.widget.TextView[@text='Violations'])[1]",
-    "Non-Compliant": "//android.widget.TextView[@text='Non-Compliant']",
-    "Contracts": "(//android.widget.TextView[@text='Contracts'])[1]",
-    "Marketplace": "(//android.widget.TextView[@text='Marketplace'])[1]",
-    "Payment History": "(//android.widget.TextView[@text='Payment History'])[1]",
-    "Job Filing": "(//android.widget.TextView[@text='Job Filing'])[1]",
-    "QompliGov AI": "(//android.widget.TextView[@text='QompliGov AI'])[1]",
-    "Settings": "//android.widget.TextView[@text='Qompliai']"
-}
+from login.constants import MENU_TITLES
+from login.helpers.auth_helpers import AuthHelpers
+from login.helpers.element_helpers import ElementHelpers
+from login.helpers.form_helpers import FormHelpers
+from login.helpers.page_snapshot import PageSnapshot
+from login.helpers.adaptive_timeouts import AdaptiveTimeouts
+from login.helpers.device_pool import DevicePool
+from login.helpers.features import Features
+from login.helpers.wait_budget import WaitBudget
+from login.helpers.state_scheduler import StateScheduler, LOGGED_IN, LOGGED_OUT
+from login.helpers.message_watcher import MessageWatcher
+from login.helpers.credential_matrix import CredentialMatrix
 
 
 class SignInTests(unittest.TestCase):
@@ -43,34 +43,41 @@ class SignInTests(unittest.TestCase):
     # ============================
     # Helper: Get title text
     # ============================
-    def get_title(self, name):
+    def get_title(self, name, timeout=None):
+        """Title text of a screen; the default timeout is 3s, or longer if the screen has been learned to be slower"""
         xpath = MENU_TITLES[name]
-        try:
-            elem = ElementHelpers.wait_for_element(
-                self.driver, [(AppiumBy.XPATH, xpath)]
-            )
-            return elem.text
-        except:
-            return None
+        timeouts = ElementHelpers.adaptive_timeouts
+        target = AdaptiveTimeouts.screen(name)
+        if timeout is None:
+            timeout = timeouts.timeout(target, 3, expected=True) if timeouts else 3
+        start = time.time()
+        title = PageSnapshot.wait_until(
+            self.driver, lambda snapshot: snapshot.text(xpath), timeout
+        )
+        if timeouts:
+            timeouts.record(target, time.time() - start, title is not None, expected=True)
+        return title
 
     # ============================
     # Helper: Find tooltip text
     # ============================
-    def get_tooltip_text(self, expected_substring, timeout=6):
+    def get_tooltip_text(self, expected_substring, timeout=6, since=0.0):
         """
         Finds tooltip text matching expected_substring anywhere in TextViews.
         Returns text if found, None if not found.
+        With the message watcher running, the answer comes from its history of messages
+        shown after `since`, so a tooltip that has already disappeared still counts.
+        Otherwise one page-source read per poll instead of a round trip per TextView.
         """
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            # search all text views
-            elems = self.driver.find_elements(AppiumBy.CLASS_NAME, "android.widget.TextView")
-            for e in elems:
-                txt = e.text or ""
-                if expected_substring in txt:
-                    return txt
-            time.sleep(0.3)
-        return None
+        if self.watcher:
+            quote = '"' if "'" in expected_substring else "'"
+            self.watcher.watch(f"expected:{expected_substring}",
+                               f"//android.widget.TextView[contains(@text, {quote}{expected_substring}{quote})]")
+            event = self.watcher.wait_for(expected_substring, since=since, timeout=timeout)
+            return event["text"] if event else None
+        return PageSnapshot.wait_until(
+            self.driver, lambda snapshot: snapshot.find_text(expected_substring), timeout
+        )
 
 
     # ============================
@@ -78,15 +85,22 @@ class SignInTests(unittest.TestCase):
     # ============================
     @classmethod
     def setUpClass(cls):
-        options = get_android_options()
-        cls.driver = webdriver.Remote(APPIUM_SERVER_URL, options=options)
-        time.sleep(3)
+        # Session, device and optional features (see helpers/features.py and config.py)
+        cls.features = Features(MENU_TITLES).start(
+            cls, ["navigate_and_verify", "get_title", "get_tooltip_text", "ensure_sign_in_page"]
+        )
+        cls.driver = cls.features.driver
+        cls.navigator = cls.features.navigator
+        cls.watcher = cls.features.watcher
+        cls.profiler = cls.features.profiler
+        cls.classifier = cls.features.classifier
 
     @classmethod
     def tearDownClass(cls):
-        cls.driver.quit()
+        cls.features.stop()
 
     def setUp(self):
+        self.features.begin_test(self.id())
         try:
             if self.driver.current_package != APP_PACKAGE:
                 self.driver.activate_app(APP_PACKAGE)
@@ -97,17 +111,24 @@ class SignInTests(unittest.TestCase):
     # Sign-in screen handler
     # ============================
     def ensure_sign_in_page(self):
+        """Sign-in screen visible; signs out first if the app is on an authenticated screen"""
+        if AuthHelpers.is_logged_in(self.driver):
+            AuthHelpers.click_nav_bar(self.driver)
+            AuthHelpers.logout(self.driver)
         selectors = [
             (AppiumBy.XPATH, "//*[@text='Sign In']"),
             (AppiumBy.XPATH, "//android.widget.EditText[contains(@hint,'Email')]"),
         ]
-        return ElementHelpers.element_exists(self.driver, selectors, timeout=3)
+        return bool(PageSnapshot.wait_until(
+            self.driver, lambda snapshot: snapshot.exists(selectors), timeout=3
+        ))
 
 
 #errors in the tooltip code to get the tooltip error message
     # ============================
     # TC-SI-000: Tooltip for invalid email
     # ============================
+    @StateScheduler.declare(requires=LOGGED_OUT)
     def test_000_invalid_email_tooltip(self):
         print("\n=== TC-SI-000: Invalid Email Tooltip Check ===")
 
@@ -128,13 +149,13 @@ class SignInTests(unittest.TestCase):
             pass
 
         # Tap Sign In to force validation
+        since = MessageWatcher.mark()
         AuthHelpers.submit_login(self.driver)
-        time.sleep(1)
 
         # EXPECTED TEXT FROM YOUR SCREENSHOT
         expected = "Please include an '@' in the email address"
 
-        tooltip_text = self.get_tooltip_text(expected)
+        tooltip_text = self.get_tooltip_text(expected, since=since)
 
         print("Tooltip Found:", tooltip_text)
 
@@ -147,6 +168,7 @@ class SignInTests(unittest.TestCase):
     # ============================
     # TC-SI-001 valid email
     # ============================
+    @StateScheduler.declare(requires=LOGGED_OUT, produces=StateScheduler.screen("Dashboard"))
     def test_001_sign_in(self):
         email = TEST_CREDENTIALS.get("valid_email")
         password = TEST_CREDENTIALS.get("valid_password")
@@ -157,76 +179,149 @@ class SignInTests(unittest.TestCase):
         self.ensure_sign_in_page()
 
         # Email
-        ElementHelpers.safe_send_keys(
+        FormHelpers.fill_form(
             self.driver,
-            [(AppiumBy.XPATH, "//android.widget.EditText[contains(@hint,'Email')]")],
-            email
+            {(AppiumBy.XPATH, "//android.widget.EditText[contains(@hint,'Email')]"): email}
         )
         AuthHelpers.submit_login(self.driver)
 
         # Password
-        ElementHelpers.safe_send_keys(
+        FormHelpers.fill_form(
             self.driver,
-            [(AppiumBy.XPATH, "//android.widget.EditText[contains(@hint,'Password')]")],
-            password
+            {(AppiumBy.XPATH, "//android.widget.EditText[contains(@hint,'Password')]"): password}
         )
+        since = MessageWatcher.mark()
         AuthHelpers.submit_login(self.driver)
-        time.sleep(4)
+        ElementHelpers.wait_for_idle(self.driver, timeout=WAIT_TIMEOUT)
 
         title = self.get_title("Dashboard")
         print("Dashboard:", title)
         self.assertIsNotNone(title, "Dashboard title not visible.")
+        if self.watcher:
+            # Informational: the toast may already be gone by the time the dashboard is idle
+            toast = self.watcher.seen(name="success_toast", since=since)
+            print("Success toast:", toast["text"] if toast else "(not seen)")
+
+    # ============================
+    # Logged-in state
+    # ============================
+    def ensure_logged_in(self):
+        """Reuse the current session if already authenticated, else log in through the UI"""
+        logged_in = AuthHelpers.ensure_logged_in(
+            self.driver, TEST_CREDENTIALS.get("valid_email"), TEST_CREDENTIALS.get("valid_password"), WAIT_TIMEOUT
+        )
+        self.assertTrue(logged_in, "Could not reach a logged-in state.")
 
     # ============================
     # Navigation Test Builder
     # ============================
     def navigate_and_verify(self, click_func, title_name):
-        AuthHelpers.click_nav_bar(self.driver)
-        click_func(self.driver)
-        time.sleep(3)
-        title = self.get_title(title_name)
-        print(f"{title_name} Title:", title)
-        self.assertIsNotNone(title, f"{title_name} title not found")
+        self.ensure_logged_in()
+        # Profiled as one step on this screen (navigation included) when the app profiler is on
+        profile = self.profiler.step(f"navigate to {title_name}", screen=title_name) if self.profiler else nullcontext()
+        with profile:
+            with WaitBudget.step_for(self.driver, f"navigate to {title_name}", WAIT_TIMEOUT):
+                # Cheapest path from wherever we are; the fixed drawer + menu clicks are the fallback
+                if not self.navigator.navigate(self.driver, title_name):
+                    # The failed path may have left the drawer open; tapping the nav bar again would close it
+                    _, drawer_open = self.navigator.detect(PageSnapshot.capture(self.driver))
+                    if not drawer_open:
+                        AuthHelpers.click_nav_bar(self.driver)
+                    click_func(self.driver)
+                title = self.get_title(title_name)
+            if SCREENSHOT_EACH_STEP:
+                ElementHelpers.take_screenshot(self.driver, f"{self._testMethodName}.png")
+            if title is None or PAGE_ARCHIVE_EACH_STEP:
+                # Archived snapshot of this step: python helpers/page_archive.py <dir> list --test <test id>
+                ElementHelpers.get_page_source(self.driver, save_to_file=True, step="navigate_and_verify", screen=title_name)
+            if self.classifier:
+                # Verified screens grow the reference library; on failure, say what the screen looks like instead
+                if title is not None:
+                    self.classifier.learn(self.driver, title_name)
+                else:
+                    print(f"Screen looks like: {self.classifier.where_am_i(self.driver) or 'unknown'}")
+            print(f"{title_name} Title:", title)
+            self.assertIsNotNone(title, f"{title_name} title not found")
 
     # ============================
     # TC-SI-002 → TC-SI-011
+    # Run order comes from the declared states (StateScheduler), not the numbering
     # ============================
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Properties"))
     def test_002_properties(self):
         self.navigate_and_verify(AuthHelpers.click_properties, "Properties")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Violations"))
     def test_003_violations(self):
         self.navigate_and_verify(AuthHelpers.click_violations, "Violations")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Non-Compliant"))
     def test_004_non_compliant(self):
         self.navigate_and_verify(AuthHelpers.click_non_compliant, "Non-Compliant")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Contracts"))
     def test_005_contracts(self):
         self.navigate_and_verify(AuthHelpers.click_contracts, "Contracts")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Marketplace"))
     def test_006_marketplace(self):
         self.navigate_and_verify(AuthHelpers.click_marketplace, "Marketplace")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Payment History"))
     def test_007_payment_history(self):
         self.navigate_and_verify(AuthHelpers.click_payment_history, "Payment History")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Job Filing"))
     def test_008_job_filing(self):
         self.navigate_and_verify(AuthHelpers.click_job_filling, "Job Filing")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("QompliGov AI"))
     def test_009_qompligov(self):
         self.navigate_and_verify(AuthHelpers.click_qompligov_ai, "QompliGov AI")
 
+    @StateScheduler.declare(requires=LOGGED_IN, produces=StateScheduler.screen("Settings"))
     def test_010_settings(self):
         self.navigate_and_verify(AuthHelpers.click_setting, "Settings")
 
     # ============================
     # Logout
     # ============================
+    @StateScheduler.declare(requires=LOGGED_IN, produces=LOGGED_OUT)
     def test_011_logout(self):
+        self.ensure_logged_in()
         AuthHelpers.click_nav_bar(self.driver)
         AuthHelpers.logout(self.driver)
-        time.sleep(2)
         self.assertTrue(self.ensure_sign_in_page(), "Sign-in screen not shown after logout.")
 
+    # ============================
+    # TC-SI-012: Credential matrix
+    # All cases in CREDENTIAL_MATRIX_FILE on one sign-in screen, no relaunch between them
+    # ============================
+    @StateScheduler.declare(requires=LOGGED_OUT)
+    def test_012_credential_matrix(self):
+        if not os.path.exists(CREDENTIAL_MATRIX_FILE):
+            self.skipTest(f"No credential matrix file: {CREDENTIAL_MATRIX_FILE}")
+        cases = CredentialMatrix.load(CREDENTIAL_MATRIX_FILE, TEST_CREDENTIALS)
+        self.assertTrue(self.ensure_sign_in_page(), "Sign-in screen not shown.")
+
+        matrix = CredentialMatrix(self.driver, CREDENTIAL_MATRIX_MESSAGE_XPATH, CREDENTIAL_MATRIX_SETTLE)
+        results = matrix.run(cases, case_budget=TEST_WAIT_BUDGET)
+        path = CredentialMatrix.save(results, os.path.join(REPORTS_DIR, f"credential_matrix_{DevicePool.worker_id()}.csv"))
+        print(CredentialMatrix.format_table(results))
+        print(matrix.summary(results))
+        print(f"✓ Results saved: {path}")
+
+        failed = [r["id"] for r in results if not r["passed"]]
+        self.assertFalse(failed, f"{len(failed)} credential case(s) failed: {', '.join(failed)}")
+
+
+def load_tests(loader, tests, pattern):
+    """Plain unittest runs use the state plan's order too (pytest orders them in conftest)"""
+    names = loader.getTestCaseNames(SignInTests)
+    declared = [(name, *StateScheduler.states(getattr(SignInTests, name))) for name in names]
+    chain = StateScheduler().plan(declared)[0]
+    return unittest.TestSuite(SignInTests(name) for name, _, _ in chain)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
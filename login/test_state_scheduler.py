@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+
+from login import conftest
+from login.helpers.state_scheduler import LOGGED_IN, LOGGED_OUT, StateScheduler
+
+DASHBOARD = StateScheduler.screen("Dashboard")
+TESTS = [
+    ("test_logout", LOGGED_IN, LOGGED_OUT),
+    ("test_properties", LOGGED_IN, StateScheduler.screen("Properties")),
+    ("test_bad_password", LOGGED_OUT, None),
+    ("test_login", LOGGED_OUT, DASHBOARD),
+    ("test_violations", LOGGED_IN, StateScheduler.screen("Violations")),
+]
+
+
+class _Item:
+    def __init__(self, nodeid, requires=None, produces=None):
+        self.nodeid = nodeid
+        self.obj = StateScheduler.declare(requires, produces)(lambda: None) if requires or produces else None
+        self.markers = []
+
+    def add_marker(self, marker):
+        self.markers.append(marker)
+
+
+class StateSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = StateScheduler()
+
+    def test_transition_costs(self):
+        costs = StateScheduler.DEFAULT_COSTS
+        self.assertEqual(self.scheduler.transition_cost(None, LOGGED_OUT), costs["launch"])
+        self.assertEqual(self.scheduler.transition_cost(LOGGED_OUT, DASHBOARD), costs["login"] + costs["navigate"])
+        self.assertEqual(self.scheduler.transition_cost(DASHBOARD, LOGGED_IN), 0.0)
+        self.assertEqual(self.scheduler.transition_cost(DASHBOARD, LOGGED_OUT), costs["logout"])
+
+    def test_single_chain_logs_in_once_and_logs_out_last(self):
+        chains = self.scheduler.plan(TESTS)
+        self.assertEqual(len(chains), 1)
+        names = [name for name, _, _ in chains[0]]
+        self.assertEqual(names[:2], ["test_bad_password", "test_login"])
+        self.assertEqual(names[-1], "test_logout")
+        self.assertLess(self.scheduler.chain_cost(chains[0]), self.scheduler.chain_cost(TESTS))
+
+    def test_plan_keeps_every_test_once_across_workers(self):
+        chains = self.scheduler.plan(TESTS, workers=2)
+        self.assertEqual(len(chains), 2)
+        self.assertEqual(sorted(name for chain in chains for name, _, _ in chain), sorted(name for name, _, _ in TESTS))
+
+    def test_summary_saving_is_against_collection_order(self):
+        chains = self.scheduler.plan(TESTS)
+        saved = self.scheduler.chain_cost(TESTS) - self.scheduler.chain_cost(chains[0])
+        summary = self.scheduler.format_summary(TESTS, chains)
+        self.assertIn(f"in collection order ({saved:.1f}s saved)", summary)
+        self.assertNotIn("isolated", summary)
+
+
+class CollectionOrderTests(unittest.TestCase):
+    def test_only_declared_tests_move_and_classes_stay_together(self):
+        items = [_Item("test_a.py::test_unit")]
+        items += [_Item(f"test_b.py::Flow::{name}", requires, produces) for name, requires, produces in TESTS]
+        items += [_Item("test_b.py::Flow::test_undeclared"), _Item("test_c.py::test_unit")]
+        config = mock.Mock(spec=["hook", "workerinput"])
+        with mock.patch.object(conftest, "IMPACT_SELECTION_FILE", ""):
+            conftest.pytest_collection_modifyitems(None, config, items)
+        names = [item.nodeid.rsplit("::", 1)[-1] for item in items]
+        self.assertEqual(names[0], "test_unit")
+        self.assertEqual(names[1:3], ["test_bad_password", "test_login"])
+        self.assertEqual(names[5:], ["test_logout", "test_undeclared", "test_unit"])
+        groups = {marker.args[0] for item in items[1:6] for marker in item.markers}
+        self.assertEqual(len(groups), 1)
+        self.assertFalse(items[0].markers + items[6].markers)
+
+
+if __name__ == "__main__":
+    unittest.main()